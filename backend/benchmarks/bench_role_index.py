@@ -0,0 +1,77 @@
+"""
+Benchmark: joining resolved roles onto tenant users.
+
+Compares the old per-user linear scan over the Resolve Assigned Roles response with
+AssignedRolesIndex at 1k/10k/50k users per tenant.
+
+Usage (from backend/):
+    PYTHONPATH=src python benchmarks/bench_role_index.py [--naive-max 10000]
+"""
+import argparse
+import time
+
+from models.wristband.role import AssignedRolesIndex
+
+ROLES_PER_USER = 2
+
+
+def build_fixture(user_count: int) -> tuple[list[dict], dict]:
+    users = [{'id': f'user-{i}'} for i in range(user_count)]
+    roles_data = {
+        'items': [
+            {
+                'userId': f'user-{i}',
+                'roles': [
+                    {'id': f'role-{r}', 'name': f'app:tenant:role-{r}'}
+                    for r in range(ROLES_PER_USER)
+                ],
+            }
+            # Reverse order so the naive scan cannot get lucky on early matches
+            for i in reversed(range(user_count))
+        ]
+    }
+    return users, roles_data
+
+
+def join_naive(users: list[dict], roles_data: dict) -> None:
+    for user_dict in users:
+        user_roles_item = next((item for item in roles_data.get('items', []) if item['userId'] == user_dict['id']), None)
+        if user_roles_item:
+            user_dict['roles'] = [role['name'].split(':')[-1] for role in user_roles_item.get('roles', [])]
+        else:
+            user_dict['roles'] = []
+
+
+def join_indexed(users: list[dict], roles_data: dict) -> None:
+    roles_index = AssignedRolesIndex(roles_data)
+    for user_dict in users:
+        user_dict['roles'] = roles_index.skus_for(user_dict['id'])
+
+
+def timed(fn, users: list[dict], roles_data: dict) -> float:
+    start = time.perf_counter()
+    fn(users, roles_data)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 50_000])
+    parser.add_argument('--naive-max', type=int, default=10_000,
+                        help='skip the quadratic join above this many users (default: 10000)')
+    args = parser.parse_args()
+
+    print(f"{'users':>8}  {'naive (s)':>10}  {'indexed (s)':>12}  {'speedup':>8}")
+    for size in args.sizes:
+        users, roles_data = build_fixture(size)
+        indexed = timed(join_indexed, users, roles_data)
+
+        if size <= args.naive_max:
+            naive = timed(join_naive, [dict(u) for u in users], roles_data)
+            print(f"{size:>8}  {naive:>10.4f}  {indexed:>12.4f}  {naive / indexed:>7.0f}x")
+        else:
+            print(f"{size:>8}  {'skipped':>10}  {indexed:>12.4f}  {'-':>8}")
+
+
+if __name__ == '__main__':
+    main()
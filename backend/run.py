@@ -1,4 +1,7 @@
 # Standard library imports
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import logging
@@ -10,9 +13,42 @@ from environment import environment as env
 # Local imports
 from wristband.fastapi_auth import SessionMiddleware
 from api import router
+from api.errors import wristband_error_handler
+from api.endpoints import metrics_api
+from clients.wristband_client import WristbandAPIError, WristbandClient
+from services.encryption_service import close_encryption_service, get_encryption_service
+from services.tenant_encryption_service import get_tenant_encryption_service
+from utils.startup import startup_timer, startup_report
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # One pooled Wristband client per process, shared by every request
+    with startup_timer("wristband_client"):
+        app.state.wristband_client = WristbandClient()
+    with startup_timer("wristband_prewarm"):
+        await app.state.wristband_client.prewarm()
+
+    # Derive the encryption keys now, off the event loop, instead of on the first secrets request.
+    # A failure is only logged: secrets endpoints retry lazily and report encryption as unavailable.
+    try:
+        with startup_timer("encryption_service"):
+            await asyncio.to_thread(get_encryption_service)
+        with startup_timer("tenant_encryption_service"):
+            get_tenant_encryption_service()
+    except Exception as e:
+        logger.error(f"Encryption service unavailable at startup: {str(e)}")
+
+    logger.info(f"Startup finished in {startup_report()['total_ms']}ms")
+    try:
+        yield
+    finally:
+        await app.state.wristband_client.aclose()
+        close_encryption_service()
 
 def create_app() -> FastAPI:
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
 
     # Set up logging
     if not logging.getLogger().hasHandlers():
@@ -51,9 +87,16 @@ def create_app() -> FastAPI:
         allow_headers=["*"]
     )
     
+    # Wristband throttling and outages reach callers as 429/503 from every endpoint
+    app.add_exception_handler(WristbandAPIError, wristband_error_handler)
+
     # Include API routers
     app.include_router(router)
 
+    # Operator-only metrics, kept off the tenant-user API under /api
+    if env.metrics_token:
+        app.include_router(metrics_api.router, prefix="/internal/metrics", tags=["metrics"])
+
     return app
 
 # This app instance is used when imported by Uvicorn
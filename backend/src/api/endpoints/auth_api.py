@@ -10,6 +10,7 @@ from wristband.fastapi_auth import SessionResponse
 # Local imports
 from services.wristband_service import get_wristband_service, WristbandService
 from auth.wristband import require_session_auth
+from clients.wristband_client import WristbandAPIError
 
 
 logger = logging.getLogger(__name__)
@@ -32,6 +33,8 @@ async def logout(svc: WristbandService = Depends(get_wristband_service)) -> Resp
 async def get_session(svc: WristbandService = Depends(get_wristband_service)) -> SessionResponse:
     try:
         return await svc.get_session()
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Unexpected Get Session Endpoint error: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
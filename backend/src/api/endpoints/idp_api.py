@@ -6,6 +6,7 @@ from typing import Dict, Any
 
 # Local imports
 from auth.wristband import require_session_auth
+from clients.wristband_client import WristbandAPIError
 from services.wristband_service import get_wristband_service, WristbandService
 from models.wristband.idp import UpsertGoogleSamlMetadata, UpsertOktaIdpRequest
 
@@ -18,6 +19,8 @@ router = APIRouter(dependencies=[Depends(require_session_auth)])
 async def get_identity_providers(svc: WristbandService = Depends(get_wristband_service)):
     try:
         return await svc.get_identity_providers()
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error fetching identity providers: {str(e)}")
         return JSONResponse(
@@ -35,6 +38,8 @@ async def upsert_google_saml(
         metadata_dict = request_data.get('metadata', {})
         metadata = UpsertGoogleSamlMetadata(**metadata_dict)
         await svc.upsert_google_saml_idp(metadata)
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error upserting Google SAML IDP: {str(e)}")
         return JSONResponse(
@@ -54,6 +59,8 @@ async def upsert_okta(
             client_secret=request_data.client_secret,
             enabled=request_data.enabled
         )
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error upserting Okta IDP: {str(e)}")
         return JSONResponse(
@@ -71,6 +78,8 @@ async def get_okta_redirect_url(svc: WristbandService = Depends(get_wristband_se
                 content={"error": "not_found", "message": "No Okta redirect URL found."}
             )
         return {"redirectUrl": redirect_url}
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error fetching Okta redirect URL: {str(e)}")
         return JSONResponse(
@@ -83,6 +92,8 @@ async def test_okta_connection(svc: WristbandService = Depends(get_wristband_ser
     try:
         ok = await svc.test_okta_connection()
         return {"ok": ok}
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error testing Okta connection: {str(e)}")
         return {"ok": False, "error": "unexpected_error"}
@@ -0,0 +1,33 @@
+# Standard library imports
+import hmac
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from typing import Any, Dict
+
+# Local imports
+from environment import environment as env
+from utils.metrics import metrics_snapshot
+
+
+logger = logging.getLogger(__name__)
+
+
+def require_metrics_token(request: Request) -> None:
+    """
+    Metrics expose process-wide internals across all tenants, so they are for operators
+    only: callers must present METRICS_TOKEN as a bearer token, not a user session.
+    """
+    authorization = request.headers.get('Authorization', '')
+    token = authorization.removeprefix('Bearer ').strip()
+    if not env.metrics_token or not hmac.compare_digest(token.encode(), env.metrics_token.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, headers={'WWW-Authenticate': 'Bearer'})
+
+
+# Mounted outside the tenant-user API, and only when METRICS_TOKEN is set (see run.py)
+router = APIRouter(dependencies=[Depends(require_metrics_token)])
+
+
+@router.get('')
+async def get_metrics() -> Dict[str, Dict[str, Any]]:
+    """Process-local counters (caches, upstream clients) for this worker"""
+    return metrics_snapshot()
@@ -6,6 +6,7 @@ from fastapi.responses import JSONResponse
 
 # Local imports
 from auth.wristband import require_session_auth
+from clients.wristband_client import WristbandAPIError
 from services.wristband_service import get_wristband_service, WristbandService
 from models.wristband.role import Role
 
@@ -18,6 +19,8 @@ router = APIRouter(dependencies=[Depends(require_session_auth)])
 async def get_tenant_roles(svc: WristbandService = Depends(get_wristband_service)):
     try:
         return await svc.get_roles()
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error fetching roles: {str(e)}")
         return JSONResponse(
@@ -1,12 +1,17 @@
 # Standard library imports
 import logging
-from fastapi import APIRouter, Depends
-from typing import List
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
 
 # Local imports
-from auth.wristband import require_session_auth
-from services.collections.secrets_service import get_secrets_service, SecretsService
-from models.secrets import SecretConfig, SecretResponse, SecretExistsResponse
+from auth.wristband import require_session_auth, require_tenant_admin
+from services.collections.secrets_service import (
+    get_secrets_service,
+    SecretsService,
+    SECRETS_DEFAULT_PAGE_SIZE,
+    SECRETS_MAX_PAGE_SIZE,
+)
+from models.secrets import SecretConfig, SecretResponse, SecretsPageResponse, SecretMetadataPageResponse, SecretExistsResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter(dependencies=[Depends(require_session_auth)])
@@ -16,10 +21,30 @@ router = APIRouter(dependencies=[Depends(require_session_auth)])
 # ENDPOINTS
 # =============================================================================
 
-@router.get('', response_model=List[SecretResponse])
-async def get_secrets(svc: SecretsService = Depends(get_secrets_service)):
-    """Get all secrets"""
-    return await svc.get_secrets()
+@router.get('', response_model=SecretsPageResponse)
+async def get_secrets(
+    limit: int = Query(SECRETS_DEFAULT_PAGE_SIZE, ge=1, le=SECRETS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    svc: SecretsService = Depends(get_secrets_service)
+):
+    """Get a page of secrets; pass the returned nextCursor as cursor for the next page"""
+    return await svc.get_secrets(limit=limit, cursor=cursor)
+
+
+@router.get('/metadata', response_model=SecretMetadataPageResponse)
+async def list_secret_metadata(
+    limit: int = Query(SECRETS_DEFAULT_PAGE_SIZE, ge=1, le=SECRETS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    svc: SecretsService = Depends(get_secrets_service)
+):
+    """List a page of secret names and metadata without tokens; fetch tokens with GET /by-name/{name}"""
+    return await svc.list_secret_metadata(limit=limit, cursor=cursor)
+
+
+@router.get('/stream')
+async def stream_secrets(svc: SecretsService = Depends(get_secrets_service)):
+    """Stream all secrets as a JSON array without loading the whole collection into memory"""
+    return await svc.stream_secrets()
 
 
 @router.post('/upsert')
@@ -31,6 +56,27 @@ async def upsert_secret(
     return await svc.upsert_secret(secret)
 
 
+@router.post('/migrate-storage', status_code=202, dependencies=[Depends(require_tenant_admin)])
+async def start_storage_migration(svc: SecretsService = Depends(get_secrets_service)):
+    """Rewrite secrets stored in the legacy v1 format in the background; progress is in GET /jobs"""
+    return await svc.start_storage_migration()
+
+
+@router.post('/rotate-keys', status_code=202, dependencies=[Depends(require_tenant_admin)])
+async def start_key_rotation(svc: SecretsService = Depends(get_secrets_service)):
+    """
+    Rewrap the tenant data key and move legacy secrets onto it in the background; progress is
+    in GET /jobs. 409 while a run on any instance holds the job.
+    """
+    return await svc.start_key_rotation()
+
+
+@router.get('/jobs', dependencies=[Depends(require_tenant_admin)])
+async def get_job_status(svc: SecretsService = Depends(get_secrets_service)):
+    """Progress and outcome of this tenant's storage migration and key rotation jobs"""
+    return await svc.get_job_status()
+
+
 @router.get('/check/{name}', response_model=SecretExistsResponse)
 async def check_secret_exists(
     name: str,
@@ -40,6 +86,15 @@ async def check_secret_exists(
     return await svc.check_secret_exists(name)
 
 
+@router.get('/by-name/{name}', response_model=SecretResponse)
+async def get_secret(
+    name: str,
+    svc: SecretsService = Depends(get_secrets_service)
+):
+    """Get a single secret with its decrypted token (under /by-name so names like "metadata" are not shadowed)"""
+    return await svc.get_secret(name)
+
+
 @router.delete('/{name}')
 async def delete_secret(
     name: str,
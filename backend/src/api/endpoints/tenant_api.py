@@ -6,6 +6,7 @@ from fastapi.responses import JSONResponse
 
 # Local imports
 from auth.wristband import require_session_auth
+from clients.wristband_client import WristbandAPIError
 from services.wristband_service import get_wristband_service, WristbandService
 from models.wristband.tenant import (
     Tenant,
@@ -26,6 +27,8 @@ async def update_current_tenant(
     try:
         logger.info(f"Updating tenant info: {tenant_data.model_dump(by_alias=True, exclude_unset=True)}")
         return await svc.update_tenant_info(tenant_data)
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Unexpected error updating tenant: {str(e)}")
         return JSONResponse(
@@ -38,6 +41,8 @@ async def get_current_tenant(svc: WristbandService = Depends(get_wristband_servi
     """Get the current user's tenant information"""
     try:        
         return await svc.get_tenant_info()
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error fetching current tenant info: {str(e)}")
         return JSONResponse(
@@ -49,6 +54,8 @@ async def get_current_tenant(svc: WristbandService = Depends(get_wristband_servi
 async def get_tenant_options(svc: WristbandService = Depends(get_wristband_service)):
     try:
         return await svc.get_tenant_options()
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error fetching tenant options: {str(e)}")
         return JSONResponse(
@@ -6,6 +6,7 @@ from fastapi.responses import JSONResponse
 
 # Local imports
 from auth.wristband import require_session_auth
+from clients.wristband_client import WristbandAPIError
 from services.wristband_service import get_wristband_service, WristbandService
 from models.wristband.user import (
     User,
@@ -25,6 +26,8 @@ router = APIRouter(dependencies=[Depends(require_session_auth)])
 async def get_current_user(svc: WristbandService = Depends(get_wristband_service)):
     try:
         return await svc.get_user_info()
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error fetching current user info: {str(e)}")
         return JSONResponse(
@@ -39,6 +42,8 @@ async def update_current_user_profile(
 ):
     try:
         return await svc.update_user_profile(update_name_request)
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error updating current user profile: {str(e)}")
         return JSONResponse(
@@ -53,6 +58,8 @@ async def change_current_user_password(
 ):
     try:
         return await svc.change_user_password(password_data)
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error changing user password: {str(e)}")
         return JSONResponse(
@@ -64,6 +71,8 @@ async def change_current_user_password(
 async def get_current_user_roles(svc: WristbandService = Depends(get_wristband_service)):
     try:
         return await svc.get_user_roles()
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error fetching user roles: {str(e)}")
         return JSONResponse(
@@ -78,6 +87,8 @@ async def invite_user(
 ):
     try:
         await svc.invite_user(invite_request.email, invite_request.roles)
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error inviting user: {str(e)}")
         return JSONResponse(
@@ -92,6 +103,8 @@ async def cancel_invitation(
 ) -> None:
     try:
         await svc.cancel_invitation(invitation_id)
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error cancelling invitation {invitation_id}: {str(e)}")
         return JSONResponse(
@@ -107,6 +120,8 @@ async def update_user_roles(
 ) -> None:
     try:
         await svc.update_user_roles(user_id, role_request.new_role_ids, role_request.existing_role_ids)
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error updating user roles: {str(e)}")
         return JSONResponse(
@@ -118,6 +133,8 @@ async def update_user_roles(
 async def delete_user(user_id: str, svc: WristbandService = Depends(get_wristband_service)) -> None:
     try:
         await svc.delete_user(user_id)
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error deleting user: {str(e)}")
         return JSONResponse(
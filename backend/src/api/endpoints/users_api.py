@@ -6,6 +6,7 @@ from fastapi.responses import JSONResponse
 
 # Local imports
 from auth.wristband import require_session_auth
+from clients.wristband_client import WristbandAPIError
 from services.wristband_service import get_wristband_service, WristbandService
 from models.wristband.user import User
 from models.wristband.invite import NewUserInvitationRequest
@@ -19,6 +20,8 @@ router = APIRouter(dependencies=[Depends(require_session_auth)])
 async def get_users(svc: WristbandService = Depends(get_wristband_service)) -> list[User]:
     try:
         return await svc.get_users()
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error fetching users: {str(e)}")
         return JSONResponse(
@@ -31,6 +34,8 @@ async def get_users(svc: WristbandService = Depends(get_wristband_service)) -> l
 async def get_pending_invitations(svc: WristbandService = Depends(get_wristband_service)) -> list[NewUserInvitationRequest]:
     try:
         return await svc.get_pending_invitations()
+    except WristbandAPIError:
+        raise
     except Exception as e:
         logger.exception(f"Error querying pending invitations: {str(e)}")
         return JSONResponse(
@@ -0,0 +1,56 @@
+# Standard library imports
+import logging
+import math
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+
+# Local imports
+from clients.wristband_client import WristbandAPIError, WristbandCircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# Retry-After sent when Wristband throttled or failed without saying when to come back
+DEFAULT_RETRY_AFTER_SECONDS = 1
+
+# Wristband statuses passed on to the caller, so clients back off instead of seeing a 500
+PASSTHROUGH_STATUS_CODES = {
+    status.HTTP_429_TOO_MANY_REQUESTS: ("rate_limited", "Too many requests, please retry later."),
+    status.HTTP_503_SERVICE_UNAVAILABLE: ("upstream_unavailable", "The identity service is temporarily unavailable, please retry later."),
+}
+
+
+def upstream_error_response(error: Exception) -> JSONResponse | None:
+    """
+    Return a 429/503 response with Retry-After when error is Wristband throttling or
+    being unavailable (including an open circuit breaker), or None for errors the
+    endpoint should handle itself.
+    """
+    if isinstance(error, WristbandCircuitOpenError):
+        status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    elif isinstance(error, WristbandAPIError) and error.status_code in PASSTHROUGH_STATUS_CODES:
+        status_code = error.status_code
+    else:
+        return None
+
+    code, message = PASSTHROUGH_STATUS_CODES[status_code]
+    retry_after = math.ceil(error.retry_after) if error.retry_after is not None else DEFAULT_RETRY_AFTER_SECONDS
+    logger.warning(f"{error} (responding {status_code}, retry after {retry_after}s)")
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": code, "message": message},
+        headers={"Retry-After": str(max(retry_after, DEFAULT_RETRY_AFTER_SECONDS))},
+    )
+
+
+async def wristband_error_handler(request: Request, error: WristbandAPIError) -> JSONResponse:
+    """
+    App-wide handler for Wristband errors, which endpoints re-raise instead of handling:
+    throttling and outages become 429/503 with Retry-After, anything else a 500.
+    """
+    if response := upstream_error_response(error):
+        return response
+    logger.error(f"Unexpected Wristband error on {request.method} {request.url.path}: {str(error)}", exc_info=error)
+    return JSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={"error": "internal_error", "message": "An unexpected error occurred."}
+    )
@@ -1,10 +1,15 @@
 import os
 
-from wristband.fastapi_auth import AuthConfig, WristbandAuth
+from fastapi import Depends, HTTPException, status
+from wristband.fastapi_auth import AuthConfig, WristbandAuth, get_session
 from environment import environment as env
+from models.wristband.session import MySession
 
 # Explicitly define what can be imported
-__all__ = ["require_session_auth", "wristband_auth"]
+__all__ = ["require_session_auth", "require_tenant_admin", "wristband_auth", "TENANT_ADMIN_ROLE"]
+
+# Role SKU (stored in the session at login) allowed to run tenant-wide maintenance jobs
+TENANT_ADMIN_ROLE = "account-admin"
 
 wristband_auth: WristbandAuth = WristbandAuth(
     AuthConfig(
@@ -16,4 +21,10 @@ wristband_auth: WristbandAuth = WristbandAuth(
     )
 )
 
-require_session_auth = wristband_auth.create_session_auth_dependency()
\ No newline at end of file
+require_session_auth = wristband_auth.create_session_auth_dependency()
+
+
+def require_tenant_admin(session: MySession = Depends(get_session)) -> None:
+    """Reject callers whose session does not hold the tenant admin role."""
+    if TENANT_ADMIN_ROLE not in (session.roles or []):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Tenant admin role required")
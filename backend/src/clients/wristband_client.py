@@ -1,17 +1,142 @@
-from typing import Any
+from collections import Counter, OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+import asyncio
+import base64
+import hashlib
 import httpx
+import json
+import importlib.util
 import logging
 import os
+import time
 
 from environment import environment as env
+from utils.concurrency import gather_bounded
+from utils.circuit_breaker import CircuitBreaker
+from utils.metrics import register_metrics
+from utils.rate_limit import FairLimiter
+from utils.retry import RetryBudget, backoff_delay, parse_retry_after
+from utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# httpx only speaks HTTP/2 when the optional h2 package is installed (httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+# Statuses worth retrying: rate limiting and transient gateway/availability errors
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+# Methods that are safe to resend once the request may have reached Wristband
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD'})
+
+
+class WristbandAPIError(ValueError):
+    """
+    A Wristband API call failed. status_code is None when no response was received
+    (connection error or timeout). retry_after carries Wristband's Retry-After, if any.
+    """
+    def __init__(self, operation: str, status_code: int | None, message: str, retry_after: float | None = None) -> None:
+        super().__init__(f'Error calling {operation}: {status_code} - {message}')
+        self.operation = operation
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def is_transient(self) -> bool:
+        """True for failures that may succeed if tried again later."""
+        return self.status_code is None or self.status_code in RETRYABLE_STATUS_CODES
+
+
+class WristbandCircuitOpenError(WristbandAPIError):
+    """
+    The call was rejected without contacting Wristband because the circuit for its
+    endpoint family is open. retry_after is when probe calls will be let through again.
+    """
+    def __init__(self, operation: str, family: str, retry_after: float) -> None:
+        super().__init__(operation, None, f"circuit open for '{family}' endpoints", retry_after=retry_after)
+        self.family = family
+
+
+# Operation -> endpoint family sharing a circuit breaker; unlisted operations get their own
+ENDPOINT_FAMILIES = {
+    'get_user_info': 'users',
+    'update_user': 'users',
+    'change_password': 'users',
+    'deactivate_user': 'users',
+    'delete_user': 'users',
+    'query_tenant_users': 'users',
+    'invite_user': 'invitations',
+    'query_new_user_invitation_requests': 'invitations',
+    'cancel_new_user_invitation': 'invitations',
+    'resolve_assigned_roles_for_users': 'roles',
+    'resolve_assignable_roles_for_user': 'roles',
+    'update_user_role_assignments': 'roles',
+    'unassign_roles_from_user': 'roles',
+    'query_tenant_roles': 'roles',
+    'get_tenant': 'tenants',
+    'update_tenant': 'tenants',
+    'fetch_tenants': 'tenants',
+    'upsert_idp_override_toggle': 'identity_providers',
+    'upsert_identity_provider': 'identity_providers',
+    'upsert_google_saml_identity_provider': 'identity_providers',
+    'upsert_okta_identity_provider': 'identity_providers',
+    'get_identity_providers': 'identity_providers',
+    'resolve_idp_redirect_url_overrides': 'identity_providers',
+    'test_idp_connection': 'identity_providers',
+}
+
+
+def _token_claims(token: str) -> dict[str, Any]:
+    """
+    Read the claims of a JWT without verifying it; callers only use them as keys.
+    Returns an empty dict when the token is not a readable JWT.
+    """
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return claims if isinstance(claims, dict) else {}
+    except Exception:
+        return {}
+
+
+def _token_subject(authorization: str | None) -> str:
+    """
+    Identify the caller behind an Authorization header for request coalescing.
+    Uses the JWT 'sub' claim and falls back to a hash of the whole token when it is not
+    a readable JWT.
+    """
+    token = (authorization or '').removeprefix('Bearer ').strip()
+    subject = _token_claims(token).get('sub')
+    if subject:
+        return f"sub:{subject}"
+    return "token:" + hashlib.sha256(token.encode()).hexdigest()
+
+
+def _token_tenant(authorization: str | None) -> str:
+    """
+    Identify the tenant behind an Authorization header for fair queuing, from the
+    Wristband 'tnt_id' claim, falling back to the caller's identity.
+    """
+    token = (authorization or '').removeprefix('Bearer ').strip()
+    tenant_id = _token_claims(token).get('tnt_id')
+    if tenant_id:
+        return f"tenant:{tenant_id}"
+    return _token_subject(authorization)
+
+
 class WristbandClient:
     """
     Pure HTTP client for Wristband API - no model dependencies.
     All methods return raw dicts from API responses.
     Model mapping is handled by the service layer.
+
+    One instance is created per process by the app lifespan (see run.py) so that all
+    requests share a single pooled httpx.AsyncClient. Call aclose() on shutdown.
+
+    All traffic goes to one host, so with WRISTBAND_HTTP2 enabled requests are multiplexed
+    over a single HTTP/2 connection instead of a pool of HTTP/1.1 connections. prewarm()
+    opens connections ahead of the first request.
     """
     def __init__(self) -> None:
         self.base_url: str = f'https://{env.application_vanity_domain}/api/v1'
@@ -20,29 +145,406 @@ class WristbandClient:
             'Content-Type': 'application/json'
         }
 
-        self.client = httpx.AsyncClient()
+        self.http2: bool = env.wristband_http2 and HTTP2_AVAILABLE
+        if env.wristband_http2 and not HTTP2_AVAILABLE:
+            logger.warning("WRISTBAND_HTTP2 is enabled but h2 is not installed, falling back to HTTP/1.1")
+
+        self.client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=env.wristband_http_max_connections,
+                max_keepalive_connections=env.wristband_http_max_keepalive_connections,
+                keepalive_expiry=env.wristband_http_keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                env.wristband_http_timeout,
+                connect=env.wristband_http_connect_timeout,
+            ),
+            event_hooks={'response': [self._record_http_version]},
+        )
+
+        # Negotiated protocol per response, to compare HTTP/1.1 and HTTP/2 under load
+        self._responses_by_http_version: Counter[str] = Counter()
+        self._prewarmed_connections = 0
+        self._prewarm_ms: float | None = None
+        register_metrics("wristband_client.transport", lambda: {
+            "http2": self.http2,
+            "responses_by_http_version": dict(self._responses_by_http_version),
+            "prewarmed_connections": self._prewarmed_connections,
+            "prewarm_ms": self._prewarm_ms,
+        })
+
+        # Opt-in: concurrent identical GETs share one upstream request
+        self.coalesce_reads: bool = env.wristband_coalesce_reads
+        self._read_flights = SingleFlight()
+        register_metrics("wristband_client.coalescing", lambda: {
+            "enabled": self.coalesce_reads,
+            **self._read_flights.stats(),
+        })
+
+        # Shared by every call, so retries stay a bounded fraction of total traffic
+        self.retry_budget = RetryBudget(
+            ratio=env.wristband_retry_budget_ratio,
+            min_per_second=env.wristband_retry_budget_min_per_second,
+        )
+        self._retries_by_reason: Counter[str] = Counter()
+        register_metrics("wristband_client.retries", lambda: {
+            **self.retry_budget.stats(),
+            "by_reason": dict(self._retries_by_reason),
+        })
+
+        # Outbound limits: process-wide, per endpoint family and (optionally) per tenant.
+        # Each queues fairly across tenants; see _limited().
+        self.limiter = FairLimiter(
+            "wristband",
+            max_in_flight=env.wristband_max_in_flight,
+            rate_per_second=env.wristband_max_requests_per_second,
+        )
+        self._endpoint_limiters: dict[str, FairLimiter] = {
+            family: FairLimiter(f"wristband.{family}", max_in_flight=max_in_flight, rate_per_second=rate)
+            for family, (max_in_flight, rate) in env.wristband_endpoint_limits.items()
+        }
+        # Created on demand, in least recently used order. Dropped once idle, or when
+        # there are too many and they have nothing in flight or queued.
+        self._tenant_limiters: OrderedDict[str, FairLimiter] = OrderedDict()
+        register_metrics("wristband_client.limits", lambda: {
+            "global": self.limiter.stats(),
+            "endpoints": {family: limiter.stats() for family, limiter in sorted(self._endpoint_limiters.items())},
+            "tenants_limited": len(self._tenant_limiters),
+        })
+
+        # One circuit breaker per endpoint family, created on first use
+        self.circuit_breaker_enabled: bool = env.wristband_circuit_enabled
+        self._circuits: dict[str, CircuitBreaker] = {}
+        register_metrics("wristband_client.circuits", lambda: {
+            family: breaker.stats() for family, breaker in sorted(self._circuits.items())
+        })
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self.client.aclose()
+
+    async def _record_http_version(self, response: httpx.Response) -> None:
+        self._responses_by_http_version[response.http_version] += 1
+
+    async def prewarm(self, connections: int | None = None) -> int:
+        """
+        Resolve DNS and complete the TLS handshake for the Wristband host ahead of the first
+        user request, leaving the connections in the pool. HTTP/2 multiplexes over a single
+        connection, so only one is opened in that mode.
+
+        Failures are logged and never raised; requests then connect on demand as before.
+
+        Returns:
+            Number of connections opened
+        """
+        connections = env.wristband_prewarm_connections if connections is None else connections
+        if self.http2:
+            connections = min(connections, 1)
+        if connections <= 0:
+            return 0
+
+        start = time.perf_counter()
+        # Any response proves the connection is up; the status of the bare API root is irrelevant
+        results = await asyncio.gather(
+            *(self.client.head(self.base_url) for _ in range(connections)),
+            return_exceptions=True
+        )
+        self._prewarm_ms = round((time.perf_counter() - start) * 1000, 1)
+
+        errors = [result for result in results if isinstance(result, Exception)]
+        self._prewarmed_connections = connections - len(errors)
+        if errors:
+            logger.warning(f"Prewarming Wristband connections failed for {len(errors)}/{connections}: {errors[0]!r}")
+        return self._prewarmed_connections
+
+    async def _request(
+        self,
+        operation: str,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        params: dict[str, Any] | None = None,
+        json: Any = None,
+        expected: tuple[int, ...] = (200,),
+        idempotent: bool | None = None,
+    ) -> httpx.Response:
+        """
+        Send a request to Wristband on behalf of a client method and check its status.
+
+        Idempotent requests (GET/HEAD, or idempotent=True for PUTs that replace state) are
+        retried on 429/502/503/504 and on network errors; other requests are only retried
+        when the connection failed before anything was sent. Retries back off
+        exponentially with jitter, honour Retry-After, and draw from a per-process budget.
+        Every attempt goes through the circuit breaker of the operation's endpoint family
+        (see ENDPOINT_FAMILIES), which rejects calls outright while Wristband is failing.
+        With WRISTBAND_COALESCE_READS enabled, concurrent GETs with the same URL, params
+        and token subject share one in-flight request (retries included).
+
+        Raises:
+            WristbandAPIError: If the final response status is not in `expected`, or no
+            response was received
+            WristbandCircuitOpenError: If the endpoint family's circuit is open
+        """
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS if idempotent is None else idempotent
+
+        send = lambda: self._send_with_retries(operation, method, url, headers, params, json, idempotent)
+        if method == 'GET' and self.coalesce_reads:
+            key = (
+                'GET',
+                url,
+                tuple(sorted((params or {}).items())),
+                _token_subject(headers.get('Authorization')),
+            )
+            response = await self._read_flights.do(key, send)
+        else:
+            response = await send()
+
+        if response.status_code not in expected:
+            raise WristbandAPIError(
+                operation,
+                response.status_code,
+                response.text,
+                retry_after=parse_retry_after(response.headers.get('Retry-After')),
+            )
+        return response
+
+    async def _send_with_retries(
+        self,
+        operation: str,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        params: dict[str, Any] | None,
+        json: Any,
+        idempotent: bool,
+    ) -> httpx.Response:
+        self.retry_budget.record_request()
+        attempt = 0
+        while True:
+            try:
+                response = await self._send(operation, method, url, headers, params, json)
+            except httpx.TransportError as e:
+                # A failed connect means nothing reached Wristband, so any method may be resent
+                safe_to_resend = idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if not (safe_to_resend and self._should_retry(attempt, type(e).__name__)):
+                    raise WristbandAPIError(operation, None, repr(e)) from e
+                delay = backoff_delay(attempt, env.wristband_retry_base_delay, env.wristband_retry_max_delay)
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES or not idempotent:
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                # Waiting longer than the caller would tolerate is pointless; surface the error instead
+                if retry_after is not None and retry_after > env.wristband_retry_max_delay:
+                    return response
+                if not self._should_retry(attempt, str(response.status_code)):
+                    return response
+                delay = retry_after if retry_after is not None else backoff_delay(
+                    attempt, env.wristband_retry_base_delay, env.wristband_retry_max_delay
+                )
+
+            logger.info(f"Retrying {operation} in {delay:.2f}s (attempt {attempt + 2}/{env.wristband_retry_max_retries + 1})")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _send(
+        self,
+        operation: str,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        params: dict[str, Any] | None,
+        json: Any,
+    ) -> httpx.Response:
+        """
+        Send one attempt through the circuit breaker of the operation's endpoint family,
+        then the outbound limiters.
+        """
+        family = ENDPOINT_FAMILIES.get(operation, operation)
+        flow = _token_tenant(headers.get('Authorization'))
+        if not self.circuit_breaker_enabled:
+            async with self._limited(family, flow):
+                return await self.client.request(method, url, headers=headers, params=params, json=json)
+
+        breaker = self._circuit(family)
+        if not breaker.allow():
+            raise WristbandCircuitOpenError(operation, family, breaker.retry_after())
+
+        success: bool | None = None
+        start = time.monotonic()
+        try:
+            async with self._limited(family, flow):
+                # Time spent queued for a slot says nothing about Wristband's latency
+                start = time.monotonic()
+                response = await self.client.request(method, url, headers=headers, params=params, json=json)
+            # Client errors (4xx other than 429) mean Wristband is up and answering
+            success = response.status_code < 500 and response.status_code != 429
+            return response
+        except httpx.TransportError:
+            success = False
+            raise
+        finally:
+            breaker.record(success, time.monotonic() - start)
+
+    @asynccontextmanager
+    async def _limited(self, family: str, flow: str) -> AsyncIterator[None]:
+        """
+        Hold a slot in the tenant, endpoint family and process-wide limiters, narrowest
+        first so a call never holds a global slot while waiting on its own limits. flow
+        identifies the tenant, so each limiter serves tenants round-robin.
+        """
+        async with AsyncExitStack() as stack:
+            if env.wristband_tenant_max_in_flight > 0 or env.wristband_tenant_max_requests_per_second > 0:
+                tenant_limiter = self._tenant_limiters.get(flow)
+                if tenant_limiter is None:
+                    tenant_limiter = self._tenant_limiters[flow] = FairLimiter(
+                        f"wristband.{flow}",
+                        max_in_flight=env.wristband_tenant_max_in_flight,
+                        rate_per_second=env.wristband_tenant_max_requests_per_second,
+                    )
+                    self._evict_tenant_limiters(keep=flow)
+                else:
+                    self._tenant_limiters.move_to_end(flow)
+                stack.callback(self._drop_idle_tenant_limiter, flow)
+                await stack.enter_async_context(tenant_limiter.slot())
+
+            endpoint_limiter = self._endpoint_limiters.get(family)
+            if endpoint_limiter is not None:
+                await stack.enter_async_context(endpoint_limiter.slot(flow))
+
+            await stack.enter_async_context(self.limiter.slot(flow))
+            yield
+
+    def _drop_idle_tenant_limiter(self, flow: str) -> None:
+        tenant_limiter = self._tenant_limiters.get(flow)
+        if tenant_limiter is not None and tenant_limiter.idle:
+            del self._tenant_limiters[flow]
+
+    def _evict_tenant_limiters(self, keep: str) -> None:
+        # A limiter whose bucket is still refilling is not idle, so with a rate limit set
+        # limiters outlive their calls; bound them, least recently used first. Dropping
+        # one only forgets the tokens its tenant spent recently.
+        excess = len(self._tenant_limiters) - max(1, env.wristband_tenant_limiter_max_entries)
+        for flow in list(self._tenant_limiters):
+            if excess <= 0:
+                return
+            if flow != keep and not self._tenant_limiters[flow].busy:
+                del self._tenant_limiters[flow]
+                excess -= 1
+
+    def _circuit(self, family: str) -> CircuitBreaker:
+        breaker = self._circuits.get(family)
+        if breaker is None:
+            breaker = self._circuits[family] = CircuitBreaker(
+                name=f"wristband.{family}",
+                failure_rate_threshold=env.wristband_circuit_failure_rate_threshold,
+                slow_call_seconds=env.wristband_circuit_slow_call_seconds,
+                window_size=env.wristband_circuit_window_size,
+                min_calls=env.wristband_circuit_min_calls,
+                open_seconds=env.wristband_circuit_open_seconds,
+                half_open_max_calls=env.wristband_circuit_half_open_calls,
+            )
+        return breaker
+
+    def _should_retry(self, attempt: int, reason: str) -> bool:
+        if attempt >= env.wristband_retry_max_retries or not self.retry_budget.try_acquire():
+            return False
+        self._retries_by_reason[reason] += 1
+        return True
+
+    ############################################################################################
+    # MARK: Pagination Helpers
+    ############################################################################################
+    async def _query_all_pages(
+        self,
+        path: str,
+        access_token: str,
+        operation: str,
+        start_index: int,
+        index_base: int,
+        count: int | None = None,
+        on_page: Callable[[list[dict]], None] | None = None,
+    ) -> list[dict]:
+        """
+        Fetch every page of a Wristband query endpoint.
+
+        The first page is fetched on its own to learn totalResults; the remaining pages
+        are then fetched concurrently (bounded by WRISTBAND_PAGE_CONCURRENCY) and
+        reassembled in order. index_base is 0 or 1 depending on whether the endpoint's
+        startIndex is 0- or 1-based.
+
+        on_page, if given, is called with each page's items as soon as that page arrives
+        (in completion order), so callers can pipeline follow-up work per page.
+        """
+        page_size = count or env.wristband_page_size
+        headers = {
+            **self.headers,
+            'Authorization': f'Bearer {access_token}'
+        }
+
+        async def fetch_page(page_start_index: int) -> dict:
+            response: httpx.Response = await self._request(
+                operation,
+                'GET',
+                self.base_url + path,
+                headers=headers,
+                params={
+                    'startIndex': page_start_index,
+                    'count': page_size,
+                },
+            )
+
+            data = response.json() if response.content else {}
+            if on_page is not None:
+                on_page(data.get('items', []))
+            return data
+
+        first_page = await fetch_page(start_index)
+        items: list[dict] = list(first_page.get('items', []))
+
+        # Use the page size the server actually applied, which may be capped below `count`
+        items_per_page = first_page.get('itemsPerPage', 0)
+        total_results = first_page.get('totalResults', 0)
+        if items_per_page <= 0:
+            return items
+
+        remaining_start_indexes = range(start_index + items_per_page, index_base + total_results, items_per_page)
+        if not remaining_start_indexes:
+            return items
+
+        # Results keep argument order, so pages come back in startIndex order
+        pages = await gather_bounded(
+            (fetch_page(i) for i in remaining_start_indexes),
+            limit=env.wristband_page_concurrency,
+        )
+        for page in pages:
+            items.extend(page.get('items', []))
+
+        return items
 
     ############################################################################################
     # MARK: User APIs
     ############################################################################################
     async def get_user_info(self, user_id: str, access_token: str) -> dict:
         # Get User API - https://docs.wristband.dev/reference/getuserv1
-        response: httpx.Response = await self.client.get(
+        response: httpx.Response = await self._request(
+            'get_user_info',
+            'GET',
             self.base_url + f'/users/{user_id}',
             headers={
                 **self.headers,
                 'Authorization': f'Bearer {access_token}'
-            }
+            },
         )
 
-        if response.status_code != 200:
-            raise ValueError(f'Error calling get_user_info: {response.status_code} - {response.text}')
-
         return response.json() if response.content else {}
 
     async def update_user(self, user_id: str, data: dict[str, str], access_token: str) -> dict:
         # Update User API - https://docs.wristband.dev/reference/patchuserv1
-        response: httpx.Response = await self.client.patch(
+        response: httpx.Response = await self._request(
+            'update_user',
+            'PATCH',
             self.base_url + f'/users/{user_id}',
             headers={
                 **self.headers,
@@ -51,14 +553,13 @@ class WristbandClient:
             json=data,
         )
 
-        if response.status_code != 200:
-            raise ValueError(f'Error calling update_user: {response.status_code} - {response.text}')
-
         return response.json() if response.content else {}
 
     async def change_password(self, user_id: str, current_password: str, new_password: str, access_token: str) -> None:
         # Change Password API - https://docs.wristband.dev/reference/changepasswordv1
-        response: httpx.Response = await self.client.post(
+        await self._request(
+            'change_password',
+            'POST',
             self.base_url + '/change-password',
             headers={
                 **self.headers,
@@ -71,12 +572,11 @@ class WristbandClient:
             },
         )
 
-        if response.status_code != 200:
-            raise ValueError(f'Error changing password: {response.status_code} - {response.text}')
-
     async def deactivate_user(self, user_id: str, access_token: str) -> dict:
         # Deactivate User API - https://docs.wristband.dev/reference/patchuserv1
-        response: httpx.Response = await self.client.patch(
+        response: httpx.Response = await self._request(
+            'deactivate_user',
+            'PATCH',
             self.base_url + f'/users/{user_id}',
             headers={
                 **self.headers,
@@ -87,30 +587,29 @@ class WristbandClient:
             },
         )
 
-        if response.status_code != 200:
-            raise ValueError(f'Error deactivating user: {response.status_code} - {response.text}')
-
         return response.json() if response.content else {}
 
     async def delete_user(self, user_id: str, access_token: str) -> None:
         # Delete User API - https://docs.wristband.dev/reference/deleteuserv1
-        response: httpx.Response = await self.client.delete(
+        await self._request(
+            'delete_user',
+            'DELETE',
             self.base_url + f'/users/{user_id}',
             headers={
                 **self.headers,
                 'Authorization': f'Bearer {access_token}'
-            }
+            },
+            expected=(204,),
         )
 
-        if response.status_code != 204:
-            raise ValueError(f'Error deleting user: {response.status_code} - {response.text}')
-
     ############################################################################################
     # MARK: User Invitation APIs
     ############################################################################################
     async def invite_user(self, tenant_id: str, email: str, roles_to_assign: list[str], access_token: str) -> None:
         # Invite New User API - https://docs.wristband.dev/reference/inviteuserv1
-        response: httpx.Response = await self.client.post(
+        await self._request(
+            'invite_user',
+            'POST',
             self.base_url + '/new-user-invitation/invite-user',
             headers={
                 **self.headers,
@@ -120,50 +619,23 @@ class WristbandClient:
                 'tenantId': tenant_id,
                 'email': email,
                 'rolesToAssign': roles_to_assign
-            }
+            },
+            expected=(200, 201, 204),
         )
 
-        if response.status_code not in [200, 201, 204]:
-            raise ValueError(f'Error calling invite_user: {response.status_code} - {response.text}')
 
-
-    async def query_new_user_invitation_requests(self, tenant_id: str, access_token: str, pending_only: bool = False, start_index: int = 1, count: int = 50) -> list[dict]:
+    async def query_new_user_invitation_requests(self, tenant_id: str, access_token: str, pending_only: bool = False, start_index: int = 1, count: int | None = None) -> list[dict]:
         # Query New User Invitation Requests API - https://docs.wristband.dev/reference/querynewuserinvitationrequestsfilteredbytenantv1
-        all_invitations = []
-        current_start_index = start_index
-        
-        while True:
-            params = {
-                'startIndex': current_start_index,
-                'count': count,
-            }
-            
-            response: httpx.Response = await self.client.get(
-                self.base_url + f'/tenants/{tenant_id}/new-user-invitation-requests',
-                headers={
-                    **self.headers,
-                    'Authorization': f'Bearer {access_token}'
-                },
-                params=params
-            )
-            
-            if response.status_code != 200:
-                raise ValueError(f'Error calling query_new_user_invitation_requests: {response.status_code} - {response.text}')
-            
-            data = response.json() if response.content else {}
-            
-            # Collect invitations from this page
-            all_invitations.extend(data.get('items', []))
-            
-            # Check if we have more pages to fetch
-            items_per_page = data.get('itemsPerPage', 0)
-            total_results = data.get('totalResults', 0)
-            if current_start_index + items_per_page >= total_results:
-                break
-                
-            # Move to next page (startIndex is 1-based)
-            current_start_index += items_per_page
-        
+        # startIndex is 1-based for this endpoint
+        all_invitations = await self._query_all_pages(
+            f'/tenants/{tenant_id}/new-user-invitation-requests',
+            access_token=access_token,
+            operation='query_new_user_invitation_requests',
+            start_index=start_index,
+            index_base=1,
+            count=count,
+        )
+
         if not pending_only:
             return all_invitations
         else:
@@ -171,7 +643,9 @@ class WristbandClient:
 
     async def cancel_new_user_invitation(self, invitation_id: str, access_token: str) -> None:
         # Cancel New User Invite API - https://docs.wristband.dev/reference/cancelnewuserinvitev1
-        response: httpx.Response = await self.client.post(
+        await self._request(
+            'cancel_new_user_invitation',
+            'POST',
             self.base_url + '/new-user-invitation/cancel-invite',
             headers={
                 **self.headers,
@@ -179,61 +653,54 @@ class WristbandClient:
             },
             json={
                 'newUserInvitationRequestId': invitation_id
-            }
+            },
+            expected=(200, 201, 204),
         )
 
-        if response.status_code not in [200, 201, 204]:
-            raise ValueError(f'Error calling cancel_new_user_invitation: {response.status_code} - {response.text}')
-
     ############################################################################################
     # MARK: Tenant Users APIs
     ############################################################################################
-    async def query_tenant_users(self, tenant_id: str, access_token: str) -> list[dict]:
+    async def query_tenant_users(self, tenant_id: str, access_token: str, count: int | None = None, on_page: Callable[[list[dict]], None] | None = None) -> list[dict]:
         # Query Tenant Users API - https://docs.wristband.dev/reference/querytenantusersv1
-        start_index = 0
-        count = 50
-        all_users = []
-        
-        while True:
-            params = {
-                'startIndex': start_index,
-                'count': count,
-            }
-            
-            response: httpx.Response = await self.client.get(
-                self.base_url + f'/tenants/{tenant_id}/users',
-                headers={
-                    **self.headers,
-                    'Authorization': f'Bearer {access_token}'
-                },
-                params=params
-            )
-
-            if response.status_code != 200:
-                raise ValueError(f'Error calling query_tenant_users: {response.status_code} - {response.text}')
-
-            data = response.json() if response.content else {}
-            
-            # Collect users from this page
-            all_users.extend(data.get('items', []))
-            
-            # Check if we have more pages to fetch
-            items_per_page = data.get('itemsPerPage', 0)
-            total_results = data.get('totalResults', 0)
-            if start_index + items_per_page >= total_results:
-                break
-                
-            # Move to next page
-            start_index += items_per_page
-
-        return all_users
+        return await self._query_all_pages(
+            f'/tenants/{tenant_id}/users',
+            access_token=access_token,
+            operation='query_tenant_users',
+            start_index=0,
+            index_base=0,
+            count=count,
+            on_page=on_page,
+        )
 
     ############################################################################################
     # MARK: Role APIs
     ############################################################################################
-    async def resolve_assigned_roles_for_users(self, user_ids: list[str], access_token: str) -> dict:
+    async def resolve_assigned_roles_for_users(self, user_ids: list[str], access_token: str, chunk_size: int | None = None) -> dict:
         # Resolve Assigned Roles For Users API - https://docs.wristband.dev/reference/resolveassignedrolesforusersv1
-        response: httpx.Response = await self.client.post(
+        # Large tenants are split into chunks that are resolved concurrently and merged back
+        # into a single response so callers never see the chunking.
+        chunk_size = max(1, chunk_size or env.wristband_roles_chunk_size)
+        if len(user_ids) <= chunk_size:
+            return await self._resolve_assigned_roles_chunk(user_ids, access_token)
+
+        offsets = range(0, len(user_ids), chunk_size)
+        chunks = await gather_bounded(
+            (self._resolve_assigned_roles_chunk(user_ids[offset:offset + chunk_size], access_token) for offset in offsets),
+            limit=env.wristband_roles_chunk_concurrency,
+        )
+
+        merged: dict[str, list[dict]] = {'items': [], 'failures': []}
+        for offset, chunk in zip(offsets, chunks):
+            merged['items'].extend(chunk.get('items', []))
+            # Failure indexes are relative to the chunk; rebase them onto the full user_ids list
+            for failure in chunk.get('failures', []):
+                merged['failures'].append({**failure, 'index': failure.get('index', 0) + offset})
+        return merged
+
+    async def _resolve_assigned_roles_chunk(self, user_ids: list[str], access_token: str) -> dict:
+        response: httpx.Response = await self._request(
+            'resolve_assigned_roles_for_users',
+            'POST',
             self.base_url + '/users/resolve-assigned-roles',
             headers={
                 **self.headers,
@@ -241,34 +708,32 @@ class WristbandClient:
             },
             json={
                 'userIds': user_ids
-            }
+            },
         )
-
-        if response.status_code != 200:
-            raise ValueError(f'Error calling resolve_assigned_roles_for_users: {response.status_code} - {response.text}')
         
         return response.json() if response.content else {}
 
     async def resolve_assignable_roles_for_user(self, user_id: str, access_token: str) -> list[dict]:
         # Resolve Assignable Roles for a User API - https://docs.wristband.dev/reference/resolveassignablerolesforuserv1
-        response: httpx.Response = await self.client.post(
+        response: httpx.Response = await self._request(
+            'resolve_assignable_roles_for_user',
+            'POST',
             self.base_url + f'/users/{user_id}/resolve-assignable-roles',
             headers={
                 **self.headers,
                 'Authorization': f'Bearer {access_token}'
-            }
+            },
         )
 
-        if response.status_code != 200:
-            raise ValueError(f'Error calling resolve_assignable_roles_for_user: {response.status_code} - {response.text}')
-
         data = response.json() if response.content else {}
         # The API returns a list with items property
         return data.get('items', []) if isinstance(data, dict) else data
 
     async def update_user_role_assignments(self, user_id: str, role_ids: list[str], access_token: str) -> None:
         # Update User Role Assignments API - https://docs.wristband.dev/reference/updateuserroleassignmentsv1
-        response: httpx.Response = await self.client.put(
+        await self._request(
+            'update_user_role_assignments',
+            'PUT',
             self.base_url + f'/users/{user_id}/roles',
             headers={
                 **self.headers,
@@ -276,15 +741,16 @@ class WristbandClient:
             },
             json={
                 'roleIds': role_ids
-            }
+            },
+            expected=(200, 204),
+            idempotent=True,
         )
 
-        if response.status_code not in [200, 204]:
-            raise ValueError(f'Error calling update_user_role_assignments: {response.status_code} - {response.text}')
-
     async def unassign_roles_from_user(self, user_id: str, role_ids: list[str], access_token: str) -> None:
         # Unassign Roles from User API - https://docs.wristband.dev/reference/unassignrolesfromuserv1
-        response: httpx.Response = await self.client.post(
+        await self._request(
+            'unassign_roles_from_user',
+            'POST',
             self.base_url + f'/users/{user_id}/unassign-roles',
             headers={
                 **self.headers,
@@ -292,15 +758,15 @@ class WristbandClient:
             },
             json={
                 'roleIds': role_ids
-            }
+            },
+            expected=(200, 204),
         )
 
-        if response.status_code not in [200, 204]:
-            raise ValueError(f'Error calling unassign_roles_from_user: {response.status_code} - {response.text}')
-
     async def query_tenant_roles(self, tenant_id: str, access_token: str) -> list[dict]:
         # Query Tenant Roles API - https://docs.wristband.dev/reference/querytenantrolesv1
-        response: httpx.Response = await self.client.get(
+        response: httpx.Response = await self._request(
+            'query_tenant_roles',
+            'GET',
             self.base_url + f'/tenants/{tenant_id}/roles',
             headers={
                 **self.headers,
@@ -308,12 +774,9 @@ class WristbandClient:
             },
             params={
                 'include_application_roles': 'true'
-            }
+            },
         )
 
-        if response.status_code != 200:
-            raise ValueError(f'Error calling query_tenant_roles: {response.status_code} - {response.text}')
-
         data = response.json() if response.content else {}
         # The API returns a list with items property
         return data.get('items', []) if isinstance(data, dict) else data
@@ -323,22 +786,23 @@ class WristbandClient:
     ############################################################################################
     async def get_tenant(self, tenant_id: str, access_token: str) -> dict:
         # Get Tenant API - https://docs.wristband.dev/reference/gettenantv1
-        response: httpx.Response = await self.client.get(
+        response: httpx.Response = await self._request(
+            'get_tenant',
+            'GET',
             self.base_url + f'/tenants/{tenant_id}',
             headers={
                 **self.headers,
                 'Authorization': f'Bearer {access_token}'
-            }
+            },
         )
 
-        if response.status_code != 200:
-            raise ValueError(f'Error calling get_tenant: {response.status_code} - {response.text}')
-
         return response.json() if response.content else {}
 
     async def update_tenant(self, tenant_id: str, data: dict[str, Any], access_token: str) -> dict:
         # Update Tenant API - https://docs.wristband.dev/reference/patchtenantv1
-        response: httpx.Response = await self.client.patch(
+        response: httpx.Response = await self._request(
+            'update_tenant',
+            'PATCH',
             self.base_url + f'/tenants/{tenant_id}',
             headers={
                 **self.headers,
@@ -347,9 +811,6 @@ class WristbandClient:
             json=data,
         )
 
-        if response.status_code != 200:
-            raise ValueError(f'Error calling update_tenant: {response.status_code} - {response.text}')
-
         return response.json() if response.content else {}
 
     ############################################################################################
@@ -363,32 +824,32 @@ class WristbandClient:
             'status': 'ENABLED'
         }
 
-        response: httpx.Response = await self.client.post(
+        await self._request(
+            'upsert_idp_override_toggle',
+            'POST',
             self.base_url + '/identity-provider-override-toggles?upsert=true',
             headers={
                 **self.headers,
                 'Authorization': f'Bearer {access_token}'
             },
             json=payload,
+            expected=(200, 201, 204),
         )
 
-        if response.status_code not in [200, 201, 204]:
-            raise ValueError(f'Error calling upsert_idp_override_toggle: {response.status_code} - {response.text}')
-
     async def upsert_identity_provider(self, idp_data: dict[str, Any], access_token: str) -> dict:
         # Upsert Identity Provider API - https://docs.wristband.dev/reference/upsertidentityproviderv1
-        response: httpx.Response = await self.client.post(
+        response: httpx.Response = await self._request(
+            'upsert_identity_provider',
+            'POST',
             self.base_url + '/identity-providers?upsert=true',
             headers={
                 **self.headers,
                 'Authorization': f'Bearer {access_token}'
             },
             json=idp_data,
+            expected=(200, 201),
         )
 
-        if response.status_code not in [200, 201]:
-            raise ValueError(f'Error calling upsert_identity_provider: {response.status_code} - {response.text}')
-
         return response.json() if response.content else {}
     
     async def upsert_google_saml_identity_provider(self, tenant_id: str, access_token: str, metadata: dict[str, Any]) -> dict:
@@ -429,18 +890,18 @@ class WristbandClient:
             'status': 'ENABLED',
         }
 
-        response: httpx.Response = await self.client.post(
+        response: httpx.Response = await self._request(
+            'upsert_google_saml_identity_provider',
+            'POST',
             self.base_url + '/identity-providers?upsert=true',
             headers={
                 **self.headers,
                 'Authorization': f'Bearer {access_token}'
             },
             json=payload,
+            expected=(200, 201),
         )
 
-        if response.status_code not in [200, 201]:
-            raise ValueError(f'Error calling upsert_google_saml_identity_provider: {response.status_code} - {response.text}')
-
         return response.json() if response.content else {}
     
     async def upsert_okta_identity_provider(self, tenant_id: str, access_token: str, domain_name: str, client_id: str, client_secret: str, enabled: bool = True) -> dict:
@@ -463,39 +924,40 @@ class WristbandClient:
             'status': 'ENABLED' if enabled else 'DISABLED',
         }
 
-        response: httpx.Response = await self.client.post(
+        response: httpx.Response = await self._request(
+            'upsert_okta_identity_provider',
+            'POST',
             self.base_url + '/identity-providers?upsert=true',
             headers={
                 **self.headers,
                 'Authorization': f'Bearer {access_token}'
             },
             json=payload,
+            expected=(200, 201),
         )
 
-        if response.status_code not in [200, 201]:
-            raise ValueError(f'Error calling upsert_okta_identity_provider: {response.status_code} - {response.text}')
-
         return response.json() if response.content else {}
     
     async def get_identity_providers(self, tenant_id: str, access_token: str) -> list[dict]:
         # Query Tenant Identity Providers API - https://docs.wristband.dev/reference/querytenantidentityprovidersv1
-        response = await self.client.get(
+        response = await self._request(
+            'get_identity_providers',
+            'GET',
             f"{self.base_url}/tenants/{tenant_id}/identity-providers",
             headers={
                 'Authorization': f'Bearer {access_token}',
                 'Accept': 'application/json',
-            }
+            },
         )
 
-        if response.status_code != 200:
-            raise ValueError(f'Error calling get_identity_providers: {response.status_code} - {response.text}')
-
         data = response.json() if response.content else []
         return data.get('items', []) if isinstance(data, dict) else data
 
     async def resolve_idp_redirect_url_overrides(self, tenant_id: str, access_token: str) -> list[dict]:
         # Resolve IDP Redirect URL Overrides - returns configured redirect URLs for IDPs in tenant
-        response = await self.client.post(
+        response = await self._request(
+            'resolve_idp_redirect_url_overrides',
+            'POST',
             f"{self.base_url}/tenants/{tenant_id}/identity-providers/resolve-redirect-urls",
             headers={
                 'Authorization': f'Bearer {access_token}',
@@ -505,17 +967,14 @@ class WristbandClient:
             json={'identityProviderTypes': ['OKTA']},
         )
 
-        if response.status_code != 200:
-            raise ValueError(
-                f'Error calling resolve_idp_redirect_url_overrides: {response.status_code} - {response.text}'
-            )
-
         data = response.json() if response.content else {}
         return data.get('items', [])
 
     async def test_idp_connection(self, tenant_id: str, access_token: str, idp_type: str = 'OKTA') -> bool:
         """Ping the Wristband test-connection endpoint for the given IDP type."""
-        response = await self.client.post(
+        response = await self._request(
+            'test_idp_connection',
+            'POST',
             f"{self.base_url}/tenants/{tenant_id}/identity-providers/test-connection",
             headers={
                 'Authorization': f'Bearer {access_token}',
@@ -525,10 +984,6 @@ class WristbandClient:
             json={'identityProviderType': idp_type},
         )
 
-        if response.status_code != 200:
-            raise ValueError(
-                f'Error calling test_idp_connection: {response.status_code} - {response.text}'
-            )
         data = response.json() if response.content else {}
         return bool(data.get('ok', True))
 
@@ -537,7 +992,9 @@ class WristbandClient:
     ############################################################################################
     async def fetch_tenants(self, access_token: str, application_id: str, email: str) -> list[dict]:
         # Fetch Tenants API - https://docs.wristband.dev/reference/fetchtenantsv1
-        response: httpx.Response = await self.client.post(
+        response: httpx.Response = await self._request(
+            'fetch_tenants',
+            'POST',
             self.base_url + '/tenant-discovery/fetch-tenants',
             headers={
                 **self.headers,
@@ -547,12 +1004,9 @@ class WristbandClient:
                 'applicationId': application_id,
                 'email': email,
                 'clientId': os.getenv("CLIENT_ID")
-            }
+            },
         )
 
-        if response.status_code != 200:
-            raise ValueError(f'Error calling fetch_tenants: {response.status_code} - {response.text}')
-
         data = response.json() if response.content else {}
         return data.get('items', [])
 
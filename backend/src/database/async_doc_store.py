@@ -0,0 +1,569 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Optional, List, Dict, Tuple
+from firebase_admin import firestore_async
+import firebase_admin
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+from google.cloud.firestore_v1.async_client import AsyncClient
+from google.cloud.firestore_v1.async_collection import AsyncCollectionReference
+from google.cloud.firestore_v1.async_document import AsyncDocumentReference
+
+from database import doc_store
+from database.doc_store import (
+    FIRESTORE_BATCH_LIMIT,
+    BatchOperation,
+    BatchWriteResult,
+    DocumentPage,
+    get_firebase_credentials,
+    get_database_id_for_environment,
+    _apply_cursor,
+    _apply_write,
+    _write_option,
+    _build_query,
+    _build_array_contains_query,
+    _chunks,
+)
+
+# Async counterpart of database.doc_store with the same function surface, built on
+# Firestore's AsyncClient so calls from async code never block the event loop.
+
+# =============================================================================
+# MARK: LOGGING & GLOBALS
+# =============================================================================
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# MARK: FIREBASE INITIALIZATION
+# =============================================================================
+
+def initialize_async_firebase() -> AsyncClient:
+    """
+    Initialize Firebase and return the async Firestore client.
+    """
+    try:
+        database_id = get_database_id_for_environment()
+
+        # Initialize Firebase app if not already done (normally done by doc_store on import)
+        if not firebase_admin._apps:
+            cred = get_firebase_credentials()
+            firebase_admin.initialize_app(cred)
+            logger.debug("Successfully initialized Firebase")
+
+        # Create the async Firestore client with the specific database ID
+        async_db = firestore_async.client(database_id=database_id)
+
+        logger.debug(f"Successfully initialized async Firestore client for database: {database_id}")
+        return async_db
+
+    except Exception as e:
+        logger.error(f"Failed to initialize async Firestore: {e}")
+        raise
+
+# =============================================================================
+# MARK: GLOBAL DATABASE INSTANCE
+# =============================================================================
+
+# Initialize the global async db instance
+try:
+    db: Optional[AsyncClient] = initialize_async_firebase()
+    logger.info("✅ Async Firestore initialized successfully")
+except Exception as e:
+    logger.warning(f"⚠️  Async Firestore not available: {e}")
+    db = None
+
+def get_db() -> Optional[AsyncClient]:
+    """Return the global async Firestore client."""
+    return db
+
+def is_database_available() -> bool:
+    """Check if the database is available."""
+    return db is not None
+
+# =============================================================================
+# MARK: HELPER FUNCTIONS
+# =============================================================================
+def _get_collection(collection_path: str, tenant_id: str | None = None) -> AsyncCollectionReference:
+    """
+    Get the collection path for the specified collection and tenant ID.
+    """
+    return db.collection(f"tenants/{tenant_id}/{collection_path}" if tenant_id else collection_path)
+
+def _get_doc_ref(collection_path: str, doc_id: str, tenant_id: str | None = None) -> AsyncDocumentReference:
+    """
+    Get a document reference for the specified collection and document ID.
+    """
+    return _get_collection(collection_path, tenant_id).document(doc_id)
+
+def _get_new_doc_ref(collection_path: str, tenant_id: str | None = None) -> AsyncDocumentReference:
+    """
+    Get a new document reference with auto-generated ID.
+    """
+    return _get_collection(collection_path, tenant_id).document()
+
+async def document_exists(doc_ref: AsyncDocumentReference) -> bool:
+    """
+    Check if a document exists using its reference.
+    Uses an empty field mask, so only document metadata is transferred.
+    """
+    return (await doc_ref.get(field_paths=[])).exists
+
+async def _get_document_data(doc_ref: AsyncDocumentReference, select: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Get document data from a document reference, optionally projected to the select fields.
+    """
+    doc = await doc_ref.get(field_paths=select)
+    return doc.to_dict() if doc.exists else None
+
+# =============================================================================
+# MARK: DOCUMENT OPERATIONS
+# =============================================================================
+
+async def add_document(collection_path: str, data: Dict[str, Any], tenant_id: str | None = None) -> str:
+    """
+    Add a document to a collection.
+    """
+    # Generate ID if not provided
+    if "id" not in data or data["id"] is None:
+        doc_ref = _get_new_doc_ref(collection_path, tenant_id)
+        data["id"] = doc_ref.id
+    else:
+        doc_ref = _get_doc_ref(collection_path, data["id"], tenant_id)
+
+    await doc_ref.set(data)
+    logger.debug(f"Added document with ID: {doc_ref.id}")
+    return doc_ref.id
+
+async def get_document(collection_path: str, doc_id: str, tenant_id: str | None = None, select: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Get a document by ID. Pass select to only transfer the listed fields.
+    """
+    logger.debug(f"Getting document {doc_id} from {collection_path}")
+    doc_ref = _get_doc_ref(collection_path, doc_id, tenant_id)
+    doc_data = await _get_document_data(doc_ref, select)
+
+    if doc_data is not None:
+        logger.debug(f"Document {doc_id} fetched")
+    else:
+        logger.error(f"Document {doc_id} does not exist!")
+
+    return doc_data
+
+async def update_document(collection_path: str, doc_id: str, data: Dict[str, Any], tenant_id: str | None = None) -> Optional[Dict[str, Any]]:
+    """
+    Update a document with new data.
+    Single round trip: update() requires the document to exist and raises NotFound otherwise.
+    """
+    doc_ref = _get_doc_ref(collection_path, doc_id, tenant_id)
+
+    try:
+        await doc_ref.update(data)
+    except NotFound:
+        logger.error(f"Document {doc_id} does not exist!")
+        return None
+
+    logger.debug(f"Document {doc_id} updated with: {data}")
+    return data
+
+async def update_field(collection_path: str, doc_id: str, field: str, value: Any, tenant_id: str | None = None, return_document: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Update a specific field in a document and return the updated document.
+    Pass return_document=False to skip reading it back and get just {field: value}.
+    """
+    doc_ref = _get_doc_ref(collection_path, doc_id, tenant_id)
+
+    try:
+        await doc_ref.update({field: value})
+    except NotFound:
+        logger.error(f"Document {doc_id} does not exist!")
+        return None
+
+    logger.debug(f"Document {doc_id} updated with: {field} = {value}")
+
+    if not return_document:
+        return {field: value}
+    return await _get_document_data(doc_ref)
+
+async def create_document(collection_path: str, doc_id: str, data: Dict[str, Any], tenant_id: str | None = None) -> bool:
+    """
+    Create a document only if it does not exist yet. Returns False if it already existed,
+    so concurrent creators can tell whose write won.
+    """
+    doc_ref = _get_doc_ref(collection_path, doc_id, tenant_id)
+    try:
+        await doc_ref.create(data)
+    except AlreadyExists:
+        logger.debug(f"Document {doc_id} already exists, nothing created")
+        return False
+    logger.debug(f"Document {doc_id} created")
+    return True
+
+async def get_document_version(collection_path: str, doc_id: str, tenant_id: str | None = None) -> Tuple[Optional[Dict[str, Any]], Any]:
+    """
+    Get a document and its last update time, or (None, None) if it does not exist,
+    for a later write_document_if_unchanged().
+    """
+    doc = await _get_doc_ref(collection_path, doc_id, tenant_id).get()
+    return (doc.to_dict(), doc.update_time) if doc.exists else (None, None)
+
+async def write_document_if_unchanged(collection_path: str, doc_id: str, data: Dict[str, Any], update_time: Any, tenant_id: str | None = None) -> Any:
+    """
+    Write data only if nobody has written the document since update_time (from
+    get_document_version() or a previous call); with update_time=None, only create it.
+    Fields not in data are kept. Returns the new update time, or None if the document
+    changed, so callers can use it as an optimistic lock.
+    """
+    doc_ref = _get_doc_ref(collection_path, doc_id, tenant_id)
+    try:
+        if update_time is None:
+            write_result = await doc_ref.create(data)
+        else:
+            write_result = await doc_ref.update(data, option=_write_option({doc_id: update_time}, doc_id))
+    except (AlreadyExists, FailedPrecondition, NotFound):
+        logger.debug(f"Document {doc_id} changed since it was read, nothing written")
+        return None
+    logger.debug(f"Document {doc_id} written")
+    return write_result.update_time
+
+async def set_document(collection_path: str, doc_id: str, data: Dict[str, Any], tenant_id: str | None = None) -> Dict[str, Any]:
+    """
+    Set a document with new data. Creates the document if it doesn't exist.
+    """
+    doc_ref = _get_doc_ref(collection_path, doc_id, tenant_id)
+    await doc_ref.set(data, merge=True)
+    logger.debug(f"Document {doc_id} set with: {data}")
+    return data
+
+async def delete_document(collection_path: str, doc_id: str, tenant_id: str | None = None, must_exist: bool = False) -> bool:
+    """
+    Delete a document.
+    With must_exist=True the delete carries an exists precondition and returns False if the
+    document was not there, so callers do not need a separate existence check first.
+    """
+    doc_ref = _get_doc_ref(collection_path, doc_id, tenant_id)
+
+    if must_exist:
+        try:
+            await doc_ref.delete(option=db.write_option(exists=True))
+        except NotFound:
+            logger.debug(f"Document {doc_id} does not exist, nothing deleted")
+            return False
+    else:
+        await doc_ref.delete()
+
+    logger.debug(f"Document {doc_id} deleted")
+    return True
+
+async def doc_exists(collection_path: str, doc_id: str, tenant_id: str | None = None) -> bool:
+    """
+    Check if a document exists.
+    """
+    doc_ref = _get_doc_ref(collection_path, doc_id, tenant_id)
+    return await document_exists(doc_ref)
+
+# =============================================================================
+# MARK: BATCH OPERATIONS
+# =============================================================================
+
+async def get_documents(collection_path: str, doc_ids: List[str], tenant_id: str | None = None, select: Optional[List[str]] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Get many documents by ID in as few round trips as possible (Firestore get_all).
+    Returns doc_id -> data, with None for documents that do not exist.
+    Pass select to only transfer the listed fields.
+    """
+    unique_ids = list(dict.fromkeys(doc_ids))
+    found: Dict[str, Optional[Dict[str, Any]]] = {}
+    for chunk in _chunks(unique_ids, FIRESTORE_BATCH_LIMIT):
+        refs = [_get_doc_ref(collection_path, doc_id, tenant_id) for doc_id in chunk]
+        async for doc in db.get_all(refs, field_paths=select):
+            found[doc.id] = doc.to_dict() if doc.exists else None
+    return {doc_id: found.get(doc_id) for doc_id in unique_ids}
+
+async def batch_set_documents(
+    collection_path: str,
+    documents: Dict[str, Dict[str, Any]],
+    tenant_id: str | None = None,
+    bulk: bool = False,
+    max_ops_per_second: Optional[int] = None,
+) -> BatchWriteResult:
+    """
+    Set (merge) many documents, keyed by document ID.
+    """
+    ops: List[BatchOperation] = [("set", doc_id, data) for doc_id, data in documents.items()]
+    return await _write_documents(collection_path, ops, tenant_id, bulk, max_ops_per_second)
+
+async def batch_update_documents(
+    collection_path: str,
+    updates: Dict[str, Dict[str, Any]],
+    tenant_id: str | None = None,
+    bulk: bool = False,
+    max_ops_per_second: Optional[int] = None,
+    if_unchanged_since: Optional[Dict[str, Any]] = None,
+) -> BatchWriteResult:
+    """
+    Update fields on many existing documents, keyed by document ID.
+    Pass if_unchanged_since (doc_id -> update_time, e.g. from DocumentPage.update_times) to
+    only update documents nobody has written since they were read; with WriteBatch commits
+    a failed precondition fails its whole chunk.
+    """
+    ops: List[BatchOperation] = [("update", doc_id, data) for doc_id, data in updates.items()]
+    return await _write_documents(collection_path, ops, tenant_id, bulk, max_ops_per_second, if_unchanged_since)
+
+async def batch_delete_documents(
+    collection_path: str,
+    doc_ids: List[str],
+    tenant_id: str | None = None,
+    bulk: bool = False,
+    max_ops_per_second: Optional[int] = None,
+) -> BatchWriteResult:
+    """
+    Delete many documents by ID.
+    """
+    ops: List[BatchOperation] = [("delete", doc_id, None) for doc_id in doc_ids]
+    return await _write_documents(collection_path, ops, tenant_id, bulk, max_ops_per_second)
+
+async def _write_documents(
+    collection_path: str,
+    ops: List[BatchOperation],
+    tenant_id: str | None,
+    bulk: bool,
+    max_ops_per_second: Optional[int],
+    preconditions: Optional[Dict[str, Any]] = None,
+) -> BatchWriteResult:
+    """
+    Apply write operations as WriteBatch commits of up to FIRESTORE_BATCH_LIMIT operations.
+
+    BulkWriter is thread-based and only works with the sync client, so bulk=True runs
+    doc_store's BulkWriter path in a worker thread instead of on the event loop.
+    """
+    if bulk:
+        return await asyncio.to_thread(
+            doc_store._bulk_write_documents, collection_path, ops, tenant_id, max_ops_per_second, preconditions
+        )
+
+    result = BatchWriteResult()
+    for chunk in _chunks(ops, FIRESTORE_BATCH_LIMIT):
+        batch = db.batch()
+        for op, doc_id, data in chunk:
+            _apply_write(batch, op, _get_doc_ref(collection_path, doc_id, tenant_id), data, _write_option(preconditions, doc_id))
+        try:
+            await batch.commit()
+            result.succeeded.extend(doc_id for _, doc_id, _ in chunk)
+        except Exception as e:
+            logger.error(f"Batch commit of {len(chunk)} operations failed: {e}")
+            result.failed.update({doc_id: str(e) for _, doc_id, _ in chunk})
+
+    logger.debug(f"Batch write to {collection_path}: {len(result.succeeded)} succeeded, {len(result.failed)} failed")
+    return result
+
+# =============================================================================
+# MARK: QUERY OPERATIONS
+# =============================================================================
+
+async def stream_documents(
+    collection_path: str,
+    tenant_id: str | None = None,
+    where_field: Optional[str] = None,
+    where_operator: Optional[str] = None,
+    where_value: Optional[Any] = None,
+    order_by_field: Optional[str] = None,
+    order_direction: str = "ASC",
+    where_field_2: Optional[str] = None,
+    where_operator_2: Optional[str] = None,
+    where_value_2: Optional[Any] = None,
+    limit: Optional[int] = None,
+    select: Optional[List[str]] = None,
+    start_after: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Lazily yield documents in a collection with optional filtering, ordering and limit.
+    Documents are yielded as they arrive; breaking out early stops the underlying stream.
+    Pass select to only transfer the listed fields (an empty list fetches keys only).
+    Pass start_after (a document ID) to resume after that document in document ID order.
+    """
+    query = _build_query(
+        _get_collection(collection_path, tenant_id),
+        where_field=where_field,
+        where_operator=where_operator,
+        where_value=where_value,
+        order_by_field=order_by_field,
+        order_direction=order_direction,
+        where_field_2=where_field_2,
+        where_operator_2=where_operator_2,
+        where_value_2=where_value_2,
+        select=select,
+    )
+    query = _apply_cursor(query, start_after, order_by_field)
+    if limit is not None:
+        query = query.limit(limit)
+
+    async for doc_data in _stream_query(query):
+        yield doc_data
+
+async def stream_documents_array_contains(
+    collection_path: str,
+    array_field: str,
+    contains_value: Any,
+    tenant_id: str | None = None,
+    additional_where_field: Optional[str] = None,
+    additional_where_operator: Optional[str] = None,
+    additional_where_value: Optional[Any] = None,
+    order_by_field: Optional[str] = None,
+    order_direction: str = "ASC",
+    limit: Optional[int] = None,
+    select: Optional[List[str]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Lazily yield documents where an array field contains a specific value.
+    """
+    query = _build_array_contains_query(
+        _get_collection(collection_path, tenant_id),
+        array_field=array_field,
+        contains_value=contains_value,
+        additional_where_field=additional_where_field,
+        additional_where_operator=additional_where_operator,
+        additional_where_value=additional_where_value,
+        order_by_field=order_by_field,
+        order_direction=order_direction,
+        select=select,
+    )
+    if limit is not None:
+        query = query.limit(limit)
+
+    async for doc_data in _stream_query(query):
+        yield doc_data
+
+async def stream_document_pages(
+    collection_path: str,
+    page_size: int,
+    tenant_id: str | None = None,
+    **query_kwargs: Any,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield documents in lists of at most page_size, so callers can serve large collections
+    page by page without holding more than one page in memory.
+    Accepts the same filter/order/limit keyword arguments as stream_documents.
+    """
+    stream = stream_documents(collection_path, tenant_id=tenant_id, **query_kwargs)
+    page: List[Dict[str, Any]] = []
+    try:
+        async for doc_data in stream:
+            page.append(doc_data)
+            if len(page) >= page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+    finally:
+        await stream.aclose()
+
+async def query_document_page(
+    collection_path: str,
+    page_size: int,
+    tenant_id: str | None = None,
+    cursor: Optional[str] = None,
+    **query_kwargs: Any,
+) -> DocumentPage:
+    """
+    Fetch at most page_size documents after cursor, in document ID order.
+    One extra document is read to tell whether another page follows, so the last page
+    never costs an empty round trip. Accepts the same filter keyword arguments as
+    stream_documents, except order_by_field.
+    """
+    if query_kwargs.get("order_by_field"):
+        raise ValueError("query_document_page pages in document ID order and cannot be combined with order_by_field")
+    query = _build_query(_get_collection(collection_path, tenant_id), **query_kwargs).order_by("__name__")
+    if cursor is not None:
+        query = query.start_after({"__name__": cursor})
+
+    docs = [doc async for doc in query.limit(page_size + 1).stream()]
+    page = DocumentPage(
+        documents=[doc.to_dict() for doc in docs[:page_size]],
+        update_times={doc.id: doc.update_time for doc in docs[:page_size]},
+    )
+    if len(docs) > page_size:
+        page.next_cursor = docs[page_size - 1].id
+    return page
+
+async def _stream_query(query: Any) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield document data from a query, closing the server stream when the caller stops early.
+    """
+    stream = query.stream()
+    count = 0
+    try:
+        async for doc in stream:
+            count += 1
+            yield doc.to_dict()
+    finally:
+        await stream.aclose()
+        logger.debug(f"Streamed {count} documents")
+
+async def query_documents(
+    collection_path: str,
+    tenant_id: str | None = None,
+    where_field: Optional[str] = None,
+    where_operator: Optional[str] = None,
+    where_value: Optional[Any] = None,
+    order_by_field: Optional[str] = None,
+    order_direction: str = "ASC",
+    where_field_2: Optional[str] = None,
+    where_operator_2: Optional[str] = None,
+    where_value_2: Optional[Any] = None,
+    limit: Optional[int] = None,
+    select: Optional[List[str]] = None,
+    start_after: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Query documents in a collection with optional filtering, ordering and limit.
+    Pass start_after (a document ID) to resume after that document in document ID order.
+    """
+    return [
+        doc_data async for doc_data in stream_documents(
+            collection_path,
+            tenant_id=tenant_id,
+            where_field=where_field,
+            where_operator=where_operator,
+            where_value=where_value,
+            order_by_field=order_by_field,
+            order_direction=order_direction,
+            where_field_2=where_field_2,
+            where_operator_2=where_operator_2,
+            where_value_2=where_value_2,
+            limit=limit,
+            select=select,
+            start_after=start_after,
+        )
+    ]
+
+async def query_documents_array_contains(
+    collection_path: str,
+    array_field: str,
+    contains_value: Any,
+    tenant_id: str | None = None,
+    additional_where_field: Optional[str] = None,
+    additional_where_operator: Optional[str] = None,
+    additional_where_value: Optional[Any] = None,
+    order_by_field: Optional[str] = None,
+    order_direction: str = "ASC",
+    limit: Optional[int] = None,
+    select: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Query documents in a collection where an array field contains a specific value.
+    """
+    return [
+        doc_data async for doc_data in stream_documents_array_contains(
+            collection_path,
+            array_field=array_field,
+            contains_value=contains_value,
+            tenant_id=tenant_id,
+            additional_where_field=additional_where_field,
+            additional_where_operator=additional_where_operator,
+            additional_where_value=additional_where_value,
+            order_by_field=order_by_field,
+            order_direction=order_direction,
+            limit=limit,
+            select=select,
+        )
+    ]
@@ -2,9 +2,12 @@ import os
 import logging
 import tempfile
 import base64
-from typing import Any, Optional, List, Dict
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional, List, Dict, Sequence, Tuple
 from firebase_admin import firestore, credentials
 import firebase_admin
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+from google.cloud.firestore_v1.bulk_writer import BulkWriteFailure, BulkWriter, BulkWriterOptions
 from google.cloud.firestore_v1.client import Client, CollectionReference
 from google.cloud.firestore_v1.document import DocumentReference
 from google.cloud.firestore_v1.query import Query
@@ -20,6 +23,41 @@ QUERY_DIRECTIONS = {
     "DESC": Query.DESCENDING
 }
 
+# Maximum number of operations Firestore accepts in one WriteBatch commit
+FIRESTORE_BATCH_LIMIT = 500
+
+# gRPC status codes a BulkWriter write is retried on
+# (DEADLINE_EXCEEDED, RESOURCE_EXHAUSTED, ABORTED, INTERNAL, UNAVAILABLE)
+BULK_WRITER_RETRYABLE_CODES = {4, 8, 10, 13, 14}
+BULK_WRITER_MAX_ATTEMPTS = 5
+
+# Batched write operations: (op, doc_id, data) where op is "set", "update" or "delete"
+BatchOperation = Tuple[str, str, Optional[Dict[str, Any]]]
+
+@dataclass
+class BatchWriteResult:
+    """
+    Per-document outcome of a batched write.
+    """
+    succeeded: List[str] = field(default_factory=list)
+    # doc_id -> error message
+    failed: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+@dataclass
+class DocumentPage:
+    """
+    One page of a cursor-paginated query.
+    """
+    documents: List[Dict[str, Any]] = field(default_factory=list)
+    # Document ID to pass as start_after for the next page; None on the last page
+    next_cursor: Optional[str] = None
+    # doc_id -> last update time, usable as a write precondition
+    update_times: Dict[str, Any] = field(default_factory=dict)
+
 # =============================================================================
 # MARK: LOGGING & GLOBALS
 # =============================================================================
@@ -139,16 +177,112 @@ def _get_new_doc_ref(collection_path: str, tenant_id: str | None = None) -> Docu
 def document_exists(doc_ref: DocumentReference) -> bool:
     """
     Check if a document exists using its reference.
+    Uses an empty field mask, so only document metadata is transferred.
     """
-    return doc_ref.get().exists
+    return doc_ref.get(field_paths=[]).exists
 
-def _get_document_data(doc_ref: DocumentReference) -> Optional[Dict[str, Any]]:
+def _get_document_data(doc_ref: DocumentReference, select: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
     """
-    Get document data from a document reference.
+    Get document data from a document reference, optionally projected to the select fields.
     """
-    doc = doc_ref.get()
+    doc = doc_ref.get(field_paths=select)
     return doc.to_dict() if doc.exists else None
 
+def _chunks(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    """
+    Split a sequence into consecutive chunks of at most size items.
+    """
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+# =============================================================================
+# MARK: QUERY BUILDERS
+# =============================================================================
+# Query projection that returns document keys only (an empty projection means "all fields")
+KEY_ONLY_PROJECTION = ["__name__"]
+
+def _apply_select(query: Any, select: Optional[List[str]]) -> Any:
+    """
+    Project a query to the select fields. An empty list selects document keys only.
+    """
+    if select is None:
+        return query
+    return query.select(select or KEY_ONLY_PROJECTION)
+
+# Shared by the sync functions below and database.async_doc_store; the sync and async
+# collection/query classes expose the same where/order_by API.
+
+def _build_query(
+    collection_ref: Any,
+    where_field: Optional[str] = None,
+    where_operator: Optional[str] = None,
+    where_value: Optional[Any] = None,
+    order_by_field: Optional[str] = None,
+    order_direction: str = "ASC",
+    where_field_2: Optional[str] = None,
+    where_operator_2: Optional[str] = None,
+    where_value_2: Optional[Any] = None,
+    select: Optional[List[str]] = None,
+) -> Any:
+    """
+    Apply optional filtering and ordering to a collection reference.
+    """
+    query = collection_ref
+
+    # Apply first where clause
+    if where_field and where_operator and where_value is not None:
+        query = query.where(where_field, where_operator, where_value)
+        
+        # Apply second where clause if provided
+        if where_field_2 and where_operator_2 and where_value_2 is not None:
+            query = query.where(where_field_2, where_operator_2, where_value_2)
+
+    # Apply ordering if specified
+    if order_by_field:
+        direction = QUERY_DIRECTIONS.get(order_direction, Query.ASCENDING)
+        query = query.order_by(order_by_field, direction=direction)
+
+    return _apply_select(query, select)
+
+def _build_array_contains_query(
+    collection_ref: Any,
+    array_field: str,
+    contains_value: Any,
+    additional_where_field: Optional[str] = None,
+    additional_where_operator: Optional[str] = None,
+    additional_where_value: Optional[Any] = None,
+    order_by_field: Optional[str] = None,
+    order_direction: str = "ASC",
+    select: Optional[List[str]] = None,
+) -> Any:
+    """
+    Build a query where an array field contains a specific value.
+    """
+    # Start with the array_contains query
+    query = collection_ref.where(array_field, 'array_contains', contains_value)
+    
+    # Add additional where clause if provided
+    if additional_where_field and additional_where_operator and additional_where_value is not None:
+        query = query.where(additional_where_field, additional_where_operator, additional_where_value)
+    
+    # Apply ordering if specified
+    if order_by_field:
+        direction = QUERY_DIRECTIONS.get(order_direction, Query.ASCENDING)
+        query = query.order_by(order_by_field, direction=direction)
+
+    return _apply_select(query, select)
+
+def _apply_cursor(query: Any, start_after: Optional[str], order_by_field: Optional[str] = None) -> Any:
+    """
+    Resume a query after the document with ID start_after.
+    Cursors page in document ID order, so they cannot be combined with order_by_field.
+    """
+    if start_after is None:
+        return query
+    if order_by_field:
+        raise ValueError("start_after cursors page in document ID order and cannot be combined with order_by_field")
+    return query.order_by("__name__").start_after({"__name__": start_after})
+
 # =============================================================================
 # MARK: DOCUMENT OPERATIONS
 # =============================================================================
@@ -168,16 +302,16 @@ def add_document(collection_path: str, data: Dict[str, Any], tenant_id: str | No
     logger.debug(f"Added document with ID: {doc_ref.id}")
     return doc_ref.id
 
-def get_document(collection_path: str, doc_id: str, tenant_id: str | None = None) -> Optional[Dict[str, Any]]:
+def get_document(collection_path: str, doc_id: str, tenant_id: str | None = None, select: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
     """
-    Get a document by ID.
+    Get a document by ID. Pass select to only transfer the listed fields.
     """
     logger.debug(f"Getting document {doc_id} from {collection_path}")
     doc_ref = _get_doc_ref(collection_path, doc_id, tenant_id)
-    doc_data = _get_document_data(doc_ref)
+    doc_data = _get_document_data(doc_ref, select)
     
-    if doc_data:
-        logger.debug(f"Document data: {doc_data}")
+    if doc_data is not None:
+        logger.debug(f"Document {doc_id} fetched")
     else:
         logger.error(f"Document {doc_id} does not exist!")
     
@@ -186,32 +320,79 @@ def get_document(collection_path: str, doc_id: str, tenant_id: str | None = None
 def update_document(collection_path: str, doc_id: str, data: Dict[str, Any], tenant_id: str | None = None) -> Optional[Dict[str, Any]]:
     """
     Update a document with new data.
+    Single round trip: update() requires the document to exist and raises NotFound otherwise.
     """
     doc_ref = _get_doc_ref(collection_path, doc_id, tenant_id)
-    
-    if not document_exists(doc_ref):
+
+    try:
+        doc_ref.update(data)
+    except NotFound:
         logger.error(f"Document {doc_id} does not exist!")
         return None
-    
-    doc_ref.update(data)
+
     logger.debug(f"Document {doc_id} updated with: {data}")
     return data
 
-def update_field(collection_path: str, doc_id: str, field: str, value: Any, tenant_id: str | None = None) -> Optional[Dict[str, Any]]:
+def update_field(collection_path: str, doc_id: str, field: str, value: Any, tenant_id: str | None = None, return_document: bool = True) -> Optional[Dict[str, Any]]:
     """
-    Update a specific field in a document.
+    Update a specific field in a document and return the updated document.
+    Pass return_document=False to skip reading it back and get just {field: value}.
     """
     doc_ref = _get_doc_ref(collection_path, doc_id, tenant_id)
 
-    if not document_exists(doc_ref):
+    try:
+        doc_ref.update({field: value})
+    except NotFound:
         logger.error(f"Document {doc_id} does not exist!")
         return None
-    
-    doc_ref.update({field: value})
+
     logger.debug(f"Document {doc_id} updated with: {field} = {value}")
 
+    if not return_document:
+        return {field: value}
     return _get_document_data(doc_ref)
 
+def create_document(collection_path: str, doc_id: str, data: Dict[str, Any], tenant_id: str | None = None) -> bool:
+    """
+    Create a document only if it does not exist yet. Returns False if it already existed,
+    so concurrent creators can tell whose write won.
+    """
+    doc_ref = _get_doc_ref(collection_path, doc_id, tenant_id)
+    try:
+        doc_ref.create(data)
+    except AlreadyExists:
+        logger.debug(f"Document {doc_id} already exists, nothing created")
+        return False
+    logger.debug(f"Document {doc_id} created")
+    return True
+
+def get_document_version(collection_path: str, doc_id: str, tenant_id: str | None = None) -> Tuple[Optional[Dict[str, Any]], Any]:
+    """
+    Get a document and its last update time, or (None, None) if it does not exist,
+    for a later write_document_if_unchanged().
+    """
+    doc = _get_doc_ref(collection_path, doc_id, tenant_id).get()
+    return (doc.to_dict(), doc.update_time) if doc.exists else (None, None)
+
+def write_document_if_unchanged(collection_path: str, doc_id: str, data: Dict[str, Any], update_time: Any, tenant_id: str | None = None) -> Any:
+    """
+    Write data only if nobody has written the document since update_time (from
+    get_document_version() or a previous call); with update_time=None, only create it.
+    Fields not in data are kept. Returns the new update time, or None if the document
+    changed, so callers can use it as an optimistic lock.
+    """
+    doc_ref = _get_doc_ref(collection_path, doc_id, tenant_id)
+    try:
+        if update_time is None:
+            write_result = doc_ref.create(data)
+        else:
+            write_result = doc_ref.update(data, option=_write_option({doc_id: update_time}, doc_id))
+    except (AlreadyExists, FailedPrecondition, NotFound):
+        logger.debug(f"Document {doc_id} changed since it was read, nothing written")
+        return None
+    logger.debug(f"Document {doc_id} written")
+    return write_result.update_time
+
 def set_document(collection_path: str, doc_id: str, data: Dict[str, Any], tenant_id: str | None = None) -> Dict[str, Any]:
     """
     Set a document with new data. Creates the document if it doesn't exist.
@@ -221,12 +402,23 @@ def set_document(collection_path: str, doc_id: str, data: Dict[str, Any], tenant
     logger.debug(f"Document {doc_id} set with: {data}")
     return data
 
-def delete_document(collection_path: str, doc_id: str, tenant_id: str | None = None) -> bool:
+def delete_document(collection_path: str, doc_id: str, tenant_id: str | None = None, must_exist: bool = False) -> bool:
     """
     Delete a document.
+    With must_exist=True the delete carries an exists precondition and returns False if the
+    document was not there, so callers do not need a separate existence check first.
     """
     doc_ref = _get_doc_ref(collection_path, doc_id, tenant_id)
-    doc_ref.delete()
+
+    if must_exist:
+        try:
+            doc_ref.delete(option=db.write_option(exists=True))
+        except NotFound:
+            logger.debug(f"Document {doc_id} does not exist, nothing deleted")
+            return False
+    else:
+        doc_ref.delete()
+
     logger.debug(f"Document {doc_id} deleted")
     return True
 
@@ -237,10 +429,297 @@ def doc_exists(collection_path: str, doc_id: str, tenant_id: str | None = None)
     doc_ref = _get_doc_ref(collection_path, doc_id, tenant_id)
     return document_exists(doc_ref)
 
+# =============================================================================
+# MARK: BATCH OPERATIONS
+# =============================================================================
+
+def get_documents(collection_path: str, doc_ids: List[str], tenant_id: str | None = None, select: Optional[List[str]] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Get many documents by ID in as few round trips as possible (Firestore get_all).
+    Returns doc_id -> data, with None for documents that do not exist.
+    Pass select to only transfer the listed fields.
+    """
+    unique_ids = list(dict.fromkeys(doc_ids))
+    found: Dict[str, Optional[Dict[str, Any]]] = {}
+    for chunk in _chunks(unique_ids, FIRESTORE_BATCH_LIMIT):
+        refs = [_get_doc_ref(collection_path, doc_id, tenant_id) for doc_id in chunk]
+        for doc in db.get_all(refs, field_paths=select):
+            found[doc.id] = doc.to_dict() if doc.exists else None
+    return {doc_id: found.get(doc_id) for doc_id in unique_ids}
+
+def batch_set_documents(
+    collection_path: str,
+    documents: Dict[str, Dict[str, Any]],
+    tenant_id: str | None = None,
+    bulk: bool = False,
+    max_ops_per_second: Optional[int] = None,
+) -> BatchWriteResult:
+    """
+    Set (merge) many documents, keyed by document ID.
+    """
+    ops: List[BatchOperation] = [("set", doc_id, data) for doc_id, data in documents.items()]
+    return _write_documents(collection_path, ops, tenant_id, bulk, max_ops_per_second)
+
+def batch_update_documents(
+    collection_path: str,
+    updates: Dict[str, Dict[str, Any]],
+    tenant_id: str | None = None,
+    bulk: bool = False,
+    max_ops_per_second: Optional[int] = None,
+    if_unchanged_since: Optional[Dict[str, Any]] = None,
+) -> BatchWriteResult:
+    """
+    Update fields on many existing documents, keyed by document ID.
+    Pass if_unchanged_since (doc_id -> update_time, e.g. from DocumentPage.update_times) to
+    only update documents nobody has written since they were read; with WriteBatch commits
+    a failed precondition fails its whole chunk.
+    """
+    ops: List[BatchOperation] = [("update", doc_id, data) for doc_id, data in updates.items()]
+    return _write_documents(collection_path, ops, tenant_id, bulk, max_ops_per_second, if_unchanged_since)
+
+def batch_delete_documents(
+    collection_path: str,
+    doc_ids: List[str],
+    tenant_id: str | None = None,
+    bulk: bool = False,
+    max_ops_per_second: Optional[int] = None,
+) -> BatchWriteResult:
+    """
+    Delete many documents by ID.
+    """
+    ops: List[BatchOperation] = [("delete", doc_id, None) for doc_id in doc_ids]
+    return _write_documents(collection_path, ops, tenant_id, bulk, max_ops_per_second)
+
+def _write_documents(
+    collection_path: str,
+    ops: List[BatchOperation],
+    tenant_id: str | None,
+    bulk: bool,
+    max_ops_per_second: Optional[int],
+    preconditions: Optional[Dict[str, Any]] = None,
+) -> BatchWriteResult:
+    """
+    Apply write operations either as WriteBatch commits of up to FIRESTORE_BATCH_LIMIT
+    operations, or (bulk=True) through a throttled BulkWriter for very large loads.
+
+    Each WriteBatch is atomic: if a commit fails, every document in that chunk is reported
+    as failed with the commit error. BulkWriter writes succeed or fail per document.
+    """
+    if bulk:
+        return _bulk_write_documents(collection_path, ops, tenant_id, max_ops_per_second, preconditions)
+
+    result = BatchWriteResult()
+    for chunk in _chunks(ops, FIRESTORE_BATCH_LIMIT):
+        batch = db.batch()
+        for op, doc_id, data in chunk:
+            _apply_write(batch, op, _get_doc_ref(collection_path, doc_id, tenant_id), data, _write_option(preconditions, doc_id))
+        try:
+            batch.commit()
+            result.succeeded.extend(doc_id for _, doc_id, _ in chunk)
+        except Exception as e:
+            logger.error(f"Batch commit of {len(chunk)} operations failed: {e}")
+            result.failed.update({doc_id: str(e) for _, doc_id, _ in chunk})
+
+    logger.debug(f"Batch write to {collection_path}: {len(result.succeeded)} succeeded, {len(result.failed)} failed")
+    return result
+
+def _bulk_write_documents(
+    collection_path: str,
+    ops: List[BatchOperation],
+    tenant_id: str | None,
+    max_ops_per_second: Optional[int],
+    preconditions: Optional[Dict[str, Any]] = None,
+) -> BatchWriteResult:
+    """
+    Apply write operations through a BulkWriter, which batches, parallelises and ramps up
+    throughput under Firestore's 500/50/5 rule. Transient errors are retried per document.
+    """
+    result = BatchWriteResult()
+    options = BulkWriterOptions()
+    if max_ops_per_second:
+        options = BulkWriterOptions(
+            initial_ops_per_second=min(options.initial_ops_per_second, max_ops_per_second),
+            max_ops_per_second=max_ops_per_second,
+        )
+
+    def on_write_result(reference: DocumentReference, write_result: Any, bulk_writer: BulkWriter) -> None:
+        result.succeeded.append(reference.id)
+
+    def on_write_error(failure: BulkWriteFailure, bulk_writer: BulkWriter) -> bool:
+        if failure.code in BULK_WRITER_RETRYABLE_CODES and failure.attempts < BULK_WRITER_MAX_ATTEMPTS:
+            return True
+        result.failed[failure.operation.reference.id] = failure.message
+        return False
+
+    bulk_writer = db.bulk_writer(options)
+    bulk_writer.on_write_result(on_write_result)
+    bulk_writer.on_write_error(on_write_error)
+    for op, doc_id, data in ops:
+        _apply_write(bulk_writer, op, _get_doc_ref(collection_path, doc_id, tenant_id), data, _write_option(preconditions, doc_id))
+    bulk_writer.close()
+
+    logger.debug(f"Bulk write to {collection_path}: {len(result.succeeded)} succeeded, {len(result.failed)} failed")
+    return result
+
+def _write_option(preconditions: Optional[Dict[str, Any]], doc_id: str) -> Any:
+    """
+    Build a last-update-time precondition for doc_id, if one was given.
+    """
+    if preconditions and doc_id in preconditions:
+        return Client.write_option(last_update_time=preconditions[doc_id])
+    return None
+
+def _apply_write(writer: Any, op: str, doc_ref: Any, data: Optional[Dict[str, Any]], option: Any = None) -> None:
+    """
+    Queue one operation on a WriteBatch or BulkWriter (they share set/update/delete).
+    Preconditions (option) apply to update and delete; set merges unconditionally.
+    """
+    if op == "set":
+        writer.set(doc_ref, data, merge=True)
+    elif op == "update":
+        writer.update(doc_ref, data, option=option)
+    elif op == "delete":
+        writer.delete(doc_ref, option=option)
+    else:
+        raise ValueError(f"Unknown batch operation: {op}")
+
 # =============================================================================
 # MARK: QUERY OPERATIONS
 # =============================================================================
 
+def stream_documents(
+    collection_path: str, 
+    tenant_id: str | None = None,
+    where_field: Optional[str] = None, 
+    where_operator: Optional[str] = None, 
+    where_value: Optional[Any] = None,
+    order_by_field: Optional[str] = None,
+    order_direction: str = "ASC",
+    where_field_2: Optional[str] = None,
+    where_operator_2: Optional[str] = None,
+    where_value_2: Optional[Any] = None,
+    limit: Optional[int] = None,
+    select: Optional[List[str]] = None,
+    start_after: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield documents in a collection with optional filtering, ordering and limit.
+    Documents are yielded as they arrive; breaking out early stops the underlying stream.
+    Pass select to only transfer the listed fields (an empty list fetches keys only).
+    Pass start_after (a document ID) to resume after that document in document ID order.
+    """
+    query = _build_query(
+        _get_collection(collection_path, tenant_id),
+        where_field=where_field,
+        where_operator=where_operator,
+        where_value=where_value,
+        order_by_field=order_by_field,
+        order_direction=order_direction,
+        where_field_2=where_field_2,
+        where_operator_2=where_operator_2,
+        where_value_2=where_value_2,
+        select=select,
+    )
+    query = _apply_cursor(query, start_after, order_by_field)
+    if limit is not None:
+        query = query.limit(limit)
+
+    yield from _stream_query(query)
+
+def stream_documents_array_contains(
+    collection_path: str, 
+    array_field: str, 
+    contains_value: Any,
+    tenant_id: str | None = None,
+    additional_where_field: Optional[str] = None,
+    additional_where_operator: Optional[str] = None,
+    additional_where_value: Optional[Any] = None,
+    order_by_field: Optional[str] = None,
+    order_direction: str = "ASC",
+    limit: Optional[int] = None,
+    select: Optional[List[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield documents where an array field contains a specific value.
+    """
+    query = _build_array_contains_query(
+        _get_collection(collection_path, tenant_id),
+        array_field=array_field,
+        contains_value=contains_value,
+        additional_where_field=additional_where_field,
+        additional_where_operator=additional_where_operator,
+        additional_where_value=additional_where_value,
+        order_by_field=order_by_field,
+        order_direction=order_direction,
+        select=select,
+    )
+    if limit is not None:
+        query = query.limit(limit)
+
+    yield from _stream_query(query)
+
+def stream_document_pages(
+    collection_path: str,
+    page_size: int,
+    tenant_id: str | None = None,
+    **query_kwargs: Any,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield documents in lists of at most page_size, so callers can serve large collections
+    page by page without holding more than one page in memory.
+    Accepts the same filter/order/limit keyword arguments as stream_documents.
+    """
+    page: List[Dict[str, Any]] = []
+    for doc_data in stream_documents(collection_path, tenant_id=tenant_id, **query_kwargs):
+        page.append(doc_data)
+        if len(page) >= page_size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+def query_document_page(
+    collection_path: str,
+    page_size: int,
+    tenant_id: str | None = None,
+    cursor: Optional[str] = None,
+    **query_kwargs: Any,
+) -> DocumentPage:
+    """
+    Fetch at most page_size documents after cursor, in document ID order.
+    One extra document is read to tell whether another page follows, so the last page
+    never costs an empty round trip. Accepts the same filter keyword arguments as
+    stream_documents, except order_by_field.
+    """
+    if query_kwargs.get("order_by_field"):
+        raise ValueError("query_document_page pages in document ID order and cannot be combined with order_by_field")
+    query = _build_query(_get_collection(collection_path, tenant_id), **query_kwargs).order_by("__name__")
+    if cursor is not None:
+        query = query.start_after({"__name__": cursor})
+
+    docs = list(query.limit(page_size + 1).stream())
+    page = DocumentPage(
+        documents=[doc.to_dict() for doc in docs[:page_size]],
+        update_times={doc.id: doc.update_time for doc in docs[:page_size]},
+    )
+    if len(docs) > page_size:
+        page.next_cursor = docs[page_size - 1].id
+    return page
+
+def _stream_query(query: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Yield document data from a query, closing the server stream when the caller stops early.
+    """
+    stream = query.stream()
+    count = 0
+    try:
+        for doc in stream:
+            count += 1
+            yield doc.to_dict()
+    finally:
+        stream.close()
+        logger.debug(f"Streamed {count} documents")
+
 def query_documents(
     collection_path: str, 
     tenant_id: str | None = None,
@@ -252,34 +731,29 @@ def query_documents(
     where_field_2: Optional[str] = None,
     where_operator_2: Optional[str] = None,
     where_value_2: Optional[Any] = None,
+    limit: Optional[int] = None,
+    select: Optional[List[str]] = None,
+    start_after: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
     """
-    Query documents in a collection with optional filtering and ordering.
-    """
-    collection_ref = _get_collection(collection_path, tenant_id)
-    query = collection_ref
-
-    # Apply first where clause
-    if where_field and where_operator and where_value is not None:
-        query = query.where(where_field, where_operator, where_value)
-        
-        # Apply second where clause if provided
-        if where_field_2 and where_operator_2 and where_value_2 is not None:
-            query = query.where(where_field_2, where_operator_2, where_value_2)
-
-    # Apply ordering if specified
-    if order_by_field:
-        direction = QUERY_DIRECTIONS.get(order_direction, Query.ASCENDING)
-        query = query.order_by(order_by_field, direction=direction)
-
-    # Execute query and collect results
-    results = []
-    for doc in query.stream():
-        doc_data = doc.to_dict()
-        logger.debug(f"Document ID: {doc.id}, Data: {doc_data}")
-        results.append(doc_data)
-    
-    return results
+    Query documents in a collection with optional filtering, ordering and limit.
+    Pass start_after (a document ID) to resume after that document in document ID order.
+    """
+    return list(stream_documents(
+        collection_path,
+        tenant_id=tenant_id,
+        where_field=where_field,
+        where_operator=where_operator,
+        where_value=where_value,
+        order_by_field=order_by_field,
+        order_direction=order_direction,
+        where_field_2=where_field_2,
+        where_operator_2=where_operator_2,
+        where_value_2=where_value_2,
+        limit=limit,
+        select=select,
+        start_after=start_after,
+    ))
 
 def query_documents_array_contains(
     collection_path: str, 
@@ -291,29 +765,22 @@ def query_documents_array_contains(
     additional_where_value: Optional[Any] = None,
     order_by_field: Optional[str] = None,
     order_direction: str = "ASC",
+    limit: Optional[int] = None,
+    select: Optional[List[str]] = None,
 ) -> List[Dict[str, Any]]:
     """
     Query documents in a collection where an array field contains a specific value.
     """
-    collection_ref = _get_collection(collection_path, tenant_id)
-    
-    # Start with the array_contains query
-    query = collection_ref.where(array_field, 'array_contains', contains_value)
-    
-    # Add additional where clause if provided
-    if additional_where_field and additional_where_operator and additional_where_value is not None:
-        query = query.where(additional_where_field, additional_where_operator, additional_where_value)
-    
-    # Apply ordering if specified
-    if order_by_field:
-        direction = QUERY_DIRECTIONS.get(order_direction, Query.ASCENDING)
-        query = query.order_by(order_by_field, direction=direction)
-    
-    # Execute query and collect results
-    results = []
-    for doc in query.stream():
-        doc_data = doc.to_dict()
-        logger.debug(f"Document ID: {doc.id}, Data: {doc_data}")
-        results.append(doc_data)
-    
-    return results
\ No newline at end of file
+    return list(stream_documents_array_contains(
+        collection_path,
+        array_field=array_field,
+        contains_value=contains_value,
+        tenant_id=tenant_id,
+        additional_where_field=additional_where_field,
+        additional_where_operator=additional_where_operator,
+        additional_where_value=additional_where_value,
+        order_by_field=order_by_field,
+        order_direction=order_direction,
+        limit=limit,
+        select=select,
+    ))
@@ -48,6 +48,85 @@ class Environment:
         self.application_vanity_domain: str  = self._get_application_vanity_domain()
         self.application_id: str  = self._get_application_id()
 
+        # Bearer token for the operator-only metrics endpoint; the endpoint is not served without it
+        self.metrics_token: str | None = os.environ.get("METRICS_TOKEN") or None
+
+        # Wristband HTTP connection pool settings
+        self.wristband_http_max_connections: int = self._get_int("WRISTBAND_HTTP_MAX_CONNECTIONS", 100)
+        self.wristband_http_max_keepalive_connections: int = self._get_int("WRISTBAND_HTTP_MAX_KEEPALIVE_CONNECTIONS", 20)
+        self.wristband_http_keepalive_expiry: float = self._get_float("WRISTBAND_HTTP_KEEPALIVE_EXPIRY", 30.0)
+        self.wristband_http_timeout: float = self._get_float("WRISTBAND_HTTP_TIMEOUT", 10.0)
+        self.wristband_http_connect_timeout: float = self._get_float("WRISTBAND_HTTP_CONNECT_TIMEOUT", 5.0)
+        self.wristband_coalesce_reads: bool = self._get_bool("WRISTBAND_COALESCE_READS", False)
+        # HTTP/2 multiplexing instead of pooled HTTP/1.1 (requires the h2 package)
+        self.wristband_http2: bool = self._get_bool("WRISTBAND_HTTP2", False)
+        # Connections opened at startup so the first request skips DNS/TLS setup (0 disables)
+        self.wristband_prewarm_connections: int = self._get_int("WRISTBAND_PREWARM_CONNECTIONS", 2)
+
+        # Wristband retry settings (idempotent requests only; see WristbandClient._request)
+        self.wristband_retry_max_retries: int = self._get_int("WRISTBAND_RETRY_MAX_RETRIES", 2)
+        self.wristband_retry_base_delay: float = self._get_float("WRISTBAND_RETRY_BASE_DELAY", 0.2)
+        self.wristband_retry_max_delay: float = self._get_float("WRISTBAND_RETRY_MAX_DELAY", 5.0)
+        # Retries allowed per request sent, plus a floor per second for low traffic
+        self.wristband_retry_budget_ratio: float = self._get_float("WRISTBAND_RETRY_BUDGET_RATIO", 0.1)
+        self.wristband_retry_budget_min_per_second: float = self._get_float("WRISTBAND_RETRY_BUDGET_MIN_PER_SECOND", 1.0)
+
+        # Wristband circuit breaker settings, per endpoint family (users, roles, tenants, ...)
+        self.wristband_circuit_enabled: bool = self._get_bool("WRISTBAND_CIRCUIT_ENABLED", True)
+        self.wristband_circuit_failure_rate_threshold: float = self._get_float("WRISTBAND_CIRCUIT_FAILURE_RATE_THRESHOLD", 0.5)
+        # Calls slower than this count as failures
+        self.wristband_circuit_slow_call_seconds: float = self._get_float("WRISTBAND_CIRCUIT_SLOW_CALL_SECONDS", 5.0)
+        self.wristband_circuit_window_size: int = self._get_int("WRISTBAND_CIRCUIT_WINDOW_SIZE", 50)
+        self.wristband_circuit_min_calls: int = self._get_int("WRISTBAND_CIRCUIT_MIN_CALLS", 20)
+        self.wristband_circuit_open_seconds: float = self._get_float("WRISTBAND_CIRCUIT_OPEN_SECONDS", 30.0)
+        self.wristband_circuit_half_open_calls: int = self._get_int("WRISTBAND_CIRCUIT_HALF_OPEN_CALLS", 3)
+        # How long past their TTL cached Wristband data may be served while a circuit is open
+        self.wristband_circuit_stale_seconds: float = self._get_float("WRISTBAND_CIRCUIT_STALE_SECONDS", 600.0)
+
+        # Process-wide outbound limits for Wristband calls (0 disables a limit)
+        self.wristband_max_in_flight: int = self._get_int("WRISTBAND_MAX_IN_FLIGHT", 50)
+        self.wristband_max_requests_per_second: float = self._get_float("WRISTBAND_MAX_REQUESTS_PER_SECOND", 0.0)
+        # Per endpoint family, e.g. "users=20:10,roles=10" (max in flight[:requests per second])
+        self.wristband_endpoint_limits: dict[str, tuple[int, float]] = self._get_limits("WRISTBAND_ENDPOINT_LIMITS")
+        # Per tenant, so one busy tenant cannot use up the process-wide limits
+        self.wristband_tenant_max_in_flight: int = self._get_int("WRISTBAND_TENANT_MAX_IN_FLIGHT", 0)
+        self.wristband_tenant_max_requests_per_second: float = self._get_float("WRISTBAND_TENANT_MAX_REQUESTS_PER_SECOND", 0.0)
+        # Tenant limiters kept in memory; beyond this the least recently used unbusy ones are dropped
+        self.wristband_tenant_limiter_max_entries: int = self._get_int("WRISTBAND_TENANT_LIMITER_MAX_ENTRIES", 10000)
+
+        # Wristband paginated query settings
+        self.wristband_page_size: int = self._get_int("WRISTBAND_PAGE_SIZE", 50)
+        self.wristband_page_concurrency: int = self._get_int("WRISTBAND_PAGE_CONCURRENCY", 4)
+        self.wristband_roles_chunk_size: int = self._get_int("WRISTBAND_ROLES_CHUNK_SIZE", 100)
+        self.wristband_roles_chunk_concurrency: int = self._get_int("WRISTBAND_ROLES_CHUNK_CONCURRENCY", 4)
+
+        # Per-tenant cache settings for rarely changing Wristband data (tenant, roles)
+        self.tenant_cache_ttl_seconds: float = self._get_float("TENANT_CACHE_TTL_SECONDS", 60.0)
+        self.tenant_cache_max_entries: int = self._get_int("TENANT_CACHE_MAX_ENTRIES", 1000)
+
+        # Stale-while-revalidate cache settings for tenant users and pending invitations
+        self.users_cache_soft_ttl_seconds: float = self._get_float("USERS_CACHE_SOFT_TTL_SECONDS", 5.0)
+        self.users_cache_ttl_seconds: float = self._get_float("USERS_CACHE_TTL_SECONDS", 300.0)
+        self.users_cache_max_entries: int = self._get_int("USERS_CACHE_MAX_ENTRIES", 200)
+
+        # Optional cache of decrypted secrets, keyed by (tenant_id, name)
+        self.secrets_cache_enabled: bool = self._get_bool("SECRETS_CACHE_ENABLED", False)
+        self.secrets_cache_ttl_seconds: float = self._get_float("SECRETS_CACHE_TTL_SECONDS", 30.0)
+        self.secrets_cache_max_entries: int = self._get_int("SECRETS_CACHE_MAX_ENTRIES", 1000)
+
+        # Cache of unwrapped per-tenant data keys (envelope encryption)
+        self.tenant_data_key_ttl_seconds: float = self._get_float("TENANT_DATA_KEY_TTL_SECONDS", 300.0)
+        self.tenant_data_key_cache_max_entries: int = self._get_int("TENANT_DATA_KEY_CACHE_MAX_ENTRIES", 1000)
+
+        # Batch decryption of secret pages on a bounded thread pool
+        self.encryption_decrypt_workers: int = self._get_int("ENCRYPTION_DECRYPT_WORKERS", min(4, os.cpu_count() or 1))
+        self.encryption_decrypt_chunk_size: int = self._get_int("ENCRYPTION_DECRYPT_CHUNK_SIZE", 64)
+
+        # Pacing for the background key rotation job (secrets re-encrypted per second, per tenant)
+        self.key_rotation_max_secrets_per_second: float = self._get_float("KEY_ROTATION_MAX_SECRETS_PER_SECOND", 200.0)
+        # A running secrets job that records no progress for this long can be taken over by a new run
+        self.secrets_job_lease_seconds: float = self._get_float("SECRETS_JOB_LEASE_SECONDS", 300.0)
+
         logger.debug(f"Environment Type: {self.type}")
         logger.debug(f"Database ID: {self.database_id}")
         logger.debug(f"Frontend URL: {self.frontend_url}")
@@ -56,6 +135,52 @@ class Environment:
         logger.debug(f"Client Secret: {self.client_secret}")
         logger.debug(f"Application Vanity Domain: {self.application_vanity_domain}")
         logger.debug(f"Application ID: {self.application_id}")
+        logger.debug(f"Metrics Token Set: {self.metrics_token is not None}")
+        logger.debug(f"Wristband HTTP Max Connections: {self.wristband_http_max_connections}")
+        logger.debug(f"Wristband HTTP Max Keepalive Connections: {self.wristband_http_max_keepalive_connections}")
+        logger.debug(f"Wristband HTTP Keepalive Expiry: {self.wristband_http_keepalive_expiry}")
+        logger.debug(f"Wristband HTTP Timeout: {self.wristband_http_timeout}")
+        logger.debug(f"Wristband HTTP Connect Timeout: {self.wristband_http_connect_timeout}")
+        logger.debug(f"Wristband Coalesce Reads: {self.wristband_coalesce_reads}")
+        logger.debug(f"Wristband HTTP2: {self.wristband_http2}")
+        logger.debug(f"Wristband Prewarm Connections: {self.wristband_prewarm_connections}")
+        logger.debug(f"Wristband Retry Max Retries: {self.wristband_retry_max_retries}")
+        logger.debug(f"Wristband Retry Base Delay: {self.wristband_retry_base_delay}")
+        logger.debug(f"Wristband Retry Max Delay: {self.wristband_retry_max_delay}")
+        logger.debug(f"Wristband Retry Budget Ratio: {self.wristband_retry_budget_ratio}")
+        logger.debug(f"Wristband Retry Budget Min Per Second: {self.wristband_retry_budget_min_per_second}")
+        logger.debug(f"Wristband Circuit Enabled: {self.wristband_circuit_enabled}")
+        logger.debug(f"Wristband Circuit Failure Rate Threshold: {self.wristband_circuit_failure_rate_threshold}")
+        logger.debug(f"Wristband Circuit Slow Call Seconds: {self.wristband_circuit_slow_call_seconds}")
+        logger.debug(f"Wristband Circuit Window Size: {self.wristband_circuit_window_size}")
+        logger.debug(f"Wristband Circuit Min Calls: {self.wristband_circuit_min_calls}")
+        logger.debug(f"Wristband Circuit Open Seconds: {self.wristband_circuit_open_seconds}")
+        logger.debug(f"Wristband Circuit Half Open Calls: {self.wristband_circuit_half_open_calls}")
+        logger.debug(f"Wristband Circuit Stale Seconds: {self.wristband_circuit_stale_seconds}")
+        logger.debug(f"Wristband Max In Flight: {self.wristband_max_in_flight}")
+        logger.debug(f"Wristband Max Requests Per Second: {self.wristband_max_requests_per_second}")
+        logger.debug(f"Wristband Endpoint Limits: {self.wristband_endpoint_limits}")
+        logger.debug(f"Wristband Tenant Max In Flight: {self.wristband_tenant_max_in_flight}")
+        logger.debug(f"Wristband Tenant Max Requests Per Second: {self.wristband_tenant_max_requests_per_second}")
+        logger.debug(f"Wristband Tenant Limiter Max Entries: {self.wristband_tenant_limiter_max_entries}")
+        logger.debug(f"Wristband Page Size: {self.wristband_page_size}")
+        logger.debug(f"Wristband Page Concurrency: {self.wristband_page_concurrency}")
+        logger.debug(f"Wristband Roles Chunk Size: {self.wristband_roles_chunk_size}")
+        logger.debug(f"Wristband Roles Chunk Concurrency: {self.wristband_roles_chunk_concurrency}")
+        logger.debug(f"Tenant Cache TTL Seconds: {self.tenant_cache_ttl_seconds}")
+        logger.debug(f"Tenant Cache Max Entries: {self.tenant_cache_max_entries}")
+        logger.debug(f"Users Cache Soft TTL Seconds: {self.users_cache_soft_ttl_seconds}")
+        logger.debug(f"Users Cache TTL Seconds: {self.users_cache_ttl_seconds}")
+        logger.debug(f"Users Cache Max Entries: {self.users_cache_max_entries}")
+        logger.debug(f"Secrets Cache Enabled: {self.secrets_cache_enabled}")
+        logger.debug(f"Secrets Cache TTL Seconds: {self.secrets_cache_ttl_seconds}")
+        logger.debug(f"Secrets Cache Max Entries: {self.secrets_cache_max_entries}")
+        logger.debug(f"Tenant Data Key TTL Seconds: {self.tenant_data_key_ttl_seconds}")
+        logger.debug(f"Tenant Data Key Cache Max Entries: {self.tenant_data_key_cache_max_entries}")
+        logger.debug(f"Encryption Decrypt Workers: {self.encryption_decrypt_workers}")
+        logger.debug(f"Encryption Decrypt Chunk Size: {self.encryption_decrypt_chunk_size}")
+        logger.debug(f"Key Rotation Max Secrets Per Second: {self.key_rotation_max_secrets_per_second}")
+        logger.debug(f"Secrets Job Lease Seconds: {self.secrets_job_lease_seconds}")
 
     @property
     def is_dev(self) -> bool:
@@ -116,4 +241,46 @@ class Environment:
             raise ValueError("APPLICATION_ID is not set")
         return application_id
 
+    def _get_int(self, name: str, default: int) -> int:
+        value = os.environ.get(name)
+        if value is None or value == "":
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"{name} must be an integer, got {value!r}")
+
+    def _get_float(self, name: str, default: float) -> float:
+        value = os.environ.get(name)
+        if value is None or value == "":
+            return default
+        try:
+            return float(value)
+        except ValueError:
+            raise ValueError(f"{name} must be a number, got {value!r}")
+
+    def _get_bool(self, name: str, default: bool) -> bool:
+        value = os.environ.get(name)
+        if value is None or value == "":
+            return default
+        if value.strip().lower() in ("1", "true", "yes", "on"):
+            return True
+        if value.strip().lower() in ("0", "false", "no", "off"):
+            return False
+        raise ValueError(f"{name} must be a boolean, got {value!r}")
+
+    def _get_limits(self, name: str) -> dict[str, tuple[int, float]]:
+        value = os.environ.get(name)
+        if value is None or value.strip() == "":
+            return {}
+        limits: dict[str, tuple[int, float]] = {}
+        try:
+            for item in value.split(","):
+                key, limit = item.split("=")
+                max_in_flight, _, rate = limit.partition(":")
+                limits[key.strip()] = (int(max_in_flight), float(rate) if rate else 0.0)
+        except ValueError:
+            raise ValueError(f"{name} must look like 'users=20:10,roles=10', got {value!r}")
+        return limits
+
 environment = Environment()
\ No newline at end of file
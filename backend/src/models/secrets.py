@@ -1,9 +1,9 @@
 # Models for secrets management
 import logging
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-from services.encryption_service import decrypt_secret
+from services.encryption_service import EncryptionService
 
 logger = logging.getLogger(__name__)
 
@@ -15,15 +15,14 @@ class SecretConfig(BaseModel):
     environmentId: str
     token: str
     
-    def to_encrypted_dict(self) -> Dict[str, Any]:
-        """Convert to encrypted storage format"""
-        from services.encryption_service import encrypt_secret
-        
+    def to_encrypted_dict(self, encrypted_token: str) -> Dict[str, Any]:
+        """Convert to storage format, given the token encrypted for the tenant"""
         return {
             'name': self.name,
             'displayName': self.displayName,
             'environmentId': self.environmentId,
-            'encryptedToken': encrypt_secret(self.token)
+            'encryptedToken': encrypted_token,
+            'encryptionVersion': EncryptionService.storage_version(encrypted_token)
         }
 
 
@@ -35,20 +34,34 @@ class SecretResponse(BaseModel):
     token: str
     
     @staticmethod
-    def from_encrypted_dict(data: Dict[str, Any] | None) -> 'SecretResponse':
-        """Used to decrypt the secret from the database"""
-        if data is None:
-            logger.error("Data is None")
-            raise ValueError("Data is None")
-        try:
-            data['token'] = decrypt_secret(data['encryptedToken'])
-            # Remove the encrypted field so we don't pass it to the model
-            data.pop('encryptedToken', None)
-            return SecretResponse(**data)
-        except Exception as e:
-            error_message = f"Failed to decrypt secret {data.get('name', 'unknown')}: {str(e)}"
-            logger.error(error_message)
-            raise ValueError(error_message)
+    def from_decrypted_dict(data: Dict[str, Any], token: str) -> 'SecretResponse':
+        """Build the response from a stored secret and its decrypted token"""
+        data['token'] = token
+        # Remove the storage fields so we don't pass them to the model
+        data.pop('encryptedToken', None)
+        data.pop('encryptionVersion', None)
+        return SecretResponse(**data)
+
+
+class SecretsPageResponse(BaseModel):
+    """Response model for one page of secrets"""
+    secrets: List[SecretResponse]
+    # Pass back as the cursor query param to fetch the next page; None on the last page
+    nextCursor: Optional[str] = None
+
+
+class SecretMetadataResponse(BaseModel):
+    """Response model for secret metadata (no token, never decrypted)"""
+    name: str
+    displayName: str
+    environmentId: str
+
+
+class SecretMetadataPageResponse(BaseModel):
+    """Response model for one page of secret metadata"""
+    secrets: List[SecretMetadataResponse]
+    # Pass back as the cursor query param to fetch the next page; None on the last page
+    nextCursor: Optional[str] = None
 
 
 class SecretExistsResponse(BaseModel):
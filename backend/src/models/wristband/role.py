@@ -46,3 +46,25 @@ class UpdateUserRolesRequest(BaseModel):
     
     new_role_ids: list[str] = Field(alias="newRoleIds")
     existing_role_ids: list[str] = Field(alias="existingRoleIds")
+
+class AssignedRolesIndex:
+    """
+    userId -> assigned roles lookup built once from a Resolve Assigned Roles For Users
+    response, so joining roles onto N users is O(N) instead of O(N x items).
+    """
+    def __init__(self, roles_data: dict):
+        self._roles: dict[str, list[dict]] = {}
+        self._skus: dict[str, list[str]] = {}
+        for item in roles_data.get('items', []):
+            roles = item.get('roles', [])
+            self._roles[item['userId']] = roles
+            self._skus[item['userId']] = [role['name'].split(':')[-1] for role in roles]
+
+    def roles_for(self, user_id: str) -> list[dict]:
+        return self._roles.get(user_id, [])
+
+    def role_ids_for(self, user_id: str) -> list[str]:
+        return [role['id'] for role in self._roles.get(user_id, [])]
+
+    def skus_for(self, user_id: str) -> list[str]:
+        return self._skus.get(user_id, [])
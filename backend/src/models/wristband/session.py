@@ -5,4 +5,5 @@ from typing import Optional, Protocol
 # WRISTBAND_TOUCHPOINT: Extend Session Protocol
 class MySession(Session, Protocol):
     email: Optional[str]
+    roles: Optional[list[str]]
     idp_name: Optional[str]
\ No newline at end of file
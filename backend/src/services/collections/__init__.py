@@ -1,3 +1,5 @@
 SECRETS_COLLECTION = "secrets"
+JOBS_COLLECTION = "jobs"
+KEYS_COLLECTION = "keys"
 
 
@@ -0,0 +1,352 @@
+# Standard library imports
+import asyncio
+import logging
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+# Local imports
+from environment import environment as env
+from database.async_doc_store import (
+    query_document_page,
+    batch_update_documents,
+    get_documents,
+    get_document_version,
+    write_document_if_unchanged,
+)
+from services.collections import SECRETS_COLLECTION, JOBS_COLLECTION
+from services.encryption_service import (
+    EncryptionService,
+    STORAGE_FORMAT_V1,
+    STORAGE_FORMAT_V2,
+    STORAGE_FORMAT_V3,
+)
+from services.tenant_encryption_service import TenantEncryptionService, get_tenant_encryption_service
+from utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+# Secrets read and rewritten per page by the storage format migration
+SECRETS_MIGRATION_PAGE_SIZE = 200
+
+# Secrets re-encrypted per page (and per checkpoint) by key rotation
+KEY_ROTATION_PAGE_SIZE = 100
+
+STORAGE_MIGRATION_JOB = "storage_migration"
+KEY_ROTATION_JOB = "key_rotation"
+SECRETS_JOBS = [STORAGE_MIGRATION_JOB, KEY_ROTATION_JOB]
+
+JOB_RUNNING = "running"
+JOB_FINISHED = "finished"
+
+
+# MARK: - Job Tracking
+@dataclass
+class SecretsJobResult:
+    """Progress and outcome of a background job over one tenant's secrets"""
+    job: str
+    tenant_id: str
+    scanned: int = 0
+    rewritten: int = 0
+    # secret name -> error message
+    failed: Dict[str, str] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    # Cursor a resumed run started from
+    resumed_from: Optional[str] = None
+    data_key_rewrapped: bool = False
+    secrets_per_second: float = 0.0
+
+
+class SecretsJobClaimLostError(RuntimeError):
+    """Another run took the job over after this run's lease lapsed"""
+
+
+class SecretsJob:
+    """
+    One run of a job for a tenant, persisted as jobs/{job} in the tenant so every instance
+    sees the same lock and status:
+
+        status      "running" or "finished"
+        runId       the run holding the job
+        heartbeatAt when the run last recorded progress
+        result      SecretsJobResult fields
+        checkpoint  where a later run resumes, if the job supports it
+
+    Each write is conditional on the document being unchanged since this run's previous
+    write, so a run whose job was taken over stops at its next save().
+    """
+    def __init__(self, result: SecretsJobResult, checkpoint: Optional[Dict[str, Any]], update_time: Any) -> None:
+        self.result = result
+        self.checkpoint = checkpoint
+        self.run_id = uuid.uuid4().hex
+        self._update_time = update_time
+
+    async def save(self, status: str = JOB_RUNNING) -> None:
+        """Record progress (and renew the lease); raises SecretsJobClaimLostError if taken over."""
+        update_time = await write_document_if_unchanged(
+            JOBS_COLLECTION,
+            self.result.job,
+            {
+                'status': status,
+                'runId': self.run_id,
+                'heartbeatAt': time.time(),
+                'result': asdict(self.result),
+                'checkpoint': self.checkpoint,
+            },
+            self._update_time,
+            tenant_id=self.result.tenant_id
+        )
+        if update_time is None:
+            raise SecretsJobClaimLostError(f"Secrets job {self.result.job} for tenant {self.result.tenant_id} was taken over")
+        self._update_time = update_time
+
+
+def _is_running(job_data: Dict[str, Any]) -> bool:
+    # A run that stopped saving (instance gone or CPU-throttled) loses its claim after the lease
+    return job_data.get('status') == JOB_RUNNING and time.time() - job_data.get('heartbeatAt', 0) < env.secrets_job_lease_seconds
+
+
+# Keeps this process's running jobs referenced until they finish
+_tasks: Set[asyncio.Task] = set()
+# Process-wide totals by job name, for the metrics endpoint
+_totals: Dict[str, Counter] = {}
+
+
+async def start_job(job: str, tenant_id: str, run: Callable[[SecretsJob], Awaitable[None]]) -> bool:
+    """
+    Claim a job for a tenant and run it in the background. Returns False if a run on any
+    instance holds it.
+
+    The run continues after the response is sent, so it only makes steady progress where
+    the service has CPU always allocated. Where CPU is throttled between requests the run
+    stalls until its lease lapses; the next start then takes the job over, resuming from
+    its checkpoint.
+    """
+    job_data, update_time = await get_document_version(JOBS_COLLECTION, job, tenant_id=tenant_id)
+    if job_data is not None and _is_running(job_data):
+        return False
+
+    secrets_job = SecretsJob(
+        SecretsJobResult(job=job, tenant_id=tenant_id),
+        checkpoint=(job_data or {}).get('checkpoint'),
+        update_time=update_time
+    )
+    try:
+        await secrets_job.save()
+    except SecretsJobClaimLostError:
+        # Another instance claimed it between our read and write
+        return False
+
+    task = asyncio.create_task(_run_job(run, secrets_job))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return True
+
+
+async def _run_job(run: Callable[[SecretsJob], Awaitable[None]], secrets_job: SecretsJob) -> None:
+    result = secrets_job.result
+    totals = _totals.setdefault(result.job, Counter())
+    totals['runs'] += 1
+    totals['running'] += 1
+    try:
+        await run(secrets_job)
+    except SecretsJobClaimLostError as e:
+        totals['taken_over'] += 1
+        logger.warning(str(e))
+        return
+    except Exception as e:
+        result.error = str(e)
+        totals['errored'] += 1
+        logger.exception(f"Secrets job {result.job} failed for tenant {result.tenant_id}: {str(e)}")
+    finally:
+        totals['running'] -= 1
+        totals['scanned'] += result.scanned
+        totals['rewritten'] += result.rewritten
+        totals['failed'] += len(result.failed)
+
+    result.finished_at = time.time()
+    logger.info(
+        f"Secrets job {result.job} for tenant {result.tenant_id}: scanned {result.scanned}, "
+        f"rewrote {result.rewritten}, {len(result.failed)} failed"
+    )
+    try:
+        await secrets_job.save(status=JOB_FINISHED)
+    except Exception as e:
+        logger.error(f"Could not record the outcome of secrets job {result.job} for tenant {result.tenant_id}: {str(e)}")
+
+
+async def tenant_jobs(tenant_id: str) -> Dict[str, Dict[str, Any]]:
+    """Latest run of each job for one tenant, by job name, from the job documents"""
+    jobs_data = await get_documents(JOBS_COLLECTION, SECRETS_JOBS, tenant_id=tenant_id, select=['status', 'heartbeatAt', 'result'])
+    return {
+        job: {**job_data['result'], "running": _is_running(job_data)}
+        for job, job_data in jobs_data.items()
+        if job_data and job_data.get('result')
+    }
+
+
+def _jobs_metrics() -> Dict[str, Any]:
+    # Aggregates of the runs this process started; per-tenant detail (secret names, errors) is served by tenant_jobs()
+    return {job: dict(totals) for job, totals in _totals.items()}
+
+
+register_metrics("secrets.jobs", _jobs_metrics)
+
+
+# MARK: - Storage Format Migration
+async def migrate_storage_format(job: SecretsJob, page_size: int = SECRETS_MIGRATION_PAGE_SIZE) -> None:
+    """
+    Rewrite a tenant's v1 secrets in the v2 storage format, one page at a time.
+
+    Only the outer base64 layer is stripped, so no decryption happens. Each rewrite is
+    conditional on the document being unchanged since it was read, so a concurrent upsert
+    is never overwritten; skipped or failed secrets are picked up by the next run.
+    Progress is saved to the job after each page.
+    """
+    result = job.result
+    cursor: Optional[str] = None
+    while True:
+        page = await query_document_page(
+            SECRETS_COLLECTION,
+            page_size=page_size,
+            tenant_id=result.tenant_id,
+            cursor=cursor,
+            select=['name', 'encryptedToken']
+        )
+        result.scanned += len(page.documents)
+
+        updates = {
+            secret_data['name']: {
+                'encryptedToken': EncryptionService.to_fernet_token(secret_data['encryptedToken']).decode('utf-8'),
+                'encryptionVersion': STORAGE_FORMAT_V2,
+            }
+            for secret_data in page.documents
+            if EncryptionService.storage_version(secret_data['encryptedToken']) == STORAGE_FORMAT_V1
+        }
+        if updates:
+            write_result = await batch_update_documents(
+                SECRETS_COLLECTION,
+                updates,
+                tenant_id=result.tenant_id,
+                if_unchanged_since={name: page.update_times[name] for name in updates}
+            )
+            result.rewritten += len(write_result.succeeded)
+            result.failed.update(write_result.failed)
+
+        cursor = page.next_cursor
+        if cursor is None:
+            return
+        await job.save()
+
+
+# MARK: - Key Rotation
+async def rotate_keys(
+    job: SecretsJob,
+    page_size: int = KEY_ROTATION_PAGE_SIZE,
+    max_secrets_per_second: Optional[float] = None
+) -> None:
+    """
+    Bring a tenant's keys and secrets up to date with the primary master key.
+
+    The tenant's data key is rewrapped under the primary master key first; that single write
+    is all a master key rotation costs for secrets already in the envelope (v3) format.
+    Secrets still encrypted with the master key directly (v1/v2) are then re-encrypted
+    under the tenant's data key, one page at a time; v3 secrets are skipped, so the app
+    keeps serving reads throughout. After each page the cursor is checkpointed in the
+    job, and a later run resumes from it as long as the primary key is unchanged. Throughput is paced to max_secrets_per_second. Writes carry last-update-time
+    preconditions like the storage migration. Keep the old master keys configured until
+    a run finishes with no failures.
+    """
+    result = job.result
+    tenant_encryption_svc = get_tenant_encryption_service()
+    key_fingerprint = tenant_encryption_svc.master.key_fingerprint
+    max_secrets_per_second = max_secrets_per_second or env.key_rotation_max_secrets_per_second
+
+    result.data_key_rewrapped = await tenant_encryption_svc.rewrap_data_key(result.tenant_id)
+
+    checkpoint = job.checkpoint
+    cursor: Optional[str] = None
+    if checkpoint and checkpoint.get('keyFingerprint') == key_fingerprint:
+        cursor = result.resumed_from = checkpoint.get('cursor')
+
+    started = time.monotonic()
+    while True:
+        page = await query_document_page(
+            SECRETS_COLLECTION,
+            page_size=page_size,
+            tenant_id=result.tenant_id,
+            cursor=cursor,
+            select=['name', 'encryptedToken']
+        )
+        result.scanned += len(page.documents)
+
+        reencrypted = await _reencrypt_page(tenant_encryption_svc, page.documents, result)
+        updates = {
+            name: {'encryptedToken': encrypted_token, 'encryptionVersion': STORAGE_FORMAT_V3}
+            for name, encrypted_token in reencrypted.items()
+        }
+        if updates:
+            write_result = await batch_update_documents(
+                SECRETS_COLLECTION,
+                updates,
+                tenant_id=result.tenant_id,
+                if_unchanged_since={name: page.update_times[name] for name in updates}
+            )
+            result.rewritten += len(write_result.succeeded)
+            result.failed.update(write_result.failed)
+
+        elapsed = time.monotonic() - started
+        result.secrets_per_second = result.scanned / elapsed if elapsed > 0 else 0.0
+
+        cursor = page.next_cursor
+        if cursor is None:
+            job.checkpoint = None
+            return
+
+        job.checkpoint = {'cursor': cursor, 'keyFingerprint': key_fingerprint}
+        await job.save()
+        logger.debug(
+            f"Key rotation for tenant {result.tenant_id} checkpointed at {cursor}: "
+            f"{result.scanned} scanned, {result.secrets_per_second:.0f} secrets/s"
+        )
+
+        # Pace to the configured rate so rotation never starves regular traffic
+        delay = result.scanned / max_secrets_per_second - (time.monotonic() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def _reencrypt_page(
+    tenant_encryption_svc: TenantEncryptionService,
+    secrets_data: list[Dict[str, Any]],
+    result: SecretsJobResult
+) -> Dict[str, str]:
+    """Return name -> re-encrypted token for the secrets of a page that need it"""
+    try:
+        reencrypted = await tenant_encryption_svc.reencrypt_batch(
+            result.tenant_id,
+            [secret_data['encryptedToken'] for secret_data in secrets_data]
+        )
+        return {
+            secret_data['name']: encrypted_token
+            for secret_data, encrypted_token in zip(secrets_data, reencrypted)
+            if encrypted_token is not None
+        }
+    except RuntimeError:
+        # Some secret no configured key can decrypt; retry one by one to isolate it
+        pass
+
+    updates: Dict[str, str] = {}
+    for secret_data in secrets_data:
+        try:
+            [encrypted_token] = await tenant_encryption_svc.reencrypt_batch(result.tenant_id, [secret_data['encryptedToken']])
+        except RuntimeError as e:
+            result.failed[secret_data['name']] = str(e)
+            continue
+        if encrypted_token is not None:
+            updates[secret_data['name']] = encrypted_token
+    return updates
@@ -1,8 +1,9 @@
 # Standard library imports
+import json
 import logging
-from typing import List
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
 from fastapi import Depends, status, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 # Wristband imports
 from wristband.fastapi_auth import (
@@ -10,20 +11,90 @@ from wristband.fastapi_auth import (
 )
 
 # Local imports
-from services.encryption_service import get_encryption_service
-from database.doc_store import (
+from environment import environment as env
+from services.tenant_encryption_service import get_tenant_encryption_service
+from database.async_doc_store import (
     is_database_available,
-    query_documents,
+    get_document,
+    query_document_page,
+    stream_document_pages,
     set_document,
     delete_document,
     doc_exists
 )
 from services.collections import SECRETS_COLLECTION
+from services.collections.secrets_jobs import (
+    start_job,
+    tenant_jobs,
+    migrate_storage_format,
+    rotate_keys,
+    SecretsJob,
+    STORAGE_MIGRATION_JOB,
+    KEY_ROTATION_JOB,
+)
 from models.wristband.session import MySession
-from models.secrets import SecretConfig, SecretResponse, SecretExistsResponse
+from models.secrets import (
+    SecretConfig,
+    SecretResponse,
+    SecretsPageResponse,
+    SecretMetadataResponse,
+    SecretMetadataPageResponse,
+    SecretExistsResponse,
+)
+from utils.cache import AsyncTTLCache
 
 logger = logging.getLogger(__name__)
 
+# Page size bounds for the paginated listing; caps response size and decrypt work per request
+SECRETS_DEFAULT_PAGE_SIZE = 50
+SECRETS_MAX_PAGE_SIZE = 200
+
+# Number of secrets read, decrypted and written per chunk by the streaming listing
+SECRETS_STREAM_PAGE_SIZE = 100
+
+# Fields fetched for metadata-only listings; encryptedToken is never transferred
+SECRET_METADATA_FIELDS = ['name', 'displayName', 'environmentId']
+
+
+# MARK: - Decrypted Secrets Cache
+class _SecretNotFound(LookupError):
+    pass
+
+
+class _CachedSecret:
+    """A decrypted secret held by secrets_cache; the plaintext is wiped when it leaves the cache"""
+    __slots__ = ('data', 'encrypted_token', '_token')
+
+    def __init__(self, secret_data: Dict[str, Any], token: str):
+        self.data = {field: secret_data[field] for field in SECRET_METADATA_FIELDS}
+        self.encrypted_token: str = secret_data['encryptedToken']
+        self._token = bytearray(token.encode('utf-8'))
+
+    def token(self) -> str:
+        return self._token.decode('utf-8')
+
+    def to_response(self) -> SecretResponse:
+        return SecretResponse(**self.data, token=self.token())
+
+    def wipe(self) -> None:
+        # Python strings cannot be cleared, so only the cache's own bytes are zeroed
+        self._token[:] = bytes(len(self._token))
+
+
+# Opt-in (SECRETS_CACHE_ENABLED) cache of decrypted secrets keyed by (tenant_id, name), so
+# repeated GET /api/secrets/by-name/{name} lookups skip Firestore and Fernet. Entries expire strictly
+# after SECRETS_CACHE_TTL_SECONDS, which also bounds staleness from writes in other processes;
+# writes in this process invalidate immediately.
+secrets_cache: Optional[AsyncTTLCache[_CachedSecret]] = (
+    AsyncTTLCache(
+        name="secrets",
+        ttl_seconds=env.secrets_cache_ttl_seconds,
+        max_entries=env.secrets_cache_max_entries,
+        on_evict=_CachedSecret.wipe,
+    )
+    if env.secrets_cache_enabled else None
+)
+
 
 # MARK: - Dependencies
 def get_secrets_service(
@@ -36,7 +107,7 @@ def get_secrets_service(
 # MARK: - Service
 class SecretsService:
     def __init__(self, request: Request, session: MySession):
-        self.encryption_svc = get_encryption_service()
+        self.encryption_svc = get_tenant_encryption_service()
         self.tenant_id: str = session.tenant_id
     
     def _check_database_available(self):
@@ -57,8 +128,12 @@ class SecretsService:
             )
         return None
     
-    async def get_secrets(self) -> List[SecretResponse] | JSONResponse:
-        """Get all secrets"""
+    async def get_secrets(
+        self,
+        limit: int = SECRETS_DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> SecretsPageResponse | JSONResponse:
+        """Get one page of secrets, resuming after cursor"""
         try:
             # Check availability
             if error := self._check_database_available():
@@ -66,19 +141,18 @@ class SecretsService:
             if error := self._check_encryption_available():
                 return error
             
-            # Query all secrets
-            encrypted_secrets = query_documents(
+            # Query one page of secrets
+            page = await query_document_page(
                 SECRETS_COLLECTION,
-                tenant_id=self.tenant_id
+                page_size=limit,
+                tenant_id=self.tenant_id,
+                cursor=cursor
             )
             
-            # Decrypt secrets using list comprehension
-            decrypted_secrets = [
-                SecretResponse.from_encrypted_dict(secret_data) 
-                for secret_data in encrypted_secrets
-            ]
+            # Decrypt only this page's secrets
+            decrypted_secrets = await self._decrypt_secrets(page.documents)
             
-            return decrypted_secrets
+            return SecretsPageResponse(secrets=decrypted_secrets, nextCursor=page.next_cursor)
         
         except Exception as e:
             logger.exception(f"Error fetching secrets: {str(e)}")
@@ -87,6 +161,135 @@ class SecretsService:
                 content={"error": "internal_error", "message": "Failed to fetch secrets"}
             )
     
+    async def _decrypt_secrets(self, secrets_data: List[Dict[str, Any]]) -> List[SecretResponse]:
+        """
+        Decrypt a page of stored secrets in one batch on the encryption worker pool.
+        Cached plaintexts are reused only while their encryptedToken still matches the stored
+        one; listings never fill the cache, since a page read can race a concurrent upsert.
+        """
+        tokens: Dict[str, str] = {}
+        if secrets_cache is not None:
+            for secret_data in secrets_data:
+                cached = secrets_cache.peek((self.tenant_id, secret_data['name']))
+                if cached is not None and cached.encrypted_token == secret_data['encryptedToken']:
+                    tokens[secret_data['name']] = cached.token()
+
+        to_decrypt = [secret_data for secret_data in secrets_data if secret_data['name'] not in tokens]
+        decrypted = await self.encryption_svc.decrypt_batch(
+            self.tenant_id,
+            [secret_data['encryptedToken'] for secret_data in to_decrypt]
+        )
+        tokens.update((secret_data['name'], token) for secret_data, token in zip(to_decrypt, decrypted))
+        return [
+            SecretResponse.from_decrypted_dict(secret_data, tokens[secret_data['name']])
+            for secret_data in secrets_data
+        ]
+
+    async def _load_secret(self, name: str) -> _CachedSecret:
+        secret_data = await get_document(SECRETS_COLLECTION, name, tenant_id=self.tenant_id)
+        if secret_data is None:
+            raise _SecretNotFound(name)
+        token = await self.encryption_svc.decrypt(self.tenant_id, secret_data['encryptedToken'])
+        return _CachedSecret(secret_data, token)
+
+    def _invalidate_cached_secret(self, name: str) -> None:
+        if secrets_cache is not None:
+            secrets_cache.invalidate((self.tenant_id, name))
+
+    async def list_secret_metadata(
+        self,
+        limit: int = SECRETS_DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> SecretMetadataPageResponse | JSONResponse:
+        """List a page of secret names and metadata without transferring or decrypting tokens"""
+        try:
+            # Check availability
+            if error := self._check_database_available():
+                return error
+
+            page = await query_document_page(
+                SECRETS_COLLECTION,
+                page_size=limit,
+                tenant_id=self.tenant_id,
+                cursor=cursor,
+                select=SECRET_METADATA_FIELDS
+            )
+            return SecretMetadataPageResponse(
+                secrets=[SecretMetadataResponse(**secret_data) for secret_data in page.documents],
+                nextCursor=page.next_cursor
+            )
+
+        except Exception as e:
+            logger.exception(f"Error listing secret metadata: {str(e)}")
+            return JSONResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content={"error": "internal_error", "message": "Failed to list secrets"}
+            )
+
+    async def get_secret(self, name: str) -> SecretResponse | JSONResponse:
+        """Get a single secret with its token decrypted"""
+        try:
+            # Check availability
+            if error := self._check_database_available():
+                return error
+            if error := self._check_encryption_available():
+                return error
+            
+            try:
+                if secrets_cache is not None:
+                    return (await secrets_cache.get_or_load(
+                        (self.tenant_id, name), lambda: self._load_secret(name)
+                    )).to_response()
+                secret = await self._load_secret(name)
+            except _SecretNotFound:
+                return JSONResponse(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    content={"error": "not_found", "message": "Secret not found"}
+                )
+            
+            response = secret.to_response()
+            secret.wipe()
+            return response
+        
+        except Exception as e:
+            logger.exception(f"Error fetching secret: {str(e)}")
+            return JSONResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content={"error": "internal_error", "message": "Failed to fetch secret"}
+            )
+
+    async def stream_secrets(self) -> StreamingResponse | JSONResponse:
+        """Stream all secrets as a JSON array, one page at a time"""
+        # Check availability up front; once streaming starts the status code is fixed
+        if error := self._check_database_available():
+            return error
+        if error := self._check_encryption_available():
+            return error
+
+        return StreamingResponse(self._stream_secrets_json(), media_type="application/json")
+
+    async def _stream_secrets_json(self) -> AsyncIterator[str]:
+        # Only one page of documents is held in memory at a time
+        pages = stream_document_pages(
+            SECRETS_COLLECTION,
+            page_size=SECRETS_STREAM_PAGE_SIZE,
+            tenant_id=self.tenant_id
+        )
+        first = True
+        yield "["
+        try:
+            async for page in pages:
+                for secret in await self._decrypt_secrets(page):
+                    yield ("" if first else ",") + json.dumps(secret.model_dump())
+                    first = False
+        except Exception as e:
+            # Headers are already sent; log and end the stream so the client sees truncated JSON
+            logger.exception(f"Error streaming secrets: {str(e)}")
+            raise
+        finally:
+            await pages.aclose()
+        yield "]"
+
     async def upsert_secret(self, secret: SecretConfig) -> JSONResponse:
         """Create or update a secret"""
         try:
@@ -98,7 +301,9 @@ class SecretsService:
             
             # Convert to encrypted storage format
             try:
-                secret_data = secret.to_encrypted_dict()
+                secret_data = secret.to_encrypted_dict(
+                    await self.encryption_svc.encrypt(self.tenant_id, secret.token)
+                )
             except Exception as e:
                 logger.error(f"Failed to encrypt token: {str(e)}")
                 return JSONResponse(
@@ -107,12 +312,13 @@ class SecretsService:
                 )
             
             # Save to database
-            set_document(
+            await set_document(
                 collection_path=SECRETS_COLLECTION,
                 doc_id=secret.name,
                 data=secret_data,
                 tenant_id=self.tenant_id
             )
+            self._invalidate_cached_secret(secret.name)
             
             return JSONResponse(
                 status_code=status.HTTP_201_CREATED,
@@ -133,7 +339,7 @@ class SecretsService:
             if error := self._check_database_available():
                 return error
             
-            exists = doc_exists(
+            exists = await doc_exists(
                 collection_path=SECRETS_COLLECTION,
                 doc_id=name,
                 tenant_id=self.tenant_id
@@ -147,6 +353,38 @@ class SecretsService:
                 content={"error": "internal_error", "message": "Failed to check secret"}
             )
     
+    async def start_storage_migration(self) -> JSONResponse:
+        """Start rewriting this tenant's v1 secrets in the compact v2 format in the background"""
+        if error := self._check_database_available():
+            return error
+        return await self._start_job(STORAGE_MIGRATION_JOB, migrate_storage_format)
+
+    async def start_key_rotation(self) -> JSONResponse:
+        """Start (or resume) rewrapping this tenant's data key and re-encrypting legacy secrets in the background"""
+        if error := self._check_database_available():
+            return error
+        if error := self._check_encryption_available():
+            return error
+        return await self._start_job(KEY_ROTATION_JOB, rotate_keys)
+
+    async def get_job_status(self) -> Dict[str, Any] | JSONResponse:
+        """Latest storage migration and key rotation runs for this tenant"""
+        if error := self._check_database_available():
+            return error
+        return {"jobs": await tenant_jobs(self.tenant_id)}
+
+    async def _start_job(self, job: str, run: Callable[[SecretsJob], Awaitable[None]]) -> JSONResponse:
+        if not await start_job(job, self.tenant_id, run):
+            return JSONResponse(
+                status_code=status.HTTP_409_CONFLICT,
+                content={"error": "job_running", "message": f"Secrets job {job} is already running"}
+            )
+        
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"status": "started", "job": job}
+        )
+
     async def delete_secret(self, name: str) -> JSONResponse:
         """Delete a secret"""
         try:
@@ -154,24 +392,21 @@ class SecretsService:
             if error := self._check_database_available():
                 return error
             
-            # Check if secret exists
-            if not doc_exists(
+            # Delete the secret; the exists precondition reports a missing secret
+            # without a separate existence read
+            deleted = await delete_document(
                 collection_path=SECRETS_COLLECTION,
                 doc_id=name,
-                tenant_id=self.tenant_id
-            ):
+                tenant_id=self.tenant_id,
+                must_exist=True
+            )
+            self._invalidate_cached_secret(name)
+            if not deleted:
                 return JSONResponse(
                     status_code=status.HTTP_404_NOT_FOUND,
                     content={"error": "not_found", "message": "Secret not found"}
                 )
             
-            # Delete the secret
-            delete_document(
-                collection_path=SECRETS_COLLECTION,
-                doc_id=name,
-                tenant_id=self.tenant_id
-            )
-            
             return JSONResponse(
                 status_code=status.HTTP_204_NO_CONTENT,
                 content=None
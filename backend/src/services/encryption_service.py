@@ -1,66 +1,111 @@
 import os
+import json
 import base64
+import asyncio
+import hashlib
 import logging
-from cryptography.fernet import Fernet
+from concurrent.futures import ThreadPoolExecutor
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from environment import environment as env
+
+T = TypeVar("T")
 
 logger = logging.getLogger(__name__)
 
+# Stored token formats:
+#   v1: urlsafe base64 of the Fernet token (the token is itself urlsafe base64)
+#   v2: the Fernet token as-is, about 25% smaller and one decode pass cheaper
+#   v3: ENVELOPE_TOKEN_PREFIX + a Fernet token under a per-tenant data key
+#       (see services.tenant_encryption_service)
+STORAGE_FORMAT_V1 = 1
+STORAGE_FORMAT_V2 = 2
+STORAGE_FORMAT_V3 = 3
+# Format written by EncryptionService itself (master key)
+STORAGE_FORMAT_VERSION = STORAGE_FORMAT_V2
+
+# ":" is outside the base64 alphabet, so the prefix cannot collide with v1/v2 values
+ENVELOPE_TOKEN_PREFIX = "env:"
+
+# Fernet tokens start with version byte 0x80, which base64-encodes to "g"; a v1 value is that
+# text encoded again, so it starts with "Z" instead
+FERNET_TOKEN_PREFIX = "g"
+
+# PBKDF2 parameters for deriving Fernet keys from passwords or non-Fernet key strings
+KEY_DERIVATION_SALT = b'metric-layer-ai-salt-2024'
+KEY_DERIVATION_ITERATIONS = 100000
+
 class EncryptionService:
     """
     Service for encrypting and decrypting sensitive data like secrets.
     Uses Fernet symmetric encryption with a key derived from environment variables.
+    
+    ENCRYPTION_KEY is the primary key used for all new encryption. ENCRYPTION_OLD_KEYS
+    (comma-separated, newest first) are decrypt-only keys kept while a rotation re-encrypts
+    existing data under the primary key.
     """
     
-    def __init__(self):
-        self._fernet: Optional[Fernet] = None
+    def __init__(self, decrypt_workers: Optional[int] = None, decrypt_chunk_size: Optional[int] = None):
+        self._fernet: Optional[MultiFernet] = None
+        self._primary_fernet: Optional[Fernet] = None
+        self.key_fingerprint: Optional[str] = None
         self._initialize_encryption()
+
+        # Bounded pool for batch decryption, created on first use
+        self.decrypt_workers = decrypt_workers or env.encryption_decrypt_workers
+        self.decrypt_chunk_size = decrypt_chunk_size or env.encryption_decrypt_chunk_size
+        self._decrypt_pool: Optional[ThreadPoolExecutor] = None
     
     def _initialize_encryption(self):
-        """Initialize the encryption key from environment variables."""
+        """Initialize the encryption keys from environment variables."""
         try:
-            # Get encryption key from environment
-            encryption_key = os.getenv('ENCRYPTION_KEY')
+            key, old_keys = self.load_keys()
             
-            if not encryption_key:
-                # Generate a key from a master password if ENCRYPTION_KEY is not set
-                master_password = os.getenv('MASTER_PASSWORD', 'default-dev-password-change-in-production')
-                logger.warning("ENCRYPTION_KEY not found, deriving key from MASTER_PASSWORD")
-                
-                # Use a fixed salt for consistency (in production, consider using a stored salt)
-                salt = b'metric-layer-ai-salt-2024'
-                
-                # Derive key from master password
-                kdf = PBKDF2HMAC(
-                    algorithm=hashes.SHA256(),
-                    length=32,
-                    salt=salt,
-                    iterations=100000,
-                )
-                key = base64.urlsafe_b64encode(kdf.derive(master_password.encode()))
-            else:
-                # Use the provided encryption key
-                key = encryption_key.encode()
-                # Ensure the key is the right length for Fernet
-                if len(key) != 44:  # Fernet keys are 44 bytes when base64 encoded
-                    # Derive a proper key if the provided key isn't the right format
-                    kdf = PBKDF2HMAC(
-                        algorithm=hashes.SHA256(),
-                        length=32,
-                        salt=b'metric-layer-ai-salt-2024',
-                        iterations=100000,
-                    )
-                    key = base64.urlsafe_b64encode(kdf.derive(key))
-            
-            self._fernet = Fernet(key)
-            logger.info("Encryption service initialized successfully")
+            # Old keys can still decrypt; everything new is encrypted with the primary key
+            self._primary_fernet = Fernet(key)
+            self._fernet = MultiFernet([self._primary_fernet, *(Fernet(old_key) for old_key in old_keys)])
+            # Identifies the primary key in rotation checkpoints without revealing it
+            self.key_fingerprint = hashlib.sha256(key).hexdigest()[:16]
+            logger.info(f"Encryption service initialized successfully ({len(old_keys)} decrypt-only keys)")
             
         except Exception as e:
             logger.error(f"Failed to initialize encryption service: {str(e)}")
             raise RuntimeError(f"Encryption initialization failed: {str(e)}")
     
+    @staticmethod
+    def load_keys() -> Tuple[bytes, List[bytes]]:
+        """Return the primary Fernet key and the decrypt-only old keys from the environment."""
+        # Get encryption key from environment
+        encryption_key = os.getenv('ENCRYPTION_KEY')
+        
+        if not encryption_key:
+            # Generate a key from a master password if ENCRYPTION_KEY is not set
+            master_password = os.getenv('MASTER_PASSWORD', 'default-dev-password-change-in-production')
+            logger.warning("ENCRYPTION_KEY not found, deriving key from MASTER_PASSWORD")
+            key = derive_fernet_key(master_password)
+        else:
+            # Use the provided encryption key
+            key = EncryptionService._to_fernet_key(encryption_key)
+        
+        old_keys = [
+            EncryptionService._to_fernet_key(old_key.strip())
+            for old_key in os.getenv('ENCRYPTION_OLD_KEYS', '').split(',')
+            if old_key.strip()
+        ]
+        return key, old_keys
+    
+    @staticmethod
+    def _to_fernet_key(encryption_key: str) -> bytes:
+        """Use a Fernet key as-is, or derive one from any other key string."""
+        # Ensure the key is the right length for Fernet
+        if len(encryption_key) != 44:  # Fernet keys are 44 bytes when base64 encoded
+            # Derive a proper key if the provided key isn't the right format
+            return derive_fernet_key(encryption_key)
+        return encryption_key.encode()
+    
     def encrypt(self, plaintext: str) -> str:
         """
         Encrypt a plaintext string.
@@ -69,7 +114,7 @@ class EncryptionService:
             plaintext: The string to encrypt
             
         Returns:
-            Base64 encoded encrypted string
+            Fernet token in the v2 storage format (already urlsafe base64)
             
         Raises:
             RuntimeError: If encryption fails
@@ -82,8 +127,8 @@ class EncryptionService:
             plaintext_bytes = plaintext.encode('utf-8')
             encrypted_bytes = self._fernet.encrypt(plaintext_bytes)
             
-            # Return as base64 string for easy storage
-            return base64.urlsafe_b64encode(encrypted_bytes).decode('utf-8')
+            # The token is urlsafe base64 already, so it is stored as-is
+            return encrypted_bytes.decode('utf-8')
             
         except Exception as e:
             logger.error(f"Encryption failed: {str(e)}")
@@ -94,7 +139,7 @@ class EncryptionService:
         Decrypt an encrypted string.
         
         Args:
-            encrypted_data: Base64 encoded encrypted string
+            encrypted_data: Encrypted string in either storage format (detected automatically)
             
         Returns:
             Decrypted plaintext string
@@ -106,9 +151,7 @@ class EncryptionService:
             raise RuntimeError("Encryption service not initialized")
         
         try:
-            # Decode from base64 and decrypt
-            encrypted_bytes = base64.urlsafe_b64decode(encrypted_data.encode('utf-8'))
-            decrypted_bytes = self._fernet.decrypt(encrypted_bytes)
+            decrypted_bytes = self._fernet.decrypt(self.to_fernet_token(encrypted_data))
             
             # Convert back to string
             return decrypted_bytes.decode('utf-8')
@@ -117,6 +160,110 @@ class EncryptionService:
             logger.error(f"Decryption failed: {str(e)}")
             raise RuntimeError(f"Failed to decrypt data: {str(e)}")
     
+    @staticmethod
+    def storage_version(encrypted_data: str) -> int:
+        """Detect the storage format of an encrypted string."""
+        if encrypted_data.startswith(ENVELOPE_TOKEN_PREFIX):
+            return STORAGE_FORMAT_V3
+        return STORAGE_FORMAT_V2 if encrypted_data.startswith(FERNET_TOKEN_PREFIX) else STORAGE_FORMAT_V1
+    
+    @staticmethod
+    def to_fernet_token(encrypted_data: str) -> bytes:
+        """
+        Return the Fernet token for an encrypted string in any storage format.
+        Converting v1 to v2 only strips the outer base64 layer; no key is needed.
+        """
+        version = EncryptionService.storage_version(encrypted_data)
+        if version == STORAGE_FORMAT_V3:
+            encrypted_data = encrypted_data[len(ENVELOPE_TOKEN_PREFIX):]
+        encrypted_bytes = encrypted_data.encode('utf-8')
+        if version == STORAGE_FORMAT_V1:
+            return base64.urlsafe_b64decode(encrypted_bytes)
+        return encrypted_bytes
+    
+    def rotate(self, encrypted_data: str) -> Optional[str]:
+        """
+        Re-encrypt an encrypted string under the primary key, in the v2 storage format.
+        
+        Returns:
+            The new encrypted string, or None if it is already current
+            
+        Raises:
+            RuntimeError: If no configured key can decrypt it
+        """
+        if not self._fernet:
+            raise RuntimeError("Encryption service not initialized")
+        
+        token = self.to_fernet_token(encrypted_data)
+        if self.storage_version(encrypted_data) == STORAGE_FORMAT_VERSION:
+            try:
+                self._primary_fernet.decrypt(token)
+                return None
+            except InvalidToken:
+                pass
+        
+        try:
+            return self._fernet.rotate(token).decode('utf-8')
+        except InvalidToken:
+            logger.error("Rotation failed: no configured key can decrypt the data")
+            raise RuntimeError("Failed to rotate data: no configured key can decrypt it")
+        except Exception as e:
+            logger.error(f"Rotation failed: {str(e)}")
+            raise RuntimeError(f"Failed to rotate data: {str(e)}")
+    
+    def decrypt_many(self, encrypted_values: Sequence[str]) -> List[str]:
+        """
+        Decrypt a sequence of encrypted strings on the calling thread.
+        
+        Raises:
+            RuntimeError: If any value fails to decrypt
+        """
+        return [self.decrypt(encrypted_data) for encrypted_data in encrypted_values]
+    
+    async def decrypt_batch(self, encrypted_values: Sequence[str]) -> List[str]:
+        """
+        Decrypt a batch of encrypted strings off the event loop.
+        
+        The batch is split into chunks of decrypt_chunk_size which run on a bounded
+        thread pool, so large batches use several cores (the cryptography primitives
+        release the GIL) and never block other requests. Results keep input order.
+        
+        Raises:
+            RuntimeError: If any value fails to decrypt
+        """
+        return await self.map_batch(self.decrypt_many, encrypted_values)
+    
+    async def map_batch(self, fn: Callable[[Sequence[str]], List[T]], values: Sequence[str]) -> List[T]:
+        """
+        Run fn over chunks of values on the bounded worker pool and concatenate the
+        results in input order. fn receives one chunk and must return one result per value.
+        """
+        if not values:
+            return []
+        
+        loop = asyncio.get_running_loop()
+        pool = self._get_decrypt_pool()
+        size = self.decrypt_chunk_size
+        chunks = [values[i:i + size] for i in range(0, len(values), size)]
+        results = await asyncio.gather(*(
+            loop.run_in_executor(pool, fn, chunk) for chunk in chunks
+        ))
+        return [value for chunk_result in results for value in chunk_result]
+    
+    def _get_decrypt_pool(self) -> ThreadPoolExecutor:
+        if self._decrypt_pool is None:
+            self._decrypt_pool = ThreadPoolExecutor(
+                max_workers=self.decrypt_workers,
+                thread_name_prefix="decrypt"
+            )
+        return self._decrypt_pool
+    
+    def close(self) -> None:
+        """Shut down the batch decryption pool."""
+        if self._decrypt_pool is not None:
+            self._decrypt_pool.shutdown(wait=False, cancel_futures=True)
+            self._decrypt_pool = None
+    
     def is_available(self) -> bool:
         """Check if the encryption service is available and working."""
         return self._fernet is not None
@@ -134,6 +281,59 @@ class EncryptionService:
         return key.decode('utf-8')
 
 
+# Key derivation cache
+# PBKDF2 is slow by design (hundreds of ms), so each derivation runs at most once per
+# process. Set ENCRYPTION_KEY_CACHE_PATH to also keep derived keys in a file (mode 0600)
+# across restarts; the file holds usable keys and must be protected like them.
+# In production prefer setting ENCRYPTION_KEY to a Fernet key: see __main__ below.
+_derived_keys: Dict[str, bytes] = {}
+
+def derive_fernet_key(secret: str) -> bytes:
+    """Derive a Fernet key from a password or non-Fernet key string with PBKDF2."""
+    cache_id = hashlib.sha256(KEY_DERIVATION_SALT + secret.encode()).hexdigest()
+    key = _derived_keys.get(cache_id)
+    if key is not None:
+        return key
+    
+    cache_path = os.getenv('ENCRYPTION_KEY_CACHE_PATH')
+    disk_cache = _read_key_cache(cache_path) if cache_path else {}
+    if cache_id in disk_cache:
+        key = disk_cache[cache_id].encode()
+    else:
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=KEY_DERIVATION_SALT,
+            iterations=KEY_DERIVATION_ITERATIONS,
+        )
+        key = base64.urlsafe_b64encode(kdf.derive(secret.encode()))
+        if cache_path:
+            _write_key_cache(cache_path, {**disk_cache, cache_id: key.decode('utf-8')})
+    
+    _derived_keys[cache_id] = key
+    return key
+
+def _read_key_cache(cache_path: str) -> Dict[str, str]:
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable key cache {cache_path}: {str(e)}")
+        return {}
+
+def _write_key_cache(cache_path: str, entries: Dict[str, str]) -> None:
+    try:
+        tmp_path = f"{cache_path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.warning(f"Could not write key cache {cache_path}: {str(e)}")
+
+
 # Global instance
 _encryption_service: Optional[EncryptionService] = None
 
@@ -155,9 +355,29 @@ def decrypt_secret(encrypted_data: str) -> str:
     """Convenience function to decrypt a secret."""
     return get_encryption_service().decrypt(encrypted_data)
 
+async def decrypt_secrets(encrypted_values: Sequence[str]) -> List[str]:
+    """Convenience function to decrypt a batch of secrets off the event loop."""
+    return await get_encryption_service().decrypt_batch(encrypted_values)
+
+def close_encryption_service() -> None:
+    """Release the global encryption service's worker threads, if it was created."""
+    if _encryption_service is not None:
+        _encryption_service.close()
+
 def is_encryption_available() -> bool:
     """Check if encryption is available."""
     try:
         return get_encryption_service().is_available()
     except Exception:
         return False
+
+
+if __name__ == "__main__":
+    # Print the configured keys in Fernet form. Setting these as ENCRYPTION_KEY /
+    # ENCRYPTION_OLD_KEYS skips PBKDF2 entirely at startup; the values are the keys
+    # themselves, so store them as secrets.
+    #   PYTHONPATH=src python -m services.encryption_service
+    primary_key, old_fernet_keys = EncryptionService.load_keys()
+    print(f"ENCRYPTION_KEY={primary_key.decode('utf-8')}")
+    if old_fernet_keys:
+        print(f"ENCRYPTION_OLD_KEYS={','.join(key.decode('utf-8') for key in old_fernet_keys)}")
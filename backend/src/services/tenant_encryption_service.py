@@ -0,0 +1,203 @@
+import logging
+import time
+from cryptography.fernet import Fernet, InvalidToken
+from typing import List, Optional, Sequence
+
+from environment import environment as env
+from database.async_doc_store import create_document, get_documents, update_document
+from services.collections import KEYS_COLLECTION
+from services.encryption_service import (
+    EncryptionService,
+    get_encryption_service,
+    ENVELOPE_TOKEN_PREFIX,
+    STORAGE_FORMAT_V3,
+)
+from utils.cache import AsyncTTLCache
+
+logger = logging.getLogger(__name__)
+
+# Document under tenants/{tenant_id}/keys holding the tenant's wrapped data key
+DATA_KEY_DOC_ID = "data_key"
+
+# Unwrapped data keys, so the unwrap (and its Firestore read) happens once per tenant per TTL
+data_key_cache: AsyncTTLCache[Fernet] = AsyncTTLCache(
+    name="tenant_data_keys",
+    ttl_seconds=env.tenant_data_key_ttl_seconds,
+    max_entries=env.tenant_data_key_cache_max_entries,
+)
+
+
+class DataKeyMissingError(RuntimeError):
+    """The tenant has no data key, so nothing encrypted for it in the v3 format can be read."""
+
+
+class TenantEncryptionService:
+    """
+    Envelope encryption for tenant data.
+
+    Each tenant gets its own Fernet data key, created the first time something is
+    encrypted for the tenant (reads never create one) and stored under
+    tenants/{tenant_id}/keys/data_key wrapped (encrypted) by the master EncryptionService.
+    Rotating the master key therefore only rewraps one small key per tenant, and a leaked
+    data key exposes a single tenant. Values encrypted here use the v3 storage format;
+    v1/v2 values written with the master key directly are still decrypted transparently.
+    """
+
+    def __init__(self, master: EncryptionService):
+        self.master = master
+
+    def is_available(self) -> bool:
+        """Check if the master key is available to wrap and unwrap data keys."""
+        return self.master.is_available()
+
+    # MARK: - Data Keys
+    async def _get_data_key(self, tenant_id: str, create: bool = False) -> Fernet:
+        """Return the tenant's data key; only with create=True is a missing key created."""
+        load = lambda: self._load_data_key(tenant_id, create)
+        try:
+            return await data_key_cache.get_or_load(tenant_id, load)
+        except DataKeyMissingError:
+            if not create:
+                raise
+            # Joined a concurrent read-only load that found no key; load again, creating it
+            return await data_key_cache.get_or_load(tenant_id, load)
+
+    async def _load_data_key(self, tenant_id: str, create: bool) -> Fernet:
+        key_doc = (await get_documents(KEYS_COLLECTION, [DATA_KEY_DOC_ID], tenant_id=tenant_id))[DATA_KEY_DOC_ID]
+        if key_doc is None:
+            if not create:
+                raise DataKeyMissingError(f"Failed to decrypt data: tenant {tenant_id} has no data key")
+            data_key = Fernet.generate_key().decode('utf-8')
+            key_doc = {'wrappedDataKey': self.master.encrypt(data_key), 'createdAt': time.time()}
+            if await create_document(KEYS_COLLECTION, DATA_KEY_DOC_ID, key_doc, tenant_id=tenant_id):
+                logger.info(f"Created data key for tenant {tenant_id}")
+                return Fernet(data_key)
+            # Another process created the key first; use theirs
+            key_doc = (await get_documents(KEYS_COLLECTION, [DATA_KEY_DOC_ID], tenant_id=tenant_id))[DATA_KEY_DOC_ID]
+
+        return Fernet(self.master.decrypt(key_doc['wrappedDataKey']))
+
+    async def rewrap_data_key(self, tenant_id: str) -> bool:
+        """
+        Rewrap the tenant's data key under the current primary master key.
+        The data key itself is unchanged, so no tenant data needs re-encrypting.
+
+        Returns:
+            True if the wrapped key was rewritten, False if it was already current or missing
+        """
+        key_doc = (await get_documents(KEYS_COLLECTION, [DATA_KEY_DOC_ID], tenant_id=tenant_id))[DATA_KEY_DOC_ID]
+        if key_doc is None:
+            return False
+
+        wrapped_data_key = self.master.rotate(key_doc['wrappedDataKey'])
+        if wrapped_data_key is None:
+            return False
+
+        await update_document(KEYS_COLLECTION, DATA_KEY_DOC_ID, {'wrappedDataKey': wrapped_data_key}, tenant_id=tenant_id)
+        logger.info(f"Rewrapped data key for tenant {tenant_id}")
+        return True
+
+    # MARK: - Encrypt / Decrypt
+    async def encrypt(self, tenant_id: str, plaintext: str) -> str:
+        """
+        Encrypt a plaintext string with the tenant's data key.
+
+        Returns:
+            Encrypted string in the v3 storage format
+
+        Raises:
+            RuntimeError: If encryption fails
+        """
+        return (await self.encrypt_batch(tenant_id, [plaintext]))[0]
+
+    async def decrypt(self, tenant_id: str, encrypted_data: str) -> str:
+        """
+        Decrypt a string encrypted for the tenant, in any storage format.
+
+        Raises:
+            RuntimeError: If decryption fails
+        """
+        return (await self.decrypt_batch(tenant_id, [encrypted_data]))[0]
+
+    async def encrypt_batch(self, tenant_id: str, plaintexts: Sequence[str]) -> List[str]:
+        """
+        Encrypt a batch of plaintext strings with the tenant's data key on the worker pool.
+        """
+        data_key = await self._get_data_key(tenant_id, create=True)
+        return await self.master.map_batch(
+            lambda chunk: [self._encrypt_with(data_key, plaintext) for plaintext in chunk],
+            plaintexts
+        )
+
+    async def decrypt_batch(self, tenant_id: str, encrypted_values: Sequence[str]) -> List[str]:
+        """
+        Decrypt a batch of strings encrypted for the tenant on the worker pool.
+        Results keep input order.
+
+        Raises:
+            RuntimeError: If any value fails to decrypt, or v3 values exist but the tenant has no data key
+        """
+        # Values written with the master key directly need no data key
+        needs_data_key = any(EncryptionService.storage_version(value) == STORAGE_FORMAT_V3 for value in encrypted_values)
+        data_key = await self._get_data_key(tenant_id) if needs_data_key else None
+        return await self.master.map_batch(
+            lambda chunk: [self._decrypt_with(data_key, encrypted_data) for encrypted_data in chunk],
+            encrypted_values
+        )
+
+    async def reencrypt_batch(self, tenant_id: str, encrypted_values: Sequence[str]) -> List[Optional[str]]:
+        """
+        Move values encrypted with the master key directly (v1/v2) to the tenant's data key.
+
+        Returns:
+            One re-encrypted string per value, or None where the value is already v3
+
+        Raises:
+            RuntimeError: If any value fails to decrypt
+        """
+        # Only create the data key when there is something to move onto it
+        if all(EncryptionService.storage_version(value) == STORAGE_FORMAT_V3 for value in encrypted_values):
+            return [None] * len(encrypted_values)
+        data_key = await self._get_data_key(tenant_id, create=True)
+        return await self.master.map_batch(
+            lambda chunk: [self._reencrypt_with(data_key, encrypted_data) for encrypted_data in chunk],
+            encrypted_values
+        )
+
+    def _encrypt_with(self, data_key: Fernet, plaintext: str) -> str:
+        try:
+            return ENVELOPE_TOKEN_PREFIX + data_key.encrypt(plaintext.encode('utf-8')).decode('utf-8')
+        except Exception as e:
+            logger.error(f"Encryption failed: {str(e)}")
+            raise RuntimeError(f"Failed to encrypt data: {str(e)}")
+
+    def _decrypt_with(self, data_key: Optional[Fernet], encrypted_data: str) -> str:
+        if EncryptionService.storage_version(encrypted_data) != STORAGE_FORMAT_V3:
+            return self.master.decrypt(encrypted_data)
+        try:
+            return data_key.decrypt(EncryptionService.to_fernet_token(encrypted_data)).decode('utf-8')
+        except InvalidToken:
+            logger.error("Decryption failed: value was not encrypted with this tenant's data key")
+            raise RuntimeError("Failed to decrypt data: value was not encrypted with this tenant's data key")
+        except Exception as e:
+            logger.error(f"Decryption failed: {str(e)}")
+            raise RuntimeError(f"Failed to decrypt data: {str(e)}")
+
+    def _reencrypt_with(self, data_key: Fernet, encrypted_data: str) -> Optional[str]:
+        if EncryptionService.storage_version(encrypted_data) == STORAGE_FORMAT_V3:
+            return None
+        return self._encrypt_with(data_key, self.master.decrypt(encrypted_data))
+
+
+# Global instance
+_tenant_encryption_service: Optional[TenantEncryptionService] = None
+
+def get_tenant_encryption_service() -> TenantEncryptionService:
+    """
+    Get the global tenant encryption service instance.
+    Creates it if it doesn't exist.
+    """
+    global _tenant_encryption_service
+    if _tenant_encryption_service is None:
+        _tenant_encryption_service = TenantEncryptionService(get_encryption_service())
+    return _tenant_encryption_service
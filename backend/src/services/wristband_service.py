@@ -1,5 +1,6 @@
 # Standard library imports
 from fastapi import Depends, Request, Response
+import asyncio
 import logging
 
 # Wristband imports
@@ -14,14 +15,14 @@ from wristband.fastapi_auth import (
 # Local imports
 from environment import environment as env
 from auth.wristband import wristband_auth
-from clients.wristband_client import WristbandClient
+from clients.wristband_client import WristbandAPIError, WristbandClient, WristbandCircuitOpenError
 from models.wristband.session import MySession
 from models.wristband.user import (
     User, 
     UpdateNameRequest, 
     PasswordChangeRequest,
 )
-from models.wristband.role import Role
+from models.wristband.role import Role, AssignedRolesIndex
 from models.wristband.invite import NewUserInvitationRequest
 from models.wristband.tenant import (
     Tenant, 
@@ -32,25 +33,88 @@ from models.wristband.idp import (
     IdentityProvider,
     UpsertGoogleSamlMetadata,
 )
+from utils.cache import AsyncTTLCache
+from utils.concurrency import TaskGraph
 
 logger = logging.getLogger(__name__)
 
 
+# MARK: - Caches
+def _access_denied(error: BaseException) -> bool:
+    return isinstance(error, WristbandAPIError) and error.status_code in (401, 403, 404)
+
+
+# Process-wide, keyed by WristbandService._cache_key(): the tenant plus the caller's roles,
+# so callers with the same permissions share entries and loads, and data loaded with one
+# caller's token is never served to a caller whose permissions differ. Values are raw API dicts and must not be mutated.
+# While a Wristband circuit is open, expired entries keep being served for a while.
+tenant_cache: AsyncTTLCache[dict] = AsyncTTLCache(
+    "tenant",
+    ttl_seconds=env.tenant_cache_ttl_seconds,
+    max_entries=env.tenant_cache_max_entries,
+    stale_if_error_seconds=env.wristband_circuit_stale_seconds,
+    serve_stale_on=(WristbandCircuitOpenError,),
+)
+tenant_roles_cache: AsyncTTLCache[list[dict]] = AsyncTTLCache(
+    "tenant_roles",
+    ttl_seconds=env.tenant_cache_ttl_seconds,
+    max_entries=env.tenant_cache_max_entries,
+    stale_if_error_seconds=env.wristband_circuit_stale_seconds,
+    serve_stale_on=(WristbandCircuitOpenError,),
+)
+# Stale-while-revalidate: served from memory, refreshed in the background once older than the soft TTL.
+# A refresh that is refused (the caller lost access) drops the entry rather than keep serving it.
+tenant_users_cache: AsyncTTLCache[list[dict]] = AsyncTTLCache(
+    "tenant_users",
+    ttl_seconds=env.users_cache_ttl_seconds,
+    soft_ttl_seconds=env.users_cache_soft_ttl_seconds,
+    max_entries=env.users_cache_max_entries,
+    stale_if_error_seconds=env.wristband_circuit_stale_seconds,
+    serve_stale_on=(WristbandCircuitOpenError,),
+    drop_on_error=_access_denied,
+)
+pending_invitations_cache: AsyncTTLCache[list[dict]] = AsyncTTLCache(
+    "pending_invitations",
+    ttl_seconds=env.users_cache_ttl_seconds,
+    soft_ttl_seconds=env.users_cache_soft_ttl_seconds,
+    max_entries=env.users_cache_max_entries,
+    stale_if_error_seconds=env.wristband_circuit_stale_seconds,
+    serve_stale_on=(WristbandCircuitOpenError,),
+    drop_on_error=_access_denied,
+)
+
+
 # MARK: - Dependencies
+def get_wristband_client(request: Request) -> WristbandClient:
+    # Process-wide client created by the app lifespan (see run.py)
+    return request.app.state.wristband_client
+
 def get_wristband_service(
     request: Request,
-    session: MySession = Depends(get_session)
+    session: MySession = Depends(get_session),
+    client: WristbandClient = Depends(get_wristband_client),
 ) -> 'WristbandService':
     return WristbandService(
         request,
-        session
+        session,
+        client
     )
 
 # MARK: - Service
 class WristbandService:
-    def __init__(self, request: Request, session: MySession):
+    def __init__(self, request: Request, session: MySession, client: WristbandClient):
         self.request = request
         self.session = session
+        self.client = client
+
+    def _cache_key(self) -> tuple:
+        # Wristband applies permissions per token, and they follow from the caller's roles
+        return (self.session.tenant_id, tuple(sorted(self.session.roles or ())))
+
+    def _invalidate_tenant(self, cache: AsyncTTLCache) -> None:
+        # Writes change what every caller in the tenant sees
+        tenant_id = self.session.tenant_id
+        cache.invalidate_matching(lambda key: key[0] == tenant_id)
 
     async def login(self) -> Response:
         return await wristband_auth.login(self.request)
@@ -114,29 +178,27 @@ class WristbandService:
 
     # MARK: - User APIs
     async def get_user_info(self, user_id: str | None = None) -> User:
-        # Get user data
-        user_data = await WristbandClient().get_user_info(
-            user_id=user_id or self.session.user_id,
-            access_token=self.session.access_token
-        )
-        
-        # Get and attach user roles
-        roles_data = await WristbandClient().resolve_assigned_roles_for_users(
-            user_ids=[user_data['id']],
-            access_token=self.session.access_token
+        user_id = user_id or self.session.user_id
+
+        # User data and assigned roles are independent, so fetch them concurrently
+        user_data, roles_data = await asyncio.gather(
+            self.client.get_user_info(
+                user_id=user_id,
+                access_token=self.session.access_token
+            ),
+            self.client.resolve_assigned_roles_for_users(
+                user_ids=[user_id],
+                access_token=self.session.access_token
+            ),
         )
         
         # Extract role SKUs
-        user_roles_item = next((item for item in roles_data.get('items', []) if item['userId'] == user_data['id']), None)
-        if user_roles_item:
-            user_data['roles'] = [role['name'].split(':')[-1] for role in user_roles_item.get('roles', [])]
-        else:
-            user_data['roles'] = []
+        user_data['roles'] = AssignedRolesIndex(roles_data).skus_for(user_data['id'])
         
         return User(**user_data)
 
     async def update_user_profile(self, update_name_request: UpdateNameRequest) -> User:
-        user_data = await WristbandClient().update_user(
+        user_data = await self.client.update_user(
             user_id=self.session.user_id,
             data=update_name_request.to_payload(),
             access_token=self.session.access_token
@@ -144,7 +206,7 @@ class WristbandService:
         return User(**user_data)
 
     async def change_user_password(self, password_data: PasswordChangeRequest) -> None:
-        return await WristbandClient().change_password(
+        return await self.client.change_password(
             user_id=self.session.user_id,
             current_password=password_data.current_password,
             new_password=password_data.new_password,
@@ -153,129 +215,174 @@ class WristbandService:
 
     async def get_user_roles(self) -> list[Role]:
         # Get roles data from API
-        roles_data = await WristbandClient().resolve_assigned_roles_for_users(
+        roles_data = await self.client.resolve_assigned_roles_for_users(
             user_ids=[self.session.user_id],
             access_token=self.session.access_token
         )
         
         # Map dict to Role models
-        user_roles_item = next((item for item in roles_data.get('items', []) if item['userId'] == self.session.user_id), None)
-        if user_roles_item:
-            return [Role(**role_dict) for role_dict in user_roles_item.get('roles', [])]
-        return []
+        return [Role(**role_dict) for role_dict in AssignedRolesIndex(roles_data).roles_for(self.session.user_id)]
 
     async def update_user_roles(self, user_id: str, new_role_ids: list[str], existing_role_ids: list[str]) -> None:
-        client = WristbandClient()
-        
-        # Get current roles to determine what needs to be removed
-        roles_data = await client.resolve_assigned_roles_for_users(
-            user_ids=[user_id],
-            access_token=self.session.access_token
-        )
-        
-        user_roles_item = next((item for item in roles_data.get('items', []) if item['userId'] == user_id), None)
-        current_role_ids = [role['id'] for role in user_roles_item.get('roles', [])] if user_roles_item else []
-        
         # Determine roles to keep (existing) + add (new)
-        final_role_ids = list(set(existing_role_ids + new_role_ids))
-        
-        # Determine roles to remove
-        roles_to_remove = [role_id for role_id in current_role_ids if role_id not in final_role_ids]
-        
-        # Unassign roles that should be removed
-        if roles_to_remove:
-            await client.unassign_roles_from_user(
-                user_id=user_id,
-                role_ids=roles_to_remove,
+        final_role_ids = set(existing_role_ids + new_role_ids)
+
+        async def get_current_role_ids() -> list[str]:
+            roles_data = await self.client.resolve_assigned_roles_for_users(
+                user_ids=[user_id],
                 access_token=self.session.access_token
             )
-        
-        # Add new roles (if any)
-        if new_role_ids:
-            await client.update_user_role_assignments(
-                user_id=user_id,
-                role_ids=new_role_ids,
-                access_token=self.session.access_token
+            return AssignedRolesIndex(roles_data).role_ids_for(user_id)
+
+        async def unassign_removed_roles(current_role_ids: list[str]) -> None:
+            # Unassign current roles that should be removed
+            roles_to_remove = [role_id for role_id in current_role_ids if role_id not in final_role_ids]
+            if roles_to_remove:
+                await self.client.unassign_roles_from_user(
+                    user_id=user_id,
+                    role_ids=roles_to_remove,
+                    access_token=self.session.access_token
+                )
+
+        async def assign_new_roles() -> None:
+            # Add new roles (if any); never touches roles being removed, so it
+            # does not need to wait for the current roles lookup
+            if new_role_ids:
+                await self.client.update_user_role_assignments(
+                    user_id=user_id,
+                    role_ids=new_role_ids,
+                    access_token=self.session.access_token
+                )
+
+        try:
+            await (
+                TaskGraph()
+                .add('current_role_ids', get_current_role_ids)
+                .add('unassign', unassign_removed_roles, after=['current_role_ids'])
+                .add('assign', assign_new_roles)
+                .run()
             )
+        finally:
+            # Role assignments changed (possibly partially), so drop cached roles and users
+            self._invalidate_tenant(tenant_roles_cache)
+            self._invalidate_tenant(tenant_users_cache)
 
     async def delete_user(self, user_id: str) -> None:
-        await WristbandClient().delete_user(
+        await self.client.delete_user(
             user_id=user_id,
             access_token=self.session.access_token
         )
+        self._invalidate_tenant(tenant_users_cache)
 
     # MARK: - Users APIs
     async def get_users(self) -> list[User]:
-        # Get users data
-        users_data = await WristbandClient().query_tenant_users(
-            tenant_id=self.session.tenant_id,
-            access_token=self.session.access_token
-        )
-        
-        # Get roles for all users
-        user_ids = [user['id'] for user in users_data]
-        roles_data = await WristbandClient().resolve_assigned_roles_for_users(
-            user_ids=user_ids,
-            access_token=self.session.access_token
+        tenant_id = self.session.tenant_id
+        access_token = self.session.access_token
+        users_data = await tenant_users_cache.get_or_load(
+            self._cache_key(),
+            lambda: self._fetch_users_with_roles(tenant_id, access_token)
         )
+        return [User(**user_dict) for user_dict in users_data]
+
+    async def _fetch_users_with_roles(self, tenant_id: str, access_token: str) -> list[dict]:
+        # May run as a background cache refresh after the request has finished, so only
+        # the tenant_id/access_token passed in are used here, never self.session.
+
+        # Start resolving roles for each page of users as soon as that page arrives,
+        # instead of waiting for the whole tenant to be listed first
+        roles_semaphore = asyncio.Semaphore(max(1, env.wristband_roles_chunk_concurrency))
+        role_tasks: list[asyncio.Task] = []
+
+        async def resolve_page_roles(user_ids: list[str]) -> dict:
+            async with roles_semaphore:
+                return await self.client.resolve_assigned_roles_for_users(
+                    user_ids=user_ids,
+                    access_token=access_token
+                )
+
+        def on_users_page(page_users: list[dict]) -> None:
+            if page_users:
+                role_tasks.append(asyncio.ensure_future(resolve_page_roles([user['id'] for user in page_users])))
+
+        try:
+            users_data = await self.client.query_tenant_users(
+                tenant_id=tenant_id,
+                access_token=access_token,
+                on_page=on_users_page
+            )
+            roles_pages = await asyncio.gather(*role_tasks)
+        except BaseException:
+            for task in role_tasks:
+                task.cancel()
+            await asyncio.gather(*role_tasks, return_exceptions=True)
+            raise
         
         # Attach roles to each user
+        roles_index = AssignedRolesIndex({'items': [item for page in roles_pages for item in page.get('items', [])]})
         for user_dict in users_data:
-            user_roles_item = next((item for item in roles_data.get('items', []) if item['userId'] == user_dict['id']), None)
-            if user_roles_item:
-                user_dict['roles'] = [role['name'].split(':')[-1] for role in user_roles_item.get('roles', [])]
-            else:
-                user_dict['roles'] = []
+            user_dict['roles'] = roles_index.skus_for(user_dict['id'])
         
-        return [User(**user_dict) for user_dict in users_data]
+        return users_data
 
     async def invite_user(self, email: str, role_ids: list[str]) -> None:
-        await WristbandClient().invite_user(
+        await self.client.invite_user(
             tenant_id=self.session.tenant_id,
             email=email,
             roles_to_assign=role_ids,
             access_token=self.session.access_token
         )
+        self._invalidate_tenant(pending_invitations_cache)
+        self._invalidate_tenant(tenant_users_cache)
 
     async def get_invitations(self) -> list[NewUserInvitationRequest]:
-        invitations_data = await WristbandClient().query_new_user_invitation_requests(
+        invitations_data = await self.client.query_new_user_invitation_requests(
             tenant_id=self.session.tenant_id,
             access_token=self.session.access_token
         )
         return [NewUserInvitationRequest(**inv) for inv in invitations_data]
 
     async def get_pending_invitations(self) -> list[NewUserInvitationRequest]:
-        invitations_data = await WristbandClient().query_new_user_invitation_requests(
-            tenant_id=self.session.tenant_id,
-            access_token=self.session.access_token,
-            pending_only=True
+        tenant_id = self.session.tenant_id
+        access_token = self.session.access_token
+        invitations_data = await pending_invitations_cache.get_or_load(
+            self._cache_key(),
+            lambda: self.client.query_new_user_invitation_requests(
+                tenant_id=tenant_id,
+                access_token=access_token,
+                pending_only=True
+            )
         )
         return [NewUserInvitationRequest(**inv) for inv in invitations_data]
 
     async def cancel_invitation(self, invitation_id: str) -> None:
-        await WristbandClient().cancel_new_user_invitation(
+        await self.client.cancel_new_user_invitation(
             invitation_id=invitation_id,
             access_token=self.session.access_token
         )
+        self._invalidate_tenant(pending_invitations_cache)
         
     # MARK: - Tenant APIs
     async def get_tenant_info(self) -> Tenant:
-        tenant_data = await WristbandClient().get_tenant(
-            tenant_id=self.session.tenant_id,
-            access_token=self.session.access_token
+        tenant_data = await tenant_cache.get_or_load(
+            self._cache_key(),
+            lambda: self.client.get_tenant(
+                tenant_id=self.session.tenant_id,
+                access_token=self.session.access_token
+            )
         )
         return Tenant(**tenant_data)
 
     async def update_tenant_info(self, tenant_data: TenantUpdateRequest) -> Tenant:
-        updated_data = await WristbandClient().update_tenant(
+        updated_data = await self.client.update_tenant(
             tenant_id=self.session.tenant_id,
             data=tenant_data.model_dump(by_alias=True, exclude_unset=True),
             access_token=self.session.access_token
         )
+        self._invalidate_tenant(tenant_cache)
         return Tenant(**updated_data)
 
     async def get_tenant_options(self) -> list[TenantOption]:
-        tenants_data = await WristbandClient().fetch_tenants(
+        tenants_data = await self.client.fetch_tenants(
             access_token=self.session.access_token,
             application_id=env.application_id,
             email=self.session.email
@@ -284,15 +391,18 @@ class WristbandService:
 
     # MARK: - Role APIs
     async def get_roles(self) -> list[Role]:
-        roles_data = await WristbandClient().query_tenant_roles(
-            tenant_id=self.session.tenant_id,
-            access_token=self.session.access_token
+        roles_data = await tenant_roles_cache.get_or_load(
+            self._cache_key(),
+            lambda: self.client.query_tenant_roles(
+                tenant_id=self.session.tenant_id,
+                access_token=self.session.access_token
+            )
         )
         return [Role(**role) for role in roles_data]
 
     # MARK: - IDP APIs
     async def get_identity_providers(self) -> list[IdentityProvider]:
-        idps_data = await WristbandClient().get_identity_providers(
+        idps_data = await self.client.get_identity_providers(
             tenant_id=self.session.tenant_id,
             access_token=self.session.access_token
         )
@@ -300,13 +410,13 @@ class WristbandService:
 
     async def upsert_google_saml_idp(self, metadata: UpsertGoogleSamlMetadata) -> dict:
         # Enable tenant-level IDP override toggle first
-        await WristbandClient().upsert_idp_override_toggle(
+        await self.client.upsert_idp_override_toggle(
             tenant_id=self.session.tenant_id,
             access_token=self.session.access_token
         )
         
         # Upsert the Google IDP
-        return await WristbandClient().upsert_google_saml_identity_provider(
+        return await self.client.upsert_google_saml_identity_provider(
             tenant_id=self.session.tenant_id,
             access_token=self.session.access_token,
             metadata=metadata.model_dump(by_alias=True)
@@ -314,13 +424,13 @@ class WristbandService:
 
     async def upsert_okta_idp(self, domain_name: str, client_id: str, client_secret: str, enabled: bool = True) -> dict:
         # Enable tenant-level IDP override toggle first
-        await WristbandClient().upsert_idp_override_toggle(
+        await self.client.upsert_idp_override_toggle(
             tenant_id=self.session.tenant_id,
             access_token=self.session.access_token
         )
         
         # Upsert the Okta IDP
-        return await WristbandClient().upsert_okta_identity_provider(
+        return await self.client.upsert_okta_identity_provider(
             tenant_id=self.session.tenant_id,
             access_token=self.session.access_token,
             domain_name=domain_name,
@@ -330,7 +440,7 @@ class WristbandService:
         )
 
     async def get_okta_redirect_url(self) -> str | None:
-        redirect_configs = await WristbandClient().resolve_idp_redirect_url_overrides(
+        redirect_configs = await self.client.resolve_idp_redirect_url_overrides(
             tenant_id=self.session.tenant_id,
             access_token=self.session.access_token
         )
@@ -342,7 +452,7 @@ class WristbandService:
         return None
 
     async def test_okta_connection(self) -> bool:
-        return await WristbandClient().test_idp_connection(
+        return await self.client.test_idp_connection(
             tenant_id=self.session.tenant_id,
             access_token=self.session.access_token,
             idp_type='OKTA'
@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar
+
+from utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncTTLCache(Generic[T]):
+    """
+    In-process async cache with a TTL, LRU eviction bounded by max_entries, and
+    single-flight loading: concurrent misses for the same key share one loader call.
+
+    If soft_ttl_seconds is set, the cache is stale-while-revalidate: an entry older than
+    the soft TTL (but younger than ttl_seconds) is still returned immediately, and one
+    background refresh is started to replace it. A failed refresh keeps the old entry.
+
+    Loaders run in their own task, so a caller that is cancelled (e.g. the client
+    disconnected) does not cancel the load for the other callers waiting on it.
+    Values are shared between callers and must be treated as read-only.
+
+    on_evict, if given, is called with every value that leaves the cache (LRU eviction,
+    expiry, replacement, invalidate or clear), e.g. to wipe sensitive data.
+
+    If stale_if_error_seconds is set, expired entries are kept that much longer, and a
+    reload of such an entry that fails with one of the serve_stale_on exceptions (e.g.
+    an open circuit breaker) returns the stale value instead of raising.
+
+    drop_on_error, if given, is called with the exception of every failed load; when it
+    returns True the key's entry is dropped instead of kept (e.g. the caller's access was
+    revoked, so neither stale-while-revalidate nor stale-if-error may serve it again).
+    """
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float,
+        max_entries: int,
+        soft_ttl_seconds: float | None = None,
+        on_evict: Callable[[T], None] | None = None,
+        stale_if_error_seconds: float = 0.0,
+        serve_stale_on: tuple[type[BaseException], ...] = (),
+        drop_on_error: Callable[[BaseException], bool] | None = None,
+    ):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.soft_ttl_seconds = soft_ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.on_evict = on_evict
+        self.stale_if_error_seconds = stale_if_error_seconds if serve_stale_on else 0.0
+        self.serve_stale_on = serve_stale_on
+        self.drop_on_error = drop_on_error
+        self._entries: OrderedDict[Hashable, tuple[float, T]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        # Strong references to running loads; invalidate() detaches them from _inflight
+        self._tasks: set[asyncio.Future] = set()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._stale_hits = 0
+        self._refresh_failures = 0
+        self._stale_if_error_hits = 0
+        self._dropped_on_error = 0
+        register_metrics(f"cache.{name}", self.stats)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        """Return the cached value for key, calling loader on a miss or expiry."""
+        entry = self._entries.get(key)
+        stale: tuple[float, T] | None = None
+        if entry is not None:
+            stored_at, value = entry
+            age = time.monotonic() - stored_at
+            if age < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                if self.soft_ttl_seconds is not None and age >= self.soft_ttl_seconds and key not in self._inflight:
+                    self._stale_hits += 1
+                    self._start_load(key, loader, background=True)
+                return value
+            if age < self.ttl_seconds + self.stale_if_error_seconds:
+                stale = entry
+            else:
+                self._expire(key)
+
+        try:
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                self._coalesced += 1
+                return await asyncio.shield(inflight)
+
+            self._misses += 1
+            return await asyncio.shield(self._start_load(key, loader, background=False))
+        except self.serve_stale_on:
+            # Only serve the entry if the failed load has not been replaced or invalidated meanwhile
+            if stale is None or self._entries.get(key) is not stale:
+                raise
+            self._stale_if_error_hits += 1
+            return stale[1]
+
+    def _start_load(self, key: Hashable, loader: Callable[[], Awaitable[T]], background: bool) -> asyncio.Future:
+        task = asyncio.ensure_future(self._load(key, loader))
+        self._inflight[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(lambda t: self._on_load_done(key, t, background))
+        return task
+
+    def _on_load_done(self, key: Hashable, task: asyncio.Future, background: bool) -> None:
+        self._tasks.discard(task)
+        if task.cancelled():
+            return
+        # Always retrieve the exception so an abandoned load never logs "exception was never retrieved"
+        error = task.exception()
+        if error is not None and self.drop_on_error is not None and self.drop_on_error(error):
+            # Only if no newer load has taken over the key meanwhile
+            if self._inflight.get(key) in (None, task):
+                self._dropped_on_error += 1
+                self.invalidate(key)
+        if error is not None and background:
+            self._refresh_failures += 1
+            logger.warning(f"Background refresh of cache '{self.name}' failed for key {key!r}: {error}")
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        task = asyncio.current_task()
+        try:
+            value = await loader()
+            # Only store if nobody invalidated the key while the load was running
+            if self._inflight.get(key) is task:
+                self.set(key, value)
+            return value
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+
+    def peek(self, key: Hashable) -> T | None:
+        """
+        Return the cached value for key if present and fresh, without loading. Read-only:
+        does not count as a hit or miss, refresh LRU order, or expire the entry.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+            return entry[1]
+        return None
+
+    def set(self, key: Hashable, value: T) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None and previous[1] is not value:
+            self._evicted(previous[1])
+        self._entries[key] = (time.monotonic(), value)
+        while len(self._entries) > self.max_entries:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._evictions += 1
+            self._evicted(evicted)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop the cached value and detach any in-flight load so its result is not stored."""
+        entry = self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+        if entry is not None:
+            self._evicted(entry[1])
+
+    def invalidate_matching(self, predicate: Callable[[Hashable], bool]) -> None:
+        """invalidate() every cached or loading key for which predicate(key) is true."""
+        for key in [key for key in {**self._entries, **self._inflight} if predicate(key)]:
+            self.invalidate(key)
+
+    def clear(self) -> None:
+        entries = list(self._entries.values())
+        self._entries.clear()
+        self._inflight.clear()
+        for _, value in entries:
+            self._evicted(value)
+
+    def _expire(self, key: Hashable) -> None:
+        _, value = self._entries.pop(key)
+        self._expirations += 1
+        self._evicted(value)
+
+    def _evicted(self, value: T) -> None:
+        if self.on_evict is not None:
+            self.on_evict(value)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self._hits + self._misses + self._coalesced
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "soft_ttl_seconds": self.soft_ttl_seconds,
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+            "stale_hits": self._stale_hits,
+            "refresh_failures": self._refresh_failures,
+            "stale_if_error_hits": self._stale_if_error_hits,
+            "dropped_on_error": self._dropped_on_error,
+            "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,132 @@
+import logging
+import time
+from collections import Counter, deque
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Fails calls to a degraded dependency fast instead of letting them queue up.
+
+    Closed: calls go through and their outcomes fill a sliding window of the last
+    `window_size` calls. A call fails if it errored or took longer than `slow_call_seconds`.
+    Once the window holds at least `min_calls` outcomes and the failure rate reaches
+    `failure_rate_threshold`, the circuit opens.
+
+    Open: allow() returns False for `open_seconds`, then the circuit goes half-open.
+
+    Half-open: up to `half_open_max_calls` probe calls go through. If they all succeed the
+    circuit closes; any failure opens it again.
+
+    Callers check allow() before a call and report it with record() afterwards. Not
+    thread-safe; meant to be used from a single event loop.
+    """
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float,
+        slow_call_seconds: float,
+        window_size: int,
+        min_calls: int,
+        open_seconds: float,
+        half_open_max_calls: int,
+    ) -> None:
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = max(1, min_calls)
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._window: deque[bool] = deque(maxlen=max(1, window_size))
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._rejected = 0
+        self._transitions: Counter[str] = Counter()
+        self._recent_transitions: deque[dict[str, Any]] = deque(maxlen=20)
+
+    @property
+    def state(self) -> str:
+        """The effective state; reading it never changes the breaker."""
+        if self._state == OPEN and self._open_elapsed():
+            return HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Return True if a call may go through now. Every allowed call must be record()ed."""
+        if self._state == OPEN and self._open_elapsed():
+            self._transition(HALF_OPEN)
+        state = self._state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+            self._probes_in_flight += 1
+            return True
+        self._rejected += 1
+        return False
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets probe calls through (0 when not open)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    def record(self, success: bool | None, duration: float) -> None:
+        """
+        Report the outcome of an allowed call. success=None means the call was abandoned
+        (e.g. cancelled) and says nothing about the dependency's health.
+        """
+        if self._state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+        if success is None:
+            return
+
+        failed = not success or duration >= self.slow_call_seconds
+        if self._state == HALF_OPEN:
+            if failed:
+                self._transition(OPEN)
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_max_calls:
+                    self._transition(CLOSED)
+        elif self._state == CLOSED:
+            self._window.append(failed)
+            if len(self._window) >= self.min_calls and self._failure_rate() >= self.failure_rate_threshold:
+                self._transition(OPEN)
+
+    def _open_elapsed(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.open_seconds
+
+    def _failure_rate(self) -> float:
+        return sum(self._window) / len(self._window) if self._window else 0.0
+
+    def _transition(self, state: str) -> None:
+        previous, self._state = self._state, state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state in (OPEN, CLOSED):
+            self._window.clear()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._transitions[f"{previous}->{state}"] += 1
+        self._recent_transitions.append({"from": previous, "to": state, "at": time.time()})
+        log = logger.warning if state == OPEN else logger.info
+        log(f"Circuit '{self.name}' {previous} -> {state}")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "failure_rate": round(self._failure_rate(), 4),
+            "window_calls": len(self._window),
+            "rejected": self._rejected,
+            "retry_after_seconds": round(self.retry_after(), 1),
+            "transitions": dict(self._transitions),
+            "recent_transitions": list(self._recent_transitions),
+        }
@@ -0,0 +1,81 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+
+
+async def gather_bounded(aws: Iterable[Awaitable[T]], limit: int) -> list[T]:
+    """
+    Like asyncio.gather, but runs at most `limit` awaitables at a time.
+    Results are returned in the same order as `aws`. If one fails, the rest are
+    cancelled before the error is raised.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(aw: Awaitable[T]) -> T:
+        async with semaphore:
+            return await aw
+
+    tasks = [asyncio.ensure_future(run(aw)) for aw in aws]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        await _cancel_all(tasks)
+        raise
+
+
+async def _cancel_all(tasks: Iterable[asyncio.Future]) -> None:
+    tasks = list(tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class TaskGraph:
+    """
+    Declare async steps and their dependencies, then run every step as soon as the
+    steps it depends on have finished. Independent steps run concurrently.
+
+    Each step function receives the results of its dependencies as keyword arguments:
+
+        graph = TaskGraph()
+        graph.add('user', lambda: client.get_user_info(...))
+        graph.add('roles', lambda: client.resolve_assigned_roles_for_users(...))
+        graph.add('merged', lambda user, roles: merge(user, roles), after=['user', 'roles'])
+        results = await graph.run()  # {'user': ..., 'roles': ..., 'merged': ...}
+
+    Dependencies must be added before the steps that use them, which also rules out
+    cycles. If any step fails, the remaining steps are cancelled and the error is raised.
+    """
+    def __init__(self) -> None:
+        self._steps: dict[str, tuple[Callable[..., Awaitable[Any]], tuple[str, ...]]] = {}
+
+    def add(self, name: str, fn: Callable[..., Awaitable[Any]], after: Iterable[str] = ()) -> 'TaskGraph':
+        if name in self._steps:
+            raise ValueError(f"Step '{name}' is already defined")
+        deps = tuple(after)
+        for dep in deps:
+            if dep not in self._steps:
+                raise ValueError(f"Step '{name}' depends on unknown step '{dep}'")
+        self._steps[name] = (fn, deps)
+        return self
+
+    async def run(self) -> dict[str, Any]:
+        tasks: dict[str, asyncio.Future] = {}
+
+        async def run_step(name: str) -> Any:
+            fn, deps = self._steps[name]
+            dep_results = {dep: await tasks[dep] for dep in deps}
+            return await fn(**dep_results)
+
+        # Steps are stored in declaration order, so dependencies always exist already
+        for name in self._steps:
+            tasks[name] = asyncio.ensure_future(run_step(name))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            await _cancel_all(tasks.values())
+            raise
+
+        return {name: task.result() for name, task in tasks.items()}
@@ -0,0 +1,15 @@
+from typing import Any, Callable
+
+# Process-wide registry of metric providers. Components register a callable that
+# returns a JSON-serialisable snapshot of their counters; GET /internal/metrics reports them to operators.
+_providers: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], dict[str, Any]]) -> None:
+    """Register (or replace) the metrics provider for a component."""
+    _providers[name] = provider
+
+
+def metrics_snapshot() -> dict[str, dict[str, Any]]:
+    """Return the current metrics of every registered component."""
+    return {name: provider() for name, provider in sorted(_providers.items())}
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Hashable
+
+
+class FairLimiter:
+    """
+    Async limiter combining a cap on calls in flight with a token bucket for calls per
+    second, with a fair queue in front of both.
+
+    Waiters are queued per flow (e.g. per tenant) and served round-robin across flows,
+    so one flow with many queued calls cannot starve the others; within a flow they are
+    served in arrival order. max_in_flight or rate_per_second <= 0 disables that limit.
+    The bucket holds up to `burst` tokens (default: one second's worth).
+
+    Not thread-safe; meant to be used from a single event loop.
+    """
+    def __init__(self, name: str, max_in_flight: int, rate_per_second: float = 0.0, burst: float | None = None) -> None:
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.rate_per_second = rate_per_second
+        self.burst = max(1.0, burst if burst is not None else rate_per_second)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._in_flight = 0
+        self._queues: OrderedDict[Hashable, deque[asyncio.Future]] = OrderedDict()
+        self._refill_timer: asyncio.TimerHandle | None = None
+        self._acquired = 0
+        self._queued = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @asynccontextmanager
+    async def slot(self, flow: Hashable = None) -> AsyncIterator[None]:
+        """Hold one slot for the duration of the block, waiting in `flow`'s queue if needed."""
+        await self.acquire(flow)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, flow: Hashable = None) -> float:
+        """Wait for a slot. Returns the time spent queued, in seconds."""
+        if not self._queues and self._try_take():
+            self._acquired += 1
+            return 0.0
+
+        start = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(flow, deque()).append(waiter)
+        self._queued += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as the caller was cancelled; hand the slot on
+                self.release()
+            raise
+
+        waited = time.monotonic() - start
+        self._acquired += 1
+        self._waits += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        return waited
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    @property
+    def busy(self) -> bool:
+        """True while calls are in flight or queued, so the limiter must not be dropped."""
+        return self._in_flight > 0 or bool(self._queues)
+
+    @property
+    def idle(self) -> bool:
+        """True when nothing is in flight or queued and the bucket is full, so dropping
+        the limiter and creating a fresh one later changes nothing."""
+        if self.busy:
+            return False
+        if self.rate_per_second > 0:
+            self._refill()
+            return self._tokens >= self.burst
+        return True
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def _try_take(self) -> bool:
+        if 0 < self.max_in_flight <= self._in_flight:
+            return False
+        if self.rate_per_second > 0:
+            self._refill()
+            if self._tokens < 1:
+                self._schedule_refill()
+                return False
+            self._tokens -= 1
+        self._in_flight += 1
+        return True
+
+    def _schedule_refill(self) -> None:
+        if self._refill_timer is None:
+            delay = (1 - self._tokens) / self.rate_per_second
+            self._refill_timer = asyncio.get_running_loop().call_later(delay, self._on_refill)
+
+    def _on_refill(self) -> None:
+        self._refill_timer = None
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._queues:
+            flow, queue = next(iter(self._queues.items()))
+            # Skip waiters whose callers gave up
+            while queue and queue[0].done():
+                queue.popleft()
+            if not queue:
+                del self._queues[flow]
+                continue
+            if not self._try_take():
+                return
+            queue.popleft().set_result(None)
+            # Round-robin: the flow goes to the back of the line
+            del self._queues[flow]
+            if queue:
+                self._queues[flow] = queue
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "rate_per_second": self.rate_per_second,
+            "in_flight": self._in_flight,
+            "waiting": sum(len(queue) for queue in self._queues.values()),
+            "waiting_flows": len(self._queues),
+            "acquired": self._acquired,
+            "queued": self._queued,
+            "avg_queue_wait_ms": round(self._total_wait / self._waits * 1000, 1) if self._waits else 0.0,
+            "max_queue_wait_ms": round(self._max_wait * 1000, 1),
+        }
@@ -0,0 +1,83 @@
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    Exponential backoff with full jitter: a random delay between 0 and
+    base_delay * 2**attempt, capped at max_delay. attempt is 0 for the first retry.
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a Retry-After header, given either in seconds or as an HTTP date.
+    Returns the delay in seconds, or None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryBudget:
+    """
+    Caps retries at a fraction of recent traffic so that retries cannot multiply load
+    during an outage.
+
+    Every request deposits `ratio` tokens and every retry withdraws one, so with
+    ratio=0.1 at most about one in ten requests is retried. `min_per_second` tokens are
+    also added over time so low-traffic processes can still retry occasionally. The
+    balance is capped at `max_tokens`.
+    """
+    def __init__(self, ratio: float, min_per_second: float, max_tokens: float = 100.0) -> None:
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+        self._requests = 0
+        self._retries = 0
+        self._denied = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def record_request(self) -> None:
+        """Record a first attempt, funding future retries."""
+        self._refill()
+        self._requests += 1
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """Take one retry from the budget. Returns False if the budget is exhausted."""
+        self._refill()
+        if self._tokens < 1:
+            self._denied += 1
+            return False
+        self._tokens -= 1
+        self._retries += 1
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        self._refill()
+        return {
+            "requests": self._requests,
+            "retries": self._retries,
+            "retries_denied": self._denied,
+            "tokens": round(self._tokens, 2),
+        }
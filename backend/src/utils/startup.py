@@ -0,0 +1,33 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+# Wall-clock seconds each startup step took, in the order they ran
+_timings: dict[str, float] = {}
+
+
+@contextmanager
+def startup_timer(name: str) -> Iterator[None]:
+    """Time a startup step and record it in the startup report, even if it fails."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _timings[name] = time.perf_counter() - start
+        logger.info(f"Startup: {name} took {_timings[name] * 1000:.1f}ms")
+
+
+def startup_report() -> dict[str, Any]:
+    """Return the duration of every timed startup step and their total."""
+    return {
+        "steps_ms": {name: round(seconds * 1000, 1) for name, seconds in _timings.items()},
+        "total_ms": round(sum(_timings.values()) * 1000, 1),
+    }
+
+
+register_metrics("startup", startup_report)
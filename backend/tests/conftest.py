@@ -0,0 +1,56 @@
+import os
+import sys
+from pathlib import Path
+
+# The app imports its modules from src/ (see run.py), and environment.py requires these
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+os.environ.setdefault("CLIENT_ID", "test-client-id")
+os.environ.setdefault("CLIENT_SECRET", "test-client-secret-test-client-secret")
+os.environ.setdefault("APPLICATION_VANITY_DOMAIN", "example.wristband.dev")
+os.environ.setdefault("APPLICATION_ID", "test-application-id")
+
+import httpx
+import pytest
+
+from clients.wristband_client import WristbandClient
+
+
+@pytest.fixture
+async def make_wristband_client():
+    """
+    Build WristbandClients whose requests go to `handler` (an httpx.MockTransport handler)
+    instead of the network.
+    """
+    clients: list[WristbandClient] = []
+
+    def make(handler) -> WristbandClient:
+        client = WristbandClient()
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        await client.aclose()
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """An in-memory Firestore installed as database.doc_store's client."""
+    from database import doc_store
+    from fake_firestore import FakeFirestore
+
+    db = FakeFirestore()
+    monkeypatch.setattr(doc_store, "db", db)
+    return db
+
+
+@pytest.fixture
+def fake_async_db(monkeypatch):
+    """An in-memory Firestore installed as database.async_doc_store's client."""
+    from database import async_doc_store
+    from fake_firestore import FakeFirestore
+
+    db = FakeFirestore(is_async=True)
+    monkeypatch.setattr(async_doc_store, "db", db)
+    return db
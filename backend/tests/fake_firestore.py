@@ -0,0 +1,210 @@
+"""
+In-memory stand-in for the parts of the Firestore client that database.doc_store and
+database.async_doc_store use. Documents live in a dict keyed by their full path.
+"""
+import copy
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+
+
+class Snapshot:
+    def __init__(self, reference: "DocumentRef", data: Optional[Dict[str, Any]], field_paths: Optional[List[str]] = None):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self.update_time = reference.db.update_times.get(reference.path)
+        self._data = data
+        self._field_paths = field_paths
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        if self._data is None:
+            return None
+        data = copy.deepcopy(self._data)
+        if self._field_paths is not None:
+            data = {key: value for key, value in data.items() if key in self._field_paths}
+        return data
+
+
+class DocumentRef:
+    def __init__(self, db: "FakeFirestore", collection_path: str, doc_id: str):
+        self.db = db
+        self.id = doc_id
+        self.path = f"{collection_path}/{doc_id}"
+
+    def get(self, field_paths: Optional[List[str]] = None):
+        self.db.calls.append(("get", self.path))
+        return self.db.result(Snapshot(self, self.db.documents.get(self.path), field_paths))
+
+    def create(self, data: Dict[str, Any]):
+        self.db.calls.append(("create", self.path))
+        if self.path in self.db.documents:
+            raise AlreadyExists(f"Document already exists: {self.path}")
+        self.db.write(self.path, data)
+        return self.db.result(self.db.write_result(self.path))
+
+    def update(self, data: Dict[str, Any], option: Any = None):
+        self.db.calls.append(("update", self.path))
+        if self.path not in self.db.documents:
+            raise NotFound(f"No document to update: {self.path}")
+        # Only last-update-time preconditions (Client.write_option(last_update_time=...))
+        expected = getattr(option, "_last_update_time", None)
+        if expected is not None and expected != self.db.update_times.get(self.path):
+            raise FailedPrecondition(f"Document changed since {expected}: {self.path}")
+        self.db.write(self.path, {**self.db.documents[self.path], **data})
+        return self.db.result(self.db.write_result(self.path))
+
+
+class Query:
+    def __init__(
+        self,
+        db: "FakeFirestore",
+        path: str,
+        filters: tuple = (),
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+    ):
+        self.db = db
+        self.path = path
+        self._filters = filters
+        self._after = after
+        self._limit = limit
+        self._fields = fields
+
+    def _with(self, **changes: Any) -> "Query":
+        state = {"filters": self._filters, "after": self._after, "limit": self._limit, "fields": self._fields, **changes}
+        return Query(self.db, self.path, **state)
+
+    def document(self, doc_id: str) -> DocumentRef:
+        return DocumentRef(self.db, self.path, doc_id)
+
+    def where(self, field: str, operator: str, value: Any) -> "Query":
+        assert operator == "==", "only equality filters are supported"
+        return self._with(filters=self._filters + ((field, value),))
+
+    def order_by(self, field: str, direction: Any = None) -> "Query":
+        assert field == "__name__", "only document ID order is supported"
+        return self
+
+    def select(self, fields: List[str]) -> "Query":
+        return self._with(fields=list(fields))
+
+    def start_after(self, cursor: Dict[str, Any]) -> "Query":
+        return self._with(after=cursor["__name__"])
+
+    def limit(self, count: int) -> "Query":
+        return self._with(limit=count)
+
+    def _matches(self) -> List[Snapshot]:
+        prefix = f"{self.path}/"
+        snapshots = []
+        for path in sorted(self.db.documents):
+            doc_id = path[len(prefix):]
+            if not path.startswith(prefix) or "/" in doc_id:
+                continue
+            data = self.db.documents[path]
+            if self._after is not None and doc_id <= self._after:
+                continue
+            if all(data.get(field) == value for field, value in self._filters):
+                snapshots.append(Snapshot(self.document(doc_id), data, self._fields))
+        return snapshots[:self._limit] if self._limit is not None else snapshots
+
+    def stream(self):
+        self.db.calls.append(("stream", self.path))
+        return self.db.iterate(self._matches())
+
+
+class Batch:
+    def __init__(self, db: "FakeFirestore"):
+        self.db = db
+        self.operations: List[tuple] = []
+
+    def set(self, reference: DocumentRef, data: Dict[str, Any], merge: bool = False) -> None:
+        self.operations.append(("set", reference, data))
+
+    def update(self, reference: DocumentRef, data: Dict[str, Any], option: Any = None) -> None:
+        self.operations.append(("update", reference, data))
+
+    def delete(self, reference: DocumentRef, option: Any = None) -> None:
+        self.operations.append(("delete", reference, None))
+
+    def commit(self):
+        self.db.commits.append(len(self.operations))
+        failing = [ref.id for _, ref, _ in self.operations if ref.id in self.db.fail_commits_with]
+        if failing:
+            raise RuntimeError(f"commit rejected for {failing[0]}")
+        for op, reference, data in self.operations:
+            if op == "delete":
+                self.db.documents.pop(reference.path, None)
+            else:
+                self.db.write(reference.path, {**self.db.documents.get(reference.path, {}), **data})
+        return self.db.result(None)
+
+
+class FakeFirestore:
+    """
+    Sync by default; with is_async=True the read/write calls return awaitables and
+    streams are async iterators, like AsyncClient.
+    """
+    def __init__(self, is_async: bool = False):
+        self.is_async = is_async
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.update_times: Dict[str, int] = {}
+        self.calls: List[tuple] = []
+        self.commits: List[int] = []
+        self.get_all_sizes: List[int] = []
+        # Commits containing one of these document IDs fail
+        self.fail_commits_with: set[str] = set()
+
+    def add(self, collection_path: str, doc_id: str, data: Dict[str, Any]) -> None:
+        self.write(f"{collection_path}/{doc_id}", data)
+
+    def write(self, path: str, data: Dict[str, Any]) -> None:
+        self.documents[path] = copy.deepcopy(data)
+        self.update_times[path] = self.update_times.get(path, 0) + 1
+
+    def write_result(self, path: str) -> SimpleNamespace:
+        return SimpleNamespace(update_time=self.update_times[path])
+
+    def collection(self, path: str) -> Query:
+        return Query(self, path)
+
+    def batch(self) -> Batch:
+        return Batch(self)
+
+    def get_all(self, references: List[DocumentRef], field_paths: Optional[List[str]] = None):
+        self.get_all_sizes.append(len(references))
+        return self.iterate([Snapshot(ref, self.documents.get(ref.path), field_paths) for ref in references])
+
+    def result(self, value: Any) -> Any:
+        if not self.is_async:
+            return value
+
+        async def resolved():
+            return value
+        return resolved()
+
+    def iterate(self, items: List[Any]) -> Any:
+        if not self.is_async:
+            return _ClosableIterator(items)
+
+        async def generate():
+            for item in items:
+                yield item
+        return generate()
+
+
+class _ClosableIterator:
+    def __init__(self, items: List[Any]):
+        self._items = iter(items)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._items)
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,64 @@
+import ast
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.endpoints import roles_api
+from api.errors import upstream_error_response, wristband_error_handler
+from auth.wristband import require_session_auth
+from clients.wristband_client import WristbandAPIError, WristbandCircuitOpenError
+from services.wristband_service import get_wristband_service
+
+pytestmark = pytest.mark.unit
+
+
+def roles_client(error: Exception) -> TestClient:
+    app = FastAPI()
+    app.add_exception_handler(WristbandAPIError, wristband_error_handler)
+    app.include_router(roles_api.router, prefix='/api/roles')
+    app.dependency_overrides[require_session_auth] = lambda: None
+    app.dependency_overrides[get_wristband_service] = lambda: SimpleNamespace(get_roles=AsyncMock(side_effect=error))
+    return TestClient(app)
+
+
+@pytest.mark.parametrize('status_code, retry_after, header', [(429, 2.5, '3'), (503, None, '1'), (503, 0.0, '1')])
+def test_upstream_throttling_and_outages_are_passed_on_with_retry_after(status_code, retry_after, header):
+    response = roles_client(WristbandAPIError('Query Tenant Roles', status_code, 'busy', retry_after=retry_after)).get('/api/roles')
+
+    assert response.status_code == status_code
+    assert response.headers['Retry-After'] == header
+
+
+def test_open_circuit_is_a_503_with_the_time_until_probes_resume():
+    response = roles_client(WristbandCircuitOpenError('Query Tenant Roles', 'roles', retry_after=12.2)).get('/api/roles')
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '13'
+
+
+@pytest.mark.parametrize('error', [WristbandAPIError('Query Tenant Roles', 400, 'bad request'), RuntimeError('boom')])
+def test_other_failures_are_still_internal_errors(error):
+    response = roles_client(error).get('/api/roles')
+
+    assert response.status_code == 500
+    assert 'Retry-After' not in response.headers
+    assert upstream_error_response(error) is None
+
+
+ENDPOINTS_DIR = Path(__file__).resolve().parents[1] / 'src' / 'api' / 'endpoints'
+
+
+@pytest.mark.parametrize('path', sorted(ENDPOINTS_DIR.glob('*_api.py')), ids=lambda path: path.name)
+def test_endpoints_leave_wristband_errors_to_the_app_handler(path):
+    # A broad except that catches WristbandAPIError would turn throttling back into a 500
+    for node in ast.walk(ast.parse(path.read_text())):
+        if not isinstance(node, ast.Try):
+            continue
+        caught = [ast.unparse(handler.type) if handler.type else 'BaseException' for handler in node.handlers]
+        if 'Exception' in caught or 'BaseException' in caught:
+            broad = min(caught.index(name) for name in ('Exception', 'BaseException') if name in caught)
+            assert 'WristbandAPIError' in caught[:broad], f'{path.name}:{node.lineno} swallows WristbandAPIError'
@@ -0,0 +1,246 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from utils import cache as cache_module
+from utils.cache import AsyncTTLCache
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for the cache module only (the event loop keeps the real one)."""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+async def settle():
+    """Let background loads and their done callbacks run."""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def counting_loader(value="value"):
+    calls = []
+
+    async def loader():
+        calls.append(value)
+        return value
+    return loader, calls
+
+
+async def test_entries_are_served_until_the_ttl_expires(clock):
+    cache = AsyncTTLCache("test_ttl", ttl_seconds=10, max_entries=10)
+    loader, calls = counting_loader()
+
+    assert await cache.get_or_load("key", loader) == "value"
+    clock.now += 9
+    assert await cache.get_or_load("key", loader) == "value"
+    assert len(calls) == 1
+
+    clock.now += 1
+    await cache.get_or_load("key", loader)
+    assert len(calls) == 2
+    assert cache.stats()["expirations"] == 1
+
+
+async def test_least_recently_used_entry_is_evicted(clock):
+    evicted = []
+    cache = AsyncTTLCache("test_lru", ttl_seconds=10, max_entries=2, on_evict=evicted.append)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    await cache.get_or_load("a", counting_loader()[0])  # "a" becomes most recently used
+    cache.set("c", "C")
+
+    assert evicted == ["B"]
+    assert cache.peek("a") == "A" and cache.peek("b") is None
+
+
+async def test_on_evict_sees_replaced_invalidated_and_cleared_values(clock):
+    evicted = []
+    cache = AsyncTTLCache("test_evict", ttl_seconds=10, max_entries=10, on_evict=evicted.append)
+    cache.set("a", "A1")
+    cache.set("a", "A2")
+    cache.set("b", "B")
+    cache.invalidate("a")
+    cache.set("c", "C")
+    cache.clear()
+
+    assert evicted == ["A1", "A2", "B", "C"]
+
+
+async def test_concurrent_misses_share_one_load():
+    cache = AsyncTTLCache("test_single_flight", ttl_seconds=10, max_entries=10)
+    release = asyncio.Event()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await release.wait()
+        return "value"
+
+    waiters = [asyncio.ensure_future(cache.get_or_load("key", loader)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == ["value"] * 5
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+async def test_cancelled_caller_does_not_cancel_the_shared_load():
+    cache = AsyncTTLCache("test_cancel", ttl_seconds=10, max_entries=10)
+    release = asyncio.Event()
+
+    async def loader():
+        await release.wait()
+        return "value"
+
+    first = asyncio.ensure_future(cache.get_or_load("key", loader))
+    second = asyncio.ensure_future(cache.get_or_load("key", loader))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "value"
+    assert cache.peek("key") == "value"
+
+
+async def test_load_invalidated_while_running_is_not_stored():
+    cache = AsyncTTLCache("test_invalidate_during_load", ttl_seconds=10, max_entries=10)
+    release = asyncio.Event()
+
+    async def stale_loader():
+        await release.wait()
+        return "stale"
+
+    pending = asyncio.ensure_future(cache.get_or_load("key", stale_loader))
+    await asyncio.sleep(0)
+    cache.invalidate("key")
+    release.set()
+
+    # The caller that started the load still gets its result, but it is not cached
+    assert await pending == "stale"
+    assert cache.peek("key") is None
+    assert await cache.get_or_load("key", counting_loader("fresh")[0]) == "fresh"
+
+
+async def test_invalidate_matching_drops_cached_and_loading_keys():
+    cache = AsyncTTLCache("test_invalidate_matching", ttl_seconds=10, max_entries=10)
+    cache.set(("tenant-a", "user-1"), "a1")
+    cache.set(("tenant-a", "user-2"), "a2")
+    cache.set(("tenant-b", "user-1"), "b1")
+    release = asyncio.Event()
+
+    async def loader():
+        await release.wait()
+        return "a3"
+
+    pending = asyncio.ensure_future(cache.get_or_load(("tenant-a", "user-3"), loader))
+    await asyncio.sleep(0)
+    cache.invalidate_matching(lambda key: key[0] == "tenant-a")
+    release.set()
+    await pending
+
+    assert cache.peek(("tenant-a", "user-1")) is None
+    assert cache.peek(("tenant-a", "user-2")) is None
+    assert cache.peek(("tenant-a", "user-3")) is None
+    assert cache.peek(("tenant-b", "user-1")) == "b1"
+
+
+async def test_soft_stale_entry_is_served_while_one_refresh_runs(clock):
+    cache = AsyncTTLCache("test_swr", ttl_seconds=60, soft_ttl_seconds=10, max_entries=10)
+    cache.set("key", "old")
+    clock.now += 11
+    loader, calls = counting_loader("new")
+
+    assert await cache.get_or_load("key", loader) == "old"
+    assert await cache.get_or_load("key", loader) == "old"
+    await settle()
+
+    assert calls == ["new"]
+    assert await cache.get_or_load("key", loader) == "new"
+    assert cache.stats()["stale_hits"] == 1
+
+
+async def test_failed_background_refresh_keeps_the_entry(clock):
+    cache = AsyncTTLCache("test_swr_failure", ttl_seconds=60, soft_ttl_seconds=10, max_entries=10)
+    cache.set("key", "old")
+    clock.now += 11
+
+    async def failing_loader():
+        raise ValueError("upstream down")
+
+    assert await cache.get_or_load("key", failing_loader) == "old"
+    await settle()
+
+    assert cache.peek("key") == "old"
+    assert cache.stats()["refresh_failures"] == 1
+
+
+async def test_refresh_failing_with_drop_on_error_drops_the_entry(clock):
+    cache = AsyncTTLCache(
+        "test_swr_drop", ttl_seconds=60, soft_ttl_seconds=10, max_entries=10,
+        drop_on_error=lambda error: isinstance(error, PermissionError),
+    )
+    cache.set("key", "old")
+    clock.now += 11
+
+    async def denied_loader():
+        raise PermissionError("access revoked")
+
+    assert await cache.get_or_load("key", denied_loader) == "old"
+    await settle()
+
+    assert cache.peek("key") is None
+    with pytest.raises(PermissionError):
+        await cache.get_or_load("key", denied_loader)
+
+
+async def test_stale_if_error_serves_expired_entry_only_for_listed_errors(clock):
+    class CircuitOpen(Exception):
+        pass
+
+    cache = AsyncTTLCache(
+        "test_stale_if_error", ttl_seconds=10, max_entries=10,
+        stale_if_error_seconds=30, serve_stale_on=(CircuitOpen,),
+    )
+    cache.set("key", "old")
+    clock.now += 15
+
+    async def circuit_open():
+        raise CircuitOpen()
+
+    async def other_failure():
+        raise ValueError("bad request")
+
+    assert await cache.get_or_load("key", circuit_open) == "old"
+    with pytest.raises(ValueError):
+        await cache.get_or_load("key", other_failure)
+
+    clock.now += 30
+    with pytest.raises(CircuitOpen):
+        await cache.get_or_load("key", circuit_open)
+
+
+def test_peek_has_no_side_effects(clock):
+    evicted = []
+    cache = AsyncTTLCache("test_peek", ttl_seconds=10, max_entries=2, on_evict=evicted.append)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    before = cache.stats()
+
+    assert cache.peek("a") == "A"
+    assert cache.peek("missing") is None
+    clock.now += 10
+    assert cache.peek("a") is None
+
+    assert cache.stats() == before
+    assert evicted == []
+    # Peeking "a" did not make it most recently used, so it is still evicted first
+    clock.now -= 10
+    cache.set("c", "C")
+    assert evicted == ["A"]
@@ -0,0 +1,98 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils import circuit_breaker as circuit_breaker_module
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(circuit_breaker_module, "time", SimpleNamespace(monotonic=lambda: clock.now, time=time.time))
+    return clock
+
+
+def make_breaker(**overrides) -> CircuitBreaker:
+    settings = dict(
+        failure_rate_threshold=0.5, slow_call_seconds=1.0, window_size=4,
+        min_calls=4, open_seconds=10.0, half_open_max_calls=2,
+    )
+    return CircuitBreaker("test", **{**settings, **overrides})
+
+
+def record(breaker: CircuitBreaker, *outcomes: bool, duration: float = 0.1) -> None:
+    for success in outcomes:
+        assert breaker.allow()
+        breaker.record(success, duration)
+
+
+def test_opens_once_the_window_failure_rate_reaches_the_threshold(clock):
+    breaker = make_breaker()
+    record(breaker, False, False, True)
+    assert breaker.state == CLOSED  # below min_calls
+
+    record(breaker, True)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.retry_after() == 10.0
+
+
+def test_slow_calls_count_as_failures(clock):
+    breaker = make_breaker()
+    record(breaker, True, True, duration=0.1)
+    record(breaker, True, True, duration=5.0)
+
+    assert breaker.state == OPEN
+
+
+def test_half_open_probes_close_the_circuit_when_they_all_succeed(clock):
+    breaker = make_breaker()
+    record(breaker, False, False, False, False)
+    clock.now += 10
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() and breaker.allow()
+    assert not breaker.allow()  # only half_open_max_calls probes at a time
+    breaker.record(True, 0.1)
+    assert breaker.state == HALF_OPEN
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens_the_circuit(clock):
+    breaker = make_breaker()
+    record(breaker, False, False, False, False)
+    clock.now += 10
+
+    record(breaker, False)
+    assert breaker.state == OPEN
+    assert breaker.retry_after() == 10.0
+
+
+def test_abandoned_probe_frees_its_slot_without_a_verdict(clock):
+    breaker = make_breaker(half_open_max_calls=1)
+    record(breaker, False, False, False, False)
+    clock.now += 10
+
+    assert breaker.allow()
+    breaker.record(None, 0.1)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert breaker.stats()["transitions"] == {"closed->open": 1, "open->half_open": 1}
+
+
+def test_reading_the_breaker_never_changes_its_state(clock):
+    breaker = make_breaker()
+    record(breaker, False, False, False, False)
+    clock.now += 10
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.retry_after() == 0.0
+    assert breaker.stats()["transitions"] == {"closed->open": 1}
+
+    assert breaker.allow()
+    assert breaker.stats()["transitions"] == {"closed->open": 1, "open->half_open": 1}
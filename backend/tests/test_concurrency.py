@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from utils.concurrency import TaskGraph, gather_bounded
+
+pytestmark = pytest.mark.unit
+
+
+async def test_gather_bounded_keeps_argument_order_and_limit():
+    running = 0
+    peak = 0
+
+    async def work(i: int) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01 * (5 - i))
+        running -= 1
+        return i
+
+    assert await gather_bounded((work(i) for i in range(5)), limit=2) == [0, 1, 2, 3, 4]
+    assert peak == 2
+
+
+async def test_gather_bounded_cancels_the_rest_on_failure():
+    cancelled: list[int] = []
+
+    async def fail() -> None:
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    async def slow(i: int) -> None:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(i)
+            raise
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await gather_bounded([slow(1), fail(), slow(2)], limit=3)
+
+    assert sorted(cancelled) == [1, 2]
+
+
+async def test_task_graph_runs_independent_steps_concurrently_and_passes_results():
+    order: list[str] = []
+
+    async def step(name: str, value: int) -> int:
+        order.append(f"start:{name}")
+        await asyncio.sleep(0.01)
+        order.append(f"end:{name}")
+        return value
+
+    graph = (
+        TaskGraph()
+        .add('a', lambda: step('a', 1))
+        .add('b', lambda: step('b', 2))
+        .add('sum', lambda a, b: step('sum', a + b), after=['a', 'b'])
+    )
+
+    results = await graph.run()
+
+    assert results == {'a': 1, 'b': 2, 'sum': 3}
+    assert order[:2] == ['start:a', 'start:b']
+    assert order.index('start:sum') > max(order.index('end:a'), order.index('end:b'))
+
+
+def test_task_graph_rejects_unknown_and_duplicate_steps():
+    async def noop() -> None:
+        return None
+
+    graph = TaskGraph().add('a', noop)
+    with pytest.raises(ValueError):
+        graph.add('a', noop)
+    with pytest.raises(ValueError):
+        graph.add('b', noop, after=['missing'])
+
+
+async def test_task_graph_cancels_pending_steps_when_one_fails():
+    cancelled: list[str] = []
+
+    async def fail() -> None:
+        raise RuntimeError("boom")
+
+    async def slow() -> None:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append('slow')
+            raise
+
+    graph = TaskGraph().add('fail', fail).add('slow', slow)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await graph.run()
+    assert cancelled == ['slow']
@@ -0,0 +1,55 @@
+import pytest
+
+from database import async_doc_store, doc_store
+from database.doc_store import FIRESTORE_BATCH_LIMIT
+
+pytestmark = pytest.mark.unit
+
+COLLECTION = "secrets"
+
+
+def test_get_documents_reads_in_chunks_and_keeps_request_order(fake_db):
+    ids = [f"doc-{index:04d}" for index in range(FIRESTORE_BATCH_LIMIT * 2 + 10)]
+    for doc_id in ids[::2]:
+        fake_db.add(f"tenants/t1/{COLLECTION}", doc_id, {"id": doc_id, "value": 1})
+
+    requested = list(reversed(ids)) + ids[:5]  # duplicates are only read once
+    found = doc_store.get_documents(COLLECTION, requested, tenant_id="t1", select=["id"])
+
+    assert fake_db.get_all_sizes == [FIRESTORE_BATCH_LIMIT, FIRESTORE_BATCH_LIMIT, 10]
+    assert list(found) == list(reversed(ids))
+    assert found[ids[0]] == {"id": ids[0]}
+    assert found[ids[1]] is None
+
+
+def test_batch_writes_commit_in_chunks_of_the_batch_limit(fake_db):
+    documents = {f"doc-{index:04d}": {"value": index} for index in range(FIRESTORE_BATCH_LIMIT * 2 + 1)}
+
+    result = doc_store.batch_set_documents(COLLECTION, documents, tenant_id="t1")
+
+    assert fake_db.commits == [FIRESTORE_BATCH_LIMIT, FIRESTORE_BATCH_LIMIT, 1]
+    assert result.ok and len(result.succeeded) == len(documents)
+    assert fake_db.documents[f"tenants/t1/{COLLECTION}/doc-0007"] == {"value": 7}
+
+
+def test_failed_commit_fails_only_the_documents_in_its_chunk(fake_db):
+    doc_ids = [f"doc-{index:04d}" for index in range(FIRESTORE_BATCH_LIMIT + 3)]
+    fake_db.fail_commits_with = {doc_ids[-1]}
+
+    result = doc_store.batch_delete_documents(COLLECTION, doc_ids)
+
+    assert result.succeeded == doc_ids[:FIRESTORE_BATCH_LIMIT]
+    assert sorted(result.failed) == doc_ids[FIRESTORE_BATCH_LIMIT:]
+    assert not result.ok
+
+
+async def test_async_get_documents_and_batch_writes_chunk_like_the_sync_store(fake_async_db):
+    updates = {f"doc-{index:04d}": {"value": index} for index in range(FIRESTORE_BATCH_LIMIT + 1)}
+
+    result = await async_doc_store.batch_set_documents(COLLECTION, updates, tenant_id="t1")
+    found = await async_doc_store.get_documents(COLLECTION, list(updates) + ["missing"], tenant_id="t1")
+
+    assert result.ok
+    assert fake_async_db.commits == [FIRESTORE_BATCH_LIMIT, 1]
+    assert fake_async_db.get_all_sizes == [FIRESTORE_BATCH_LIMIT, 2]
+    assert found["doc-0003"] == {"value": 3} and found["missing"] is None
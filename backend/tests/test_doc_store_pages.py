@@ -0,0 +1,67 @@
+import pytest
+
+from database import async_doc_store, doc_store
+
+pytestmark = pytest.mark.unit
+
+COLLECTION = "secrets"
+
+
+def add_secrets(db, count: int, **extra) -> list[str]:
+    names = [f"secret-{index:02d}" for index in range(count)]
+    for name in names:
+        db.add(f"tenants/t1/{COLLECTION}", name, {"name": name, **extra})
+    return names
+
+
+def read_all_pages(page_size: int, **query_kwargs) -> list[list[str]]:
+    pages, cursor = [], None
+    while True:
+        page = doc_store.query_document_page(COLLECTION, page_size, tenant_id="t1", cursor=cursor, **query_kwargs)
+        pages.append([doc["name"] for doc in page.documents])
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+def test_cursor_walks_every_document_once_in_id_order(fake_db):
+    names = add_secrets(fake_db, 5)
+
+    assert read_all_pages(2) == [names[0:2], names[2:4], names[4:5]]
+
+
+def test_last_full_page_has_no_cursor_so_no_empty_page_is_fetched(fake_db):
+    names = add_secrets(fake_db, 4)
+
+    assert read_all_pages(2) == [names[0:2], names[2:4]]
+    assert [call for call in fake_db.calls if call[0] == "stream"] == [("stream", f"tenants/t1/{COLLECTION}")] * 2
+
+
+def test_page_reports_update_times_and_applies_filters(fake_db):
+    add_secrets(fake_db, 3, environmentId="dev")
+    fake_db.add(f"tenants/t1/{COLLECTION}", "secret-prod", {"name": "secret-prod", "environmentId": "prod"})
+
+    page = doc_store.query_document_page(
+        COLLECTION, 10, tenant_id="t1", where_field="environmentId", where_operator="==", where_value="prod"
+    )
+
+    assert [doc["name"] for doc in page.documents] == ["secret-prod"]
+    assert page.update_times == {"secret-prod": 1}
+    assert page.next_cursor is None
+
+
+def test_pages_cannot_be_ordered_by_another_field(fake_db):
+    with pytest.raises(ValueError):
+        doc_store.query_document_page(COLLECTION, 10, order_by_field="name")
+
+
+async def test_async_cursor_pages_match_the_sync_store(fake_async_db):
+    names = add_secrets(fake_async_db, 3)
+
+    first = await async_doc_store.query_document_page(COLLECTION, 2, tenant_id="t1")
+    second = await async_doc_store.query_document_page(COLLECTION, 2, tenant_id="t1", cursor=first.next_cursor)
+
+    assert [doc["name"] for doc in first.documents] == names[:2]
+    assert first.next_cursor == names[1]
+    assert [doc["name"] for doc in second.documents] == names[2:]
+    assert second.next_cursor is None
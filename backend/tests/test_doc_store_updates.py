@@ -0,0 +1,36 @@
+import pytest
+
+from database import async_doc_store, doc_store
+
+pytestmark = pytest.mark.unit
+
+PATH = "tenants/t1/secrets/api-key"
+
+
+def test_update_field_returns_the_full_updated_document(fake_db):
+    fake_db.add("tenants/t1/secrets", "api-key", {"name": "api-key", "value": "old"})
+
+    assert doc_store.update_field("secrets", "api-key", "value", "new", tenant_id="t1") == {"name": "api-key", "value": "new"}
+
+
+def test_update_field_can_skip_reading_the_document_back(fake_db):
+    fake_db.add("tenants/t1/secrets", "api-key", {"name": "api-key", "value": "old"})
+
+    result = doc_store.update_field("secrets", "api-key", "value", "new", tenant_id="t1", return_document=False)
+
+    assert result == {"value": "new"}
+    assert fake_db.calls == [("update", PATH)]
+
+
+def test_update_of_missing_document_returns_none_in_one_round_trip(fake_db):
+    assert doc_store.update_field("secrets", "api-key", "value", "new", tenant_id="t1") is None
+    assert doc_store.update_document("secrets", "api-key", {"value": "new"}, tenant_id="t1") is None
+    assert fake_db.calls == [("update", PATH), ("update", PATH)]
+
+
+async def test_async_update_field_matches_the_sync_contract(fake_async_db):
+    fake_async_db.add("tenants/t1/secrets", "api-key", {"name": "api-key", "value": "old"})
+
+    assert await async_doc_store.update_field("secrets", "api-key", "value", "new", tenant_id="t1") == {"name": "api-key", "value": "new"}
+    assert await async_doc_store.update_field("secrets", "api-key", "value", "newer", tenant_id="t1", return_document=False) == {"value": "newer"}
+    assert await async_doc_store.update_field("secrets", "missing", "value", "x", tenant_id="t1") is None
@@ -0,0 +1,51 @@
+import base64
+
+import pytest
+from cryptography.fernet import Fernet
+
+from services.encryption_service import (
+    ENVELOPE_TOKEN_PREFIX,
+    STORAGE_FORMAT_V1,
+    STORAGE_FORMAT_V2,
+    STORAGE_FORMAT_V3,
+    EncryptionService,
+)
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def encryption_svc(monkeypatch):
+    monkeypatch.setenv('ENCRYPTION_KEY', Fernet.generate_key().decode('utf-8'))
+    monkeypatch.delenv('ENCRYPTION_OLD_KEYS', raising=False)
+    svc = EncryptionService(decrypt_workers=1)
+    yield svc
+    svc.close()
+
+
+def as_v1(v2_token: str) -> str:
+    """The legacy format: the Fernet token base64-encoded a second time"""
+    return base64.urlsafe_b64encode(v2_token.encode('utf-8')).decode('utf-8')
+
+
+def test_storage_version_is_detected_from_the_prefix(encryption_svc):
+    v2 = encryption_svc.encrypt('token')
+
+    assert EncryptionService.storage_version(v2) == STORAGE_FORMAT_V2
+    assert EncryptionService.storage_version(as_v1(v2)) == STORAGE_FORMAT_V1
+    assert EncryptionService.storage_version(ENVELOPE_TOKEN_PREFIX + v2) == STORAGE_FORMAT_V3
+
+
+def test_every_format_maps_to_the_same_fernet_token(encryption_svc):
+    v2 = encryption_svc.encrypt('token')
+
+    assert EncryptionService.to_fernet_token(v2) == v2.encode('utf-8')
+    assert EncryptionService.to_fernet_token(as_v1(v2)) == v2.encode('utf-8')
+    assert EncryptionService.to_fernet_token(ENVELOPE_TOKEN_PREFIX + v2) == v2.encode('utf-8')
+
+
+def test_v1_and_v2_values_both_decrypt(encryption_svc):
+    v2 = encryption_svc.encrypt('s3cret')
+
+    assert encryption_svc.decrypt(v2) == 's3cret'
+    assert encryption_svc.decrypt(as_v1(v2)) == 's3cret'
@@ -0,0 +1,51 @@
+import base64
+
+import pytest
+from cryptography.fernet import Fernet
+
+from services.encryption_service import STORAGE_FORMAT_V2, EncryptionService
+
+pytestmark = pytest.mark.unit
+
+
+def make_service(monkeypatch, key: bytes, old_keys: list[bytes] = ()) -> EncryptionService:
+    monkeypatch.setenv('ENCRYPTION_KEY', key.decode('utf-8'))
+    monkeypatch.setenv('ENCRYPTION_OLD_KEYS', ','.join(old_key.decode('utf-8') for old_key in old_keys))
+    return EncryptionService(decrypt_workers=1)
+
+
+def test_old_key_values_still_decrypt_and_rotate_to_the_primary_key(monkeypatch):
+    old_key, new_key = Fernet.generate_key(), Fernet.generate_key()
+    old_value = make_service(monkeypatch, old_key).encrypt('s3cret')
+
+    svc = make_service(monkeypatch, new_key, [old_key])
+    assert svc.decrypt(old_value) == 's3cret'
+
+    rotated = svc.rotate(old_value)
+    assert rotated is not None
+    assert EncryptionService.storage_version(rotated) == STORAGE_FORMAT_V2
+    # Readable with the new key alone, so the old key can be retired
+    assert make_service(monkeypatch, new_key).decrypt(rotated) == 's3cret'
+
+
+def test_current_values_are_left_alone(monkeypatch):
+    svc = make_service(monkeypatch, Fernet.generate_key())
+
+    assert svc.rotate(svc.encrypt('s3cret')) is None
+
+
+def test_v1_values_under_the_primary_key_are_rewritten_as_v2(monkeypatch):
+    svc = make_service(monkeypatch, Fernet.generate_key())
+    v1 = base64.urlsafe_b64encode(svc.encrypt('s3cret').encode('utf-8')).decode('utf-8')
+
+    rotated = svc.rotate(v1)
+    assert EncryptionService.storage_version(rotated) == STORAGE_FORMAT_V2
+    assert svc.decrypt(rotated) == 's3cret'
+
+
+def test_values_no_configured_key_can_read_fail_rotation(monkeypatch):
+    stranger = make_service(monkeypatch, Fernet.generate_key()).encrypt('s3cret')
+    svc = make_service(monkeypatch, Fernet.generate_key(), [Fernet.generate_key()])
+
+    with pytest.raises(RuntimeError):
+        svc.rotate(stranger)
@@ -0,0 +1,30 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.endpoints import metrics_api
+from environment import environment as env
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(env, "metrics_token", "operator-token")
+    app = FastAPI()
+    app.include_router(metrics_api.router, prefix="/internal/metrics")
+    return TestClient(app)
+
+
+def test_metrics_require_the_operator_token(client):
+    assert client.get("/internal/metrics").status_code == 401
+    assert client.get("/internal/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = client.get("/internal/metrics", headers={"Authorization": "Bearer operator-token"})
+    assert response.status_code == 200
+    assert isinstance(response.json(), dict)
+
+
+def test_metrics_are_refused_when_no_token_is_configured(client, monkeypatch):
+    monkeypatch.setattr(env, "metrics_token", None)
+    assert client.get("/internal/metrics", headers={"Authorization": "Bearer "}).status_code == 401
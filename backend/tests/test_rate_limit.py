@@ -0,0 +1,154 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from environment import environment as env
+from utils import rate_limit as rate_limit_module
+from utils.rate_limit import FairLimiter
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(rate_limit_module, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+async def settle() -> None:
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+async def test_caps_calls_in_flight():
+    limiter = FairLimiter("test", max_in_flight=2)
+    await limiter.acquire()
+    await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await settle()
+    assert not waiter.done()
+    assert limiter.stats()["waiting"] == 1
+
+    limiter.release()
+    await settle()
+    assert waiter.done()
+    assert limiter.stats()["in_flight"] == 2
+
+
+async def test_serves_queued_flows_round_robin():
+    limiter = FairLimiter("test", max_in_flight=1)
+    await limiter.acquire()
+    order: list[str] = []
+
+    async def call(flow: str, label: str) -> None:
+        async with limiter.slot(flow):
+            order.append(label)
+
+    # Tenant a queues three calls before b and c queue one each
+    tasks = [asyncio.create_task(call(flow, label)) for flow, label in [("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1"), ("c", "c1")]]
+    await settle()
+    limiter.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["a1", "b1", "c1", "a2", "a3"]
+
+
+async def test_cancelled_waiter_hands_its_slot_on():
+    limiter = FairLimiter("test", max_in_flight=1)
+    await limiter.acquire()
+    cancelled = asyncio.create_task(limiter.acquire("a"))
+    waiting = asyncio.create_task(limiter.acquire("b"))
+    await settle()
+
+    cancelled.cancel()
+    await settle()
+    limiter.release()
+    await settle()
+
+    assert cancelled.cancelled()
+    assert waiting.done()
+    assert limiter.stats()["in_flight"] == 1
+
+
+async def test_waiter_cancelled_after_being_granted_releases_the_slot():
+    limiter = FairLimiter("test", max_in_flight=1)
+    await limiter.acquire()
+    granted = asyncio.create_task(limiter.acquire("a"))
+    waiting = asyncio.create_task(limiter.acquire("b"))
+    await settle()
+
+    # Grant a's slot and cancel it before it gets to run
+    limiter.release()
+    granted.cancel()
+    await settle()
+
+    assert granted.cancelled()
+    assert waiting.done()
+    assert limiter.stats()["in_flight"] == 1
+
+
+async def test_rate_limit_queues_calls_until_the_bucket_refills():
+    limiter = FairLimiter("test", max_in_flight=0, rate_per_second=50, burst=1)
+    assert await limiter.acquire() == 0.0
+    limiter.release()
+
+    waited = await asyncio.wait_for(limiter.acquire(), timeout=1)
+    assert waited > 0
+    assert limiter.stats()["queued"] == 1
+
+
+def test_idle_waits_for_a_full_bucket(clock):
+    limiter = FairLimiter("test", max_in_flight=0, rate_per_second=2)
+    assert limiter.idle
+    assert limiter._try_take()
+    assert limiter.busy
+
+    limiter._in_flight -= 1
+    assert not limiter.busy
+    assert not limiter.idle  # a fresh limiter would hand out the spent token again
+
+    clock.now += 0.5
+    assert limiter.idle
+
+
+@pytest.fixture
+def tenant_limits(monkeypatch):
+    monkeypatch.setattr(env, "wristband_tenant_max_in_flight", 1)
+    monkeypatch.setattr(env, "wristband_tenant_max_requests_per_second", 0.01)
+    monkeypatch.setattr(env, "wristband_tenant_limiter_max_entries", 2)
+
+
+async def test_tenant_limiters_are_evicted_least_recently_used_first(make_wristband_client, tenant_limits, clock, monkeypatch):
+    monkeypatch.setattr(env, "wristband_tenant_max_requests_per_second", 1.0)
+    client = make_wristband_client(lambda request: httpx.Response(200))
+    for flow in ["a", "b", "a", "c"]:
+        async with client._limited("users", flow):
+            pass
+        clock.now += 1  # one more token, not enough to leave a spent bucket full
+
+    # The spent tokens keep each limiter from being idle, so only the cap drops them
+    assert list(client._tenant_limiters) == ["a", "c"]
+
+
+async def test_busy_tenant_limiters_are_not_evicted(make_wristband_client, tenant_limits):
+    client = make_wristband_client(lambda request: httpx.Response(200))
+    entered, done = asyncio.Event(), asyncio.Event()
+
+    async def hold(flow: str) -> None:
+        async with client._limited("users", flow):
+            entered.set()
+            await done.wait()
+
+    holder = asyncio.create_task(hold("a"))
+    await entered.wait()
+    for flow in ["b", "c"]:
+        async with client._limited("users", flow):
+            pass
+
+    assert list(client._tenant_limiters) == ["a", "c"]
+    done.set()
+    await holder
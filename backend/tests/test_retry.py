@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+
+from utils import retry as retry_module
+from utils.retry import RetryBudget, backoff_delay, parse_retry_after
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(retry_module, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+@pytest.mark.parametrize("value, expected", [(None, None), ("", None), ("7", 7.0), (" 0 ", 0.0), ("soon", None), ("-5", None)])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_dates():
+    in_30s = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    in_the_past = format_datetime(datetime.now(timezone.utc) - timedelta(minutes=5), usegmt=True)
+
+    assert 25 <= parse_retry_after(in_30s) <= 30
+    assert parse_retry_after(in_the_past) == 0.0
+
+
+def test_backoff_delay_is_capped(monkeypatch):
+    monkeypatch.setattr(retry_module.random, "uniform", lambda low, high: high)
+
+    assert [backoff_delay(attempt, 0.1, 1.0) for attempt in range(5)] == [0.1, 0.2, 0.4, 0.8, 1.0]
+
+
+def test_retry_budget_allows_retries_in_proportion_to_requests(clock):
+    budget = RetryBudget(ratio=0.25, min_per_second=0.0, max_tokens=2.0)
+    assert budget.try_acquire() and budget.try_acquire()
+    assert not budget.try_acquire()
+
+    for _ in range(4):
+        budget.record_request()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+    assert budget.stats() == {"requests": 4, "retries": 3, "retries_denied": 2, "tokens": 0.0}
+
+
+def test_retry_budget_refills_over_time_up_to_the_cap(clock):
+    budget = RetryBudget(ratio=0.0, min_per_second=0.5, max_tokens=2.0)
+    budget.try_acquire()
+    budget.try_acquire()
+    assert not budget.try_acquire()
+
+    clock.now += 2
+    assert budget.try_acquire()
+    clock.now += 60
+    assert budget.stats()["tokens"] == 2.0
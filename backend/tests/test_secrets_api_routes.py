@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.endpoints import secrets_api
+from auth.wristband import require_session_auth
+from services.collections.secrets_service import get_secrets_service
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def svc():
+    return SimpleNamespace(
+        get_secret=AsyncMock(side_effect=lambda name: {'name': name, 'displayName': name, 'environmentId': 'dev', 'token': 't'}),
+        list_secret_metadata=AsyncMock(return_value={'secrets': [], 'nextCursor': None}),
+    )
+
+
+@pytest.fixture
+def client(svc):
+    app = FastAPI()
+    app.include_router(secrets_api.router, prefix='/api/secrets')
+    app.dependency_overrides[require_session_auth] = lambda: None
+    app.dependency_overrides[get_secrets_service] = lambda: svc
+    return TestClient(app)
+
+
+@pytest.mark.parametrize('name', ['metadata', 'stream', 'api-key'])
+def test_any_secret_name_can_be_revealed(client, svc, name):
+    response = client.get(f'/api/secrets/by-name/{name}')
+
+    assert response.status_code == 200
+    assert response.json()['name'] == name
+    svc.get_secret.assert_awaited_once_with(name)
+
+
+def test_listing_routes_are_not_taken_for_secret_names(client, svc):
+    assert client.get('/api/secrets/metadata').status_code == 200
+    svc.list_secret_metadata.assert_awaited_once()
+    svc.get_secret.assert_not_awaited()
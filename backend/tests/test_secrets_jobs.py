@@ -0,0 +1,182 @@
+import asyncio
+import base64
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from cryptography.fernet import Fernet
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from wristband.fastapi_auth import get_session
+
+from api.endpoints import secrets_api
+from auth.wristband import require_session_auth
+from environment import environment as env
+from services.collections import JOBS_COLLECTION, SECRETS_COLLECTION, secrets_jobs
+from services.collections.secrets_jobs import (
+    KEY_ROTATION_JOB,
+    STORAGE_MIGRATION_JOB,
+    SecretsJob,
+    SecretsJobClaimLostError,
+    SecretsJobResult,
+    migrate_storage_format,
+    rotate_keys,
+    start_job,
+)
+from services.collections.secrets_service import get_secrets_service
+from services.encryption_service import STORAGE_FORMAT_V2, STORAGE_FORMAT_V3, EncryptionService
+from services.tenant_encryption_service import TenantEncryptionService, data_key_cache
+
+pytestmark = pytest.mark.unit
+
+
+JOBS = f'tenants/t1/{JOBS_COLLECTION}'
+
+
+@pytest.fixture(autouse=True)
+def no_job_totals(monkeypatch):
+    monkeypatch.setattr(secrets_jobs, '_totals', {})
+
+
+def make_client(roles, svc=None) -> TestClient:
+    app = FastAPI()
+    app.include_router(secrets_api.router, prefix='/api/secrets')
+    app.dependency_overrides[require_session_auth] = lambda: None
+    app.dependency_overrides[get_session] = lambda: SimpleNamespace(tenant_id='t1', roles=roles)
+    app.dependency_overrides[get_secrets_service] = lambda: svc or MagicMock()
+    return TestClient(app)
+
+
+def running_job(heartbeat_age: float = 0.0) -> dict:
+    return {'status': 'running', 'runId': 'other-instance', 'heartbeatAt': time.time() - heartbeat_age, 'result': {'scanned': 5}}
+
+
+async def wait_for_jobs() -> None:
+    await asyncio.gather(*secrets_jobs._tasks)
+
+
+@pytest.mark.parametrize('path, start', [
+    ('/api/secrets/migrate-storage', 'start_storage_migration'),
+    ('/api/secrets/rotate-keys', 'start_key_rotation'),
+])
+def test_maintenance_jobs_require_the_tenant_admin_role(path, start):
+    svc = MagicMock()
+    setattr(svc, start, AsyncMock(return_value={'status': 'started'}))
+
+    assert make_client(['viewer'], svc).post(path).status_code == 403
+    assert make_client(None, svc).post(path).status_code == 403
+    getattr(svc, start).assert_not_called()
+    assert make_client(['account-admin'], svc).post(path).status_code == 202
+
+
+async def test_job_claim_and_status_live_in_the_tenants_job_documents(fake_async_db):
+    async def run(job):
+        job.result.scanned = 2
+
+    assert await start_job(STORAGE_MIGRATION_JOB, 't1', run)
+    # What another instance sees while the run holds the job
+    assert fake_async_db.documents[f'{JOBS}/{STORAGE_MIGRATION_JOB}']['status'] == 'running'
+    assert not await start_job(STORAGE_MIGRATION_JOB, 't1', run)
+    await wait_for_jobs()
+
+    jobs = await secrets_jobs.tenant_jobs('t1')
+    assert jobs[STORAGE_MIGRATION_JOB]['scanned'] == 2
+    assert jobs[STORAGE_MIGRATION_JOB]['running'] is False
+    assert jobs[STORAGE_MIGRATION_JOB]['finished_at'] is not None
+    assert await secrets_jobs.tenant_jobs('t2') == {}
+
+
+async def test_job_held_by_another_instance_is_not_started_until_its_lease_lapses(fake_async_db):
+    run = AsyncMock()
+    fake_async_db.add(JOBS, KEY_ROTATION_JOB, running_job())
+
+    assert not await start_job(KEY_ROTATION_JOB, 't1', run)
+    assert (await secrets_jobs.tenant_jobs('t1'))[KEY_ROTATION_JOB] == {'scanned': 5, 'running': True}
+
+    fake_async_db.add(JOBS, KEY_ROTATION_JOB, {**running_job(env.secrets_job_lease_seconds + 1), 'checkpoint': {'cursor': 'b'}})
+    assert await start_job(KEY_ROTATION_JOB, 't1', run)
+    await wait_for_jobs()
+
+    [job] = run.await_args.args
+    assert job.checkpoint == {'cursor': 'b'}
+    assert fake_async_db.documents[f'{JOBS}/{KEY_ROTATION_JOB}']['runId'] == job.run_id
+
+
+async def test_run_whose_job_was_taken_over_stops_at_its_next_save(fake_async_db):
+    job = SecretsJob(SecretsJobResult(job=KEY_ROTATION_JOB, tenant_id='t1'), checkpoint=None, update_time=None)
+    await job.save()
+    # Another instance takes the job over once this run's lease has lapsed
+    takeover = SecretsJob(SecretsJobResult(job=KEY_ROTATION_JOB, tenant_id='t1'), checkpoint=None, update_time=None)
+    takeover._update_time = fake_async_db.update_times[f'{JOBS}/{KEY_ROTATION_JOB}']
+    await takeover.save()
+
+    with pytest.raises(SecretsJobClaimLostError):
+        await job.save()
+    assert fake_async_db.documents[f'{JOBS}/{KEY_ROTATION_JOB}']['runId'] == takeover.run_id
+
+
+async def test_jobs_metrics_are_aggregates_without_tenant_detail(fake_async_db):
+    async def run(job):
+        job.result.scanned = 3
+        job.result.failed['other-tenant-secret'] = 'error'
+
+    assert await start_job(STORAGE_MIGRATION_JOB, 't2', run)
+    await wait_for_jobs()
+
+    metrics = secrets_jobs._jobs_metrics()
+
+    assert metrics == {STORAGE_MIGRATION_JOB: {'runs': 1, 'running': 0, 'scanned': 3, 'rewritten': 0, 'failed': 1}}
+    assert 't2' not in repr(metrics) and 'other-tenant-secret' not in repr(metrics)
+
+
+async def test_storage_migration_rewrites_only_v1_secrets(fake_async_db):
+    fernet = Fernet(Fernet.generate_key())
+    v2 = fernet.encrypt(b'token').decode('utf-8')
+    v1 = base64.urlsafe_b64encode(v2.encode('utf-8')).decode('utf-8')
+    collection = f'tenants/t1/{SECRETS_COLLECTION}'
+    fake_async_db.add(collection, 'legacy', {'name': 'legacy', 'encryptedToken': v1})
+    fake_async_db.add(collection, 'current', {'name': 'current', 'encryptedToken': v2})
+
+    result = SecretsJobResult(job=STORAGE_MIGRATION_JOB, tenant_id='t1')
+    await migrate_storage_format(SecretsJob(result, checkpoint=None, update_time=None), page_size=1)
+
+    assert (result.scanned, result.rewritten, result.failed) == (2, 1, {})
+    migrated = fake_async_db.documents[f'{collection}/legacy']
+    assert migrated['encryptedToken'] == v2
+    assert migrated['encryptionVersion'] == STORAGE_FORMAT_V2
+    assert fernet.decrypt(EncryptionService.to_fernet_token(migrated['encryptedToken'])) == b'token'
+
+
+@pytest.fixture
+def tenant_encryption_svc(monkeypatch, fake_async_db):
+    monkeypatch.setenv('ENCRYPTION_KEY', Fernet.generate_key().decode('utf-8'))
+    monkeypatch.delenv('ENCRYPTION_OLD_KEYS', raising=False)
+    data_key_cache.clear()
+    master = EncryptionService(decrypt_workers=1)
+    tenant_encryption_svc = TenantEncryptionService(master)
+    monkeypatch.setattr(secrets_jobs, 'get_tenant_encryption_service', lambda: tenant_encryption_svc)
+    yield tenant_encryption_svc
+    data_key_cache.clear()
+    master.close()
+
+
+async def test_key_rotation_resumes_from_the_checkpoint_in_its_job_document(tenant_encryption_svc, fake_async_db):
+    collection = f'tenants/t1/{SECRETS_COLLECTION}'
+    for name in ('a', 'b', 'c'):
+        fake_async_db.add(collection, name, {'name': name, 'encryptedToken': tenant_encryption_svc.master.encrypt(name)})
+    # A run on another instance stopped after the first page and its lease lapsed
+    fake_async_db.add(JOBS, KEY_ROTATION_JOB, {
+        **running_job(env.secrets_job_lease_seconds + 1),
+        'checkpoint': {'cursor': 'a', 'keyFingerprint': tenant_encryption_svc.master.key_fingerprint},
+    })
+
+    assert await start_job(KEY_ROTATION_JOB, 't1', lambda job: rotate_keys(job, page_size=1, max_secrets_per_second=1e6))
+    assert not await start_job(KEY_ROTATION_JOB, 't1', rotate_keys)
+    await wait_for_jobs()
+
+    job_data = fake_async_db.documents[f'{JOBS}/{KEY_ROTATION_JOB}']
+    assert (job_data['status'], job_data['checkpoint']) == ('finished', None)
+    assert (job_data['result']['resumed_from'], job_data['result']['rewritten']) == ('a', 2)
+    versions = {name: EncryptionService.storage_version(fake_async_db.documents[f'{collection}/{name}']['encryptedToken']) for name in 'abc'}
+    assert versions == {'a': STORAGE_FORMAT_V2, 'b': STORAGE_FORMAT_V3, 'c': STORAGE_FORMAT_V3}
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+pytestmark = pytest.mark.unit
+
+
+async def test_concurrent_calls_with_the_same_key_share_one_call():
+    flights = SingleFlight()
+    release = asyncio.Event()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await release.wait()
+        return {"id": "tenant"}
+
+    waiters = [asyncio.ensure_future(flights.do("tenant", fetch)) for _ in range(3)]
+    other = asyncio.ensure_future(flights.do("other", fetch))
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*waiters, other)
+    assert len(calls) == 2
+    assert all(result is results[0] for result in results[:3])
+    assert flights.stats() == {"calls": 2, "coalesced": 2, "inflight": 0}
+
+
+async def test_exception_is_shared_and_nothing_is_remembered():
+    flights = SingleFlight()
+    release = asyncio.Event()
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await release.wait()
+        raise ValueError("upstream failed")
+
+    waiters = [asyncio.ensure_future(flights.do("key", failing)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(attempts) == 1
+
+    async def succeeding():
+        return "ok"
+
+    # Once finished, the next call for the key starts afresh
+    assert await flights.do("key", succeeding) == "ok"
+
+
+async def test_cancelled_caller_does_not_cancel_the_call_for_others():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return "value"
+
+    first = asyncio.ensure_future(flights.do("key", fetch))
+    second = asyncio.ensure_future(flights.do("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "value"
+    with pytest.raises(asyncio.CancelledError):
+        await first
@@ -0,0 +1,64 @@
+import pytest
+from cryptography.fernet import Fernet
+
+from services.collections import KEYS_COLLECTION
+from services.encryption_service import STORAGE_FORMAT_V3, EncryptionService
+from services.tenant_encryption_service import DATA_KEY_DOC_ID, TenantEncryptionService, data_key_cache
+
+pytestmark = pytest.mark.unit
+
+KEY_PATH = f"tenants/t1/{KEYS_COLLECTION}/{DATA_KEY_DOC_ID}"
+
+
+@pytest.fixture
+def tenant_encryption_svc(monkeypatch, fake_async_db):
+    monkeypatch.setenv('ENCRYPTION_KEY', Fernet.generate_key().decode('utf-8'))
+    monkeypatch.delenv('ENCRYPTION_OLD_KEYS', raising=False)
+    data_key_cache.clear()
+    master = EncryptionService(decrypt_workers=1)
+    yield TenantEncryptionService(master)
+    data_key_cache.clear()
+    master.close()
+
+
+async def test_encrypting_creates_the_data_key_and_values_round_trip(tenant_encryption_svc, fake_async_db):
+    encrypted = await tenant_encryption_svc.encrypt('t1', 's3cret')
+
+    assert EncryptionService.storage_version(encrypted) == STORAGE_FORMAT_V3
+    assert KEY_PATH in fake_async_db.documents
+    assert await tenant_encryption_svc.decrypt('t1', encrypted) == 's3cret'
+
+
+async def test_decrypting_never_creates_a_data_key(tenant_encryption_svc, fake_async_db):
+    legacy = tenant_encryption_svc.master.encrypt('legacy')
+
+    # Master-key (v1/v2) values decrypt without a data key
+    assert await tenant_encryption_svc.decrypt_batch('t1', [legacy]) == ['legacy']
+
+    orphan = 'env:' + Fernet(Fernet.generate_key()).encrypt(b'orphan').decode('utf-8')
+    with pytest.raises(RuntimeError, match='no data key'):
+        await tenant_encryption_svc.decrypt('t1', orphan)
+    assert KEY_PATH not in fake_async_db.documents
+
+
+async def test_data_key_survives_a_cache_reload(tenant_encryption_svc):
+    encrypted = await tenant_encryption_svc.encrypt('t1', 's3cret')
+    data_key_cache.clear()
+
+    assert await tenant_encryption_svc.decrypt('t1', encrypted) == 's3cret'
+
+
+async def test_reencrypt_moves_master_key_values_onto_the_data_key(tenant_encryption_svc, fake_async_db):
+    legacy = tenant_encryption_svc.master.encrypt('legacy')
+    current = await tenant_encryption_svc.encrypt('t1', 'current')
+
+    moved, unchanged = await tenant_encryption_svc.reencrypt_batch('t1', [legacy, current])
+
+    assert unchanged is None
+    assert EncryptionService.storage_version(moved) == STORAGE_FORMAT_V3
+    assert await tenant_encryption_svc.decrypt('t1', moved) == 'legacy'
+
+
+async def test_reencrypt_without_legacy_values_creates_no_data_key(tenant_encryption_svc, fake_async_db):
+    assert await tenant_encryption_svc.reencrypt_batch('t1', []) == []
+    assert KEY_PATH not in fake_async_db.documents
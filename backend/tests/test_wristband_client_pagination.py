@@ -0,0 +1,59 @@
+import httpx
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def paged_handler(total: int, index_base: int, max_page_size: int | None = None, requests: list | None = None):
+    """Serve items 0..total-1 from a Wristband-style query endpoint."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        start_index = int(request.url.params['startIndex'])
+        count = int(request.url.params['count'])
+        if max_page_size is not None:
+            count = min(count, max_page_size)
+        if requests is not None:
+            requests.append(start_index)
+        offset = start_index - index_base
+        items = [{'id': str(i)} for i in range(offset, min(offset + count, total))]
+        return httpx.Response(200, json={'items': items, 'itemsPerPage': count, 'totalResults': total})
+    return handler
+
+
+@pytest.mark.parametrize('total', [0, 1, 9, 10, 11, 20, 21, 95])
+async def test_query_tenant_users_fetches_every_page_zero_based(make_wristband_client, total):
+    client = make_wristband_client(paged_handler(total, index_base=0))
+
+    users = await client.query_tenant_users('tenant', 'token', count=10)
+
+    assert [user['id'] for user in users] == [str(i) for i in range(total)]
+
+
+@pytest.mark.parametrize('total', [0, 1, 10, 11, 21, 95])
+async def test_query_invitations_fetches_every_page_one_based(make_wristband_client, total):
+    requests: list[int] = []
+    client = make_wristband_client(paged_handler(total, index_base=1, requests=requests))
+
+    invitations = await client.query_new_user_invitation_requests('tenant', 'token', count=10)
+
+    assert [invitation['id'] for invitation in invitations] == [str(i) for i in range(total)]
+    # One request per page, starting at 1
+    assert sorted(requests) == list(range(1, max(total, 1) + 1, 10))
+
+
+async def test_query_uses_the_page_size_applied_by_the_server(make_wristband_client):
+    requests: list[int] = []
+    client = make_wristband_client(paged_handler(25, index_base=0, max_page_size=10, requests=requests))
+
+    users = await client.query_tenant_users('tenant', 'token', count=100)
+
+    assert len(users) == 25
+    assert sorted(requests) == [0, 10, 20]
+
+
+async def test_on_page_receives_each_page(make_wristband_client):
+    client = make_wristband_client(paged_handler(25, index_base=0))
+    pages: list[list[dict]] = []
+
+    await client.query_tenant_users('tenant', 'token', count=10, on_page=pages.append)
+
+    assert sorted(len(page) for page in pages) == [5, 10, 10]
@@ -0,0 +1,42 @@
+import json
+
+import httpx
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+async def test_resolve_assigned_roles_merges_chunks_and_rebases_failure_indexes(make_wristband_client):
+    chunks: list[list[str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        user_ids = json.loads(request.content)['userIds']
+        chunks.append(user_ids)
+        items = [{'userId': user_id, 'roles': []} for user_id in user_ids if user_id != 'u4']
+        # Failure indexes are relative to the chunk that was sent
+        failures = [{'index': i, 'userId': user_id} for i, user_id in enumerate(user_ids) if user_id == 'u4']
+        return httpx.Response(200, json={'items': items, 'failures': failures})
+
+    client = make_wristband_client(handler)
+    user_ids = [f'u{i}' for i in range(7)]
+
+    result = await client.resolve_assigned_roles_for_users(user_ids, 'token', chunk_size=3)
+
+    assert sorted(len(chunk) for chunk in chunks) == [1, 3, 3]
+    assert [item['userId'] for item in result['items']] == ['u0', 'u1', 'u2', 'u3', 'u5', 'u6']
+    assert result['failures'] == [{'index': 4, 'userId': 'u4'}]
+    assert user_ids[result['failures'][0]['index']] == 'u4'
+
+
+async def test_resolve_assigned_roles_sends_small_requests_unchunked(make_wristband_client):
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={'items': [], 'failures': []})
+
+    client = make_wristband_client(handler)
+
+    await client.resolve_assigned_roles_for_users(['u0', 'u1'], 'token', chunk_size=3)
+
+    assert len(requests) == 1
@@ -0,0 +1,85 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from clients.wristband_client import WristbandAPIError
+from services import wristband_service
+from services.wristband_service import WristbandService
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    caches = (
+        wristband_service.tenant_cache,
+        wristband_service.tenant_roles_cache,
+        wristband_service.tenant_users_cache,
+        wristband_service.pending_invitations_cache,
+    )
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
+
+
+def make_service(client, user_id='user', roles=('viewer',), tenant_id='tenant') -> WristbandService:
+    session = SimpleNamespace(tenant_id=tenant_id, access_token=f'{user_id}-token', user_id=user_id, roles=list(roles))
+    return WristbandService(request=None, session=session, client=client)
+
+
+async def test_cached_roles_are_not_shared_across_callers_with_different_permissions():
+    client = SimpleNamespace(query_tenant_roles=AsyncMock(return_value=[]))
+
+    await make_service(client, user_id='admin', roles=['account-admin']).get_roles()
+    await make_service(client, user_id='viewer', roles=['viewer']).get_roles()
+    await make_service(client, user_id='other-viewer', roles=['viewer']).get_roles()
+
+    # Callers with the same roles share one upstream call
+    tokens = [call.kwargs['access_token'] for call in client.query_tenant_roles.await_args_list]
+    assert tokens == ['admin-token', 'viewer-token']
+
+
+async def test_tenant_update_invalidates_every_callers_cached_tenant():
+    tenant = {'id': 'tenant', 'applicationId': 'app', 'vanityDomain': 'x', 'domainName': 'x', 'displayName': 'Tenant', 'status': 'ACTIVE'}
+    client = SimpleNamespace(get_tenant=AsyncMock(return_value=tenant), update_tenant=AsyncMock(return_value=tenant))
+    admin = make_service(client, user_id='admin', roles=['account-admin'])
+    viewer = make_service(client, user_id='viewer')
+    other_tenant = make_service(client, user_id='other', tenant_id='other-tenant')
+    for service in (admin, viewer, other_tenant):
+        await service.get_tenant_info()
+
+    await admin.update_tenant_info(SimpleNamespace(model_dump=lambda **_: {}))
+
+    remaining = {key[0] for key in wristband_service.tenant_cache._entries}
+    assert remaining == {'other-tenant'}
+
+
+async def test_pending_invitations_are_cached_per_role_set():
+    client = SimpleNamespace(query_new_user_invitation_requests=AsyncMock(return_value=[]))
+
+    await make_service(client, user_id='admin', roles=['account-admin']).get_pending_invitations()
+    await make_service(client, user_id='viewer').get_pending_invitations()
+    await make_service(client, user_id='other-viewer').get_pending_invitations()
+
+    assert client.query_new_user_invitation_requests.await_count == 2
+
+
+async def test_polling_admins_with_the_same_roles_share_one_users_load():
+    client = SimpleNamespace(query_tenant_users=AsyncMock(return_value=[]))
+    admins = [make_service(client, user_id=user_id, roles=['account-admin']) for user_id in ('admin', 'other-admin')]
+
+    await asyncio.gather(*(admin.get_users() for admin in admins))
+    await admins[0].get_users()
+
+    assert client.query_tenant_users.await_count == 1
+
+
+@pytest.mark.parametrize("status_code, dropped", [(401, True), (403, True), (404, True), (429, False), (503, False), (None, False)])
+def test_users_caches_drop_entries_only_when_access_is_refused(status_code, dropped):
+    error = WristbandAPIError('Query Tenant Users', status_code, 'error')
+    for cache in (wristband_service.tenant_users_cache, wristband_service.pending_invitations_cache):
+        assert cache.drop_on_error(error) is dropped
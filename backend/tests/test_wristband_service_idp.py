@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from services.wristband_service import WristbandService
+
+pytestmark = pytest.mark.unit
+
+
+def make_service(client) -> WristbandService:
+    session = SimpleNamespace(tenant_id='tenant', access_token='token', user_id='user')
+    return WristbandService(request=None, session=session, client=client)
+
+
+async def test_okta_upsert_runs_after_the_override_toggle():
+    calls: list[str] = []
+    client = SimpleNamespace(
+        upsert_idp_override_toggle=AsyncMock(side_effect=lambda **_: calls.append('toggle')),
+        upsert_okta_identity_provider=AsyncMock(side_effect=lambda **_: calls.append('upsert') or {'id': 'idp'}),
+    )
+
+    assert await make_service(client).upsert_okta_idp('example.okta.com', 'id', 'secret') == {'id': 'idp'}
+    assert calls == ['toggle', 'upsert']
+
+
+async def test_google_upsert_is_not_attempted_when_the_toggle_fails():
+    client = SimpleNamespace(
+        upsert_idp_override_toggle=AsyncMock(side_effect=ValueError('toggle failed')),
+        upsert_google_saml_identity_provider=AsyncMock(),
+    )
+    metadata = SimpleNamespace(model_dump=lambda by_alias: {})
+
+    with pytest.raises(ValueError, match='toggle failed'):
+        await make_service(client).upsert_google_saml_idp(metadata)
+    client.upsert_google_saml_identity_provider.assert_not_awaited()
@@ -11,9 +11,13 @@ interface Secret {
   token: string
 }
 
+type SecretMetadata = Omit<Secret, 'token'>
+
 export default function Secrets() {
-  const [secrets, setSecrets] = useState<Secret[]>([])
+  const [secrets, setSecrets] = useState<SecretMetadata[]>([])
   const [isLoading, setIsLoading] = useState(true)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [isLoadingMore, setIsLoadingMore] = useState(false)
   const [error, setError] = useState<string | null>(null)
   
   // Form state
@@ -25,20 +29,31 @@ export default function Secrets() {
   const [showToken, setShowToken] = useState(false)
   const [isSaving, setIsSaving] = useState(false)
   
-  // Track which secrets are visible
-  const [visibleSecrets, setVisibleSecrets] = useState<{ [key: string]: boolean }>({})
+  // Tokens of the secrets currently shown; fetched and decrypted on demand
+  const [revealedTokens, setRevealedTokens] = useState<{ [key: string]: string }>({})
 
   // Fetch secrets
   useEffect(() => {
     fetchSecrets()
   }, [])
 
-  const fetchSecrets = async () => {
+  // Without a cursor, (re)load the first page; with one, append the next page
+  const fetchSecrets = async (cursor: string | null = null) => {
     try {
-      setIsLoading(true)
+      if (cursor) {
+        setIsLoadingMore(true)
+      } else {
+        setIsLoading(true)
+      }
       setError(null)
-      const response = await frontendApiClient.get('/secrets')
-      setSecrets(response.data)
+      // List metadata only (no tokens), one page at a time; further pages load on demand
+      const response = await frontendApiClient.get('/secrets/metadata', { params: cursor ? { cursor } : {} })
+      const page: SecretMetadata[] = response.data.secrets
+      setSecrets(prev => (cursor ? [...prev, ...page] : page))
+      setNextCursor(response.data.nextCursor)
+      if (!cursor) {
+        setRevealedTokens({})
+      }
     } catch (error) {
       console.error('Error fetching secrets:', error)
       if (axios.isAxiosError(error)) {
@@ -55,6 +70,7 @@ export default function Secrets() {
       }
     } finally {
       setIsLoading(false)
+      setIsLoadingMore(false)
     }
   }
 
@@ -103,6 +119,26 @@ export default function Secrets() {
     }
   }
 
+  const toggleToken = async (secretName: string) => {
+    if (secretName in revealedTokens) {
+      // Drop the plaintext when hiding so it is only held while shown
+      setRevealedTokens(prev => {
+        const next = { ...prev }
+        delete next[secretName]
+        return next
+      })
+      return
+    }
+
+    try {
+      const response = await frontendApiClient.get(`/secrets/by-name/${encodeURIComponent(secretName)}`)
+      setRevealedTokens(prev => ({ ...prev, [secretName]: response.data.token }))
+    } catch (error) {
+      console.error('Error fetching secret:', error)
+      alert('Failed to load secret')
+    }
+  }
+
   const handleDelete = async (secretName: string) => {
     if (!confirm('Are you sure you want to delete this secret?')) {
       return
@@ -313,15 +349,15 @@ export default function Secrets() {
                             Token:
                           </span>
                           <code className="text-xs px-2 py-1 rounded font-mono flex-1" style={{ backgroundColor: 'rgba(255, 255, 255, 0.05)', color: theme.colors.textTertiary, wordBreak: 'break-all' }}>
-                            {visibleSecrets[secret.name] ? secret.token : '••••••••••••••••'}
+                            {secret.name in revealedTokens ? revealedTokens[secret.name] : '••••••••••••••••'}
                           </code>
                           <button
-                            onClick={() => setVisibleSecrets(prev => ({ ...prev, [secret.name]: !prev[secret.name] }))}
+                            onClick={() => toggleToken(secret.name)}
                             className="p-1 rounded hover:opacity-70 transition-opacity"
                             style={{ color: theme.colors.textSecondary }}
-                            title={visibleSecrets[secret.name] ? 'Hide token' : 'Show token'}
+                            title={secret.name in revealedTokens ? 'Hide token' : 'Show token'}
                           >
-                            <Icon name={visibleSecrets[secret.name] ? 'eye-off' : 'eye'} size={16} />
+                            <Icon name={secret.name in revealedTokens ? 'eye-off' : 'eye'} size={16} />
                           </button>
                         </div>
                       </div>
@@ -340,6 +376,22 @@ export default function Secrets() {
                   </div>
                 </div>
               ))}
+              {nextCursor && (
+                <div className="p-4 text-center">
+                  <button
+                    onClick={() => fetchSecrets(nextCursor)}
+                    disabled={isLoadingMore}
+                    className="px-4 py-2 rounded-lg text-sm font-medium transition-colors disabled:opacity-50"
+                    style={{
+                      backgroundColor: 'rgba(255, 255, 255, 0.05)',
+                      color: theme.colors.textPrimary,
+                      border: '1px solid rgba(255, 255, 255, 0.1)'
+                    }}
+                  >
+                    {isLoadingMore ? 'Loading...' : 'Load more'}
+                  </button>
+                </div>
+              )}
             </div>
           )}
         </div>